@@ -5,7 +5,7 @@ import requests
 import os
 from models import *
 import json
-from config import app,db
+from config import app,db,job_queue
 from routes_functions import function_routes
 from routes_user import routes_user
 from routes_analytics import routes_analytics
@@ -14,6 +14,7 @@ from routes_emergency import routes_emergency
 from routes_reminders import routes_reminders
 from routes_health import routes_health
 from routes_asanas import asana_routes
+from routes_jobs import routes_jobs
 
 CORS(app)
 
@@ -34,10 +35,12 @@ routes_doctors(app, db)
 routes_emergency(app, db)
 routes_reminders(app, db)
 routes_health(app, db)
+routes_jobs(app, db)
 
 if __name__ == "__main__":
     with app.app_context():
         db.create_all()
+        upgrade_schema()
         
         if Roles.query.count() == 0:
             default_roles = [
@@ -47,4 +50,8 @@ if __name__ == "__main__":
             ]
             db.session.bulk_save_objects(default_roles)
             db.session.commit()
+
+    # Only the reloader's serving process runs jobs; use job_worker.py for separate worker processes
+    if os.environ.get("WERKZEUG_RUN_MAIN") == "true":
+        job_queue.start_workers(app, count=app.config["JOB_WORKERS"])
     app.run(debug=True)
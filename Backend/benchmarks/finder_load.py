@@ -0,0 +1,85 @@
+"""
+Load test for the finder endpoints of a running backend.
+
+Start places_standin.py and the backend with PLACES_BASE_URL pointing at it, then:
+    python -m benchmarks.finder_load http://127.0.0.1:5000 --requests 200 --concurrency 20
+    python -m benchmarks.finder_load http://127.0.0.1:5000 --endpoint doctor-finder --requests 20
+
+doctor-finder runs as a background job, so its latency is measured until the job finishes.
+Hospital websites are still fetched for real by doctor-finder.
+"""
+
+import argparse
+import random
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+CENTER = (12.9716, 77.5946)
+
+
+def request_body(endpoint, rng):
+    body = {
+        "latitude": round(CENTER[0] + rng.uniform(-0.02, 0.02), 5),
+        "longitude": round(CENTER[1] + rng.uniform(-0.02, 0.02), 5),
+        "radius": 3000,
+    }
+    if endpoint == "doctor-finder":
+        body["specialist"] = "cardiologist"
+    return body
+
+
+def run_one(session, base_url, endpoint, body, job_timeout):
+    start = time.perf_counter()
+    response = session.post(f"{base_url}/api/{endpoint}", json=body, timeout=60)
+    ok = response.status_code == 200
+    if response.status_code == 202:
+        status_url = f"{base_url}{response.json()['status_url']}"
+        while time.perf_counter() - start < job_timeout:
+            job = session.get(status_url, timeout=10).json()
+            if job.get("status") in ("done", "failed"):
+                ok = job["status"] == "done"
+                break
+            time.sleep(0.5)
+    return ok, time.perf_counter() - start
+
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("base_url")
+    parser.add_argument("--endpoint", default="hospital-finder", choices=["hospital-finder", "pharmacy-finder", "doctor-finder"])
+    parser.add_argument("--requests", type=int, default=100)
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--job-timeout", type=float, default=600)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    bodies = [request_body(args.endpoint, rng) for _ in range(args.requests)]
+    session = requests.Session()
+    session.mount("http://", requests.adapters.HTTPAdapter(pool_maxsize=args.concurrency))
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.concurrency) as executor:
+        results = list(executor.map(
+            lambda body: run_one(session, args.base_url.rstrip("/"), args.endpoint, body, args.job_timeout), bodies
+        ))
+    elapsed = time.perf_counter() - start
+
+    latencies = [latency for _, latency in results]
+    failures = sum(1 for ok, _ in results if not ok)
+    print(f"{args.endpoint}: {args.requests} requests, concurrency {args.concurrency}")
+    print(f"  throughput {args.requests / elapsed:8.1f} req/s   failures {failures}")
+    print(f"  latency p50 {statistics.median(latencies) * 1000:8.1f} ms   "
+          f"p95 {percentile(latencies, 0.95) * 1000:8.1f} ms   max {max(latencies) * 1000:8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""
+Benchmark of the HTML parser backends used by WebsiteScraper for link and text extraction.
+
+Times html.parser (BeautifulSoup) against lxml on saved hospital pages plus a synthetic
+large doctor directory, and checks both backends return identical links, text and
+structured doctors (microdata and doctor cards, parsed before any LLM call).
+
+Usage (from Backend/):
+    python -m benchmarks.html_parser_bench [saved_page.html ...]
+"""
+
+import os
+import random
+import sys
+import time
+
+from modules.html_backends import parser_backend
+from modules.structured_doctors import structured_doctors
+
+DEFAULT_PAGES = [os.path.join(os.path.dirname(os.path.dirname(__file__)), "try.html")]
+
+
+def synthetic_directory_page(doctors=2000, seed=5):
+    rng = random.Random(seed)
+    specialties = ["Cardiologist", "Neurologist", "Gynecologist", "Orthopaedic Surgeon", "Pediatrician"]
+    names = ["Meera", "Arjun", "Anita", "Vikram", "Priya", "Rahul", "Kavya", "Suresh"]
+    menu = "".join(f'<li><a href="/section-{index}/">Section {index}</a></li>' for index in range(150))
+    cards = "".join(
+        f'<div class="doctor-card"><img src="/img/{index}.jpg"><h4><a href="/doctors/dr-{index}/">'
+        f"Dr. {rng.choice(names)} {index}</a></h4><p>{rng.choice(specialties)}</p>"
+        f"<p>MBBS, MD &amp; {rng.randint(5, 30)} years of experience</p></div>"
+        for index in range(doctors)
+    )
+    return (f"<html><head><script>{'var x = 1;' * 500}</script></head><body><nav><ul>{menu}</ul></nav>"
+            f"<main>{cards}</main><footer>{menu}</footer></body></html>")
+
+
+def structured(backend):
+    return lambda html: structured_doctors(html, [], "doctor", "https://hospital.in/", parser=backend)
+
+
+def best_of(function, *args, repeat=5):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = function(*args)
+        timings.append(time.perf_counter() - start)
+    return min(timings), result
+
+
+def main(paths):
+    pages = {}
+    for path in paths:
+        with open(path, "r", encoding="utf-8") as file:
+            pages[os.path.basename(path)] = file.read()
+    pages["synthetic-directory (2000 doctors)"] = synthetic_directory_page()
+
+    reference, fast = parser_backend("html.parser"), parser_backend("lxml")
+    print(f"{'page':36} {'KB':>6} {'step':>10} {'html.parser':>12} {'lxml':>10} {'speedup':>8}")
+    for name, html in pages.items():
+        for step in ("links", "main_text", "structured"):
+            old_step, new_step = (
+                (structured(reference), structured(fast)) if step == "structured"
+                else (getattr(reference, step), getattr(fast, step))
+            )
+            old_time, old_result = best_of(old_step, html)
+            new_time, new_result = best_of(new_step, html)
+            assert old_result == new_result, f"backends disagree on {step} of {name}"
+            print(f"{name:36} {len(html) // 1024:>6} {step:>10} {old_time * 1000:>9.2f} ms {new_time * 1000:>7.2f} ms "
+                  f"{old_time / new_time:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:] or DEFAULT_PAGES)
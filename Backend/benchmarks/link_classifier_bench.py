@@ -0,0 +1,98 @@
+"""
+Micro-benchmark for link classification in WebsiteScraper.find_doctor_page_links.
+
+Compares the keyword-by-keyword substring scan with the compiled LinkClassifier over the
+anchors of saved hospital pages, plus a synthetic sitemap-sized page.
+
+Usage (from Backend/):
+    python -m benchmarks.link_classifier_bench [saved_page.html ...]
+"""
+
+import os
+import random
+import sys
+import time
+from urllib.parse import urljoin, urlparse
+
+from bs4 import BeautifulSoup
+
+from modules.link_classifier import PATH_PATTERN, TEXT_KEYWORDS, URL_KEYWORDS, link_classifier_for
+
+DEFAULT_PAGES = [os.path.join(os.path.dirname(os.path.dirname(__file__)), "try.html")]
+SPECIALTIES = ["Cardiologist", "Gynecologist", "Orthopedic Surgeon"]
+
+
+def synthetic_sitemap_page(links=5000, seed=3):
+    rng = random.Random(seed)
+    sections = ["doctors", "departments", "services", "news", "blog", "locations", "careers", "patients", "about"]
+    words = ["cardiology", "heart", "care", "ivf", "clinic", "dr", "rao", "team", "visit", "info", "health", "wing"]
+    anchors = []
+    for i in range(links):
+        path = "/".join(rng.choice(words) for _ in range(rng.randint(1, 3)))
+        text = " ".join(rng.choice(words) for _ in range(rng.randint(1, 4)))
+        anchors.append(f'<a href="/{rng.choice(sections)}/{path}-{i}/">{text}</a>')
+    return "<html><body>" + "".join(anchors) + "</body></html>"
+
+
+def extract_links(html, base_url="https://hospital.example/"):
+    soup = BeautifulSoup(html, "html.parser")
+    return [
+        (
+            link.get_text(strip=True).lower(),
+            link.get("title", "").lower(),
+            urlparse(urljoin(base_url, link["href"])).path.lower(),
+        )
+        for link in soup.find_all("a", href=True)
+    ]
+
+
+def keyword_scan(links, doctor_type):
+    doctor_keywords = TEXT_KEYWORDS + (doctor_type.lower(),)
+    url_keywords = URL_KEYWORDS + (doctor_type.lower(),)
+    return [
+        bool(
+            (text and any(keyword in text for keyword in doctor_keywords))
+            or (title and any(keyword in title for keyword in doctor_keywords))
+            or any(keyword in url_path for keyword in url_keywords)
+            or PATH_PATTERN.search(url_path)
+        )
+        for text, title, url_path in links
+    ]
+
+
+def compiled_scan(links, doctor_type):
+    classifier = link_classifier_for(doctor_type)
+    return [classifier.is_relevant(text, title, url_path) for text, title, url_path in links]
+
+
+def best_of(function, *args, repeat=5):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = function(*args)
+        timings.append(time.perf_counter() - start)
+    return min(timings), result
+
+
+def main(paths):
+    pages = {}
+    for path in paths:
+        with open(path, "r", encoding="utf-8") as file:
+            pages[os.path.basename(path)] = file.read()
+    pages["synthetic-sitemap (5000 links)"] = synthetic_sitemap_page()
+
+    print(f"{'page':32} {'links':>6} {'keyword scan':>14} {'compiled':>10} {'speedup':>8}")
+    for name, html in pages.items():
+        links = extract_links(html)
+        old_total = new_total = 0.0
+        for doctor_type in SPECIALTIES:
+            old_time, old_result = best_of(keyword_scan, links, doctor_type)
+            new_time, new_result = best_of(compiled_scan, links, doctor_type)
+            assert old_result == new_result, f"classifiers disagree on {name} for {doctor_type}"
+            old_total += old_time
+            new_total += new_time
+        print(f"{name:32} {len(links):>6} {old_total * 1000:>11.2f} ms {new_total * 1000:>7.2f} ms {old_total / new_total:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:] or DEFAULT_PAGES)
@@ -0,0 +1,76 @@
+"""
+Benchmark for modules.place_ranking on synthetic Places results.
+
+Compares a per-place Python scoring loop with full sort against the vectorised NumPy scorer
+with top-k partial selection.
+
+Usage (from Backend/):
+    python -m benchmarks.place_ranking_bench [place_count]
+"""
+
+import math
+import random
+import sys
+import time
+
+from modules.geo_index import haversine_m
+from modules.place_ranking import DEFAULT_WEIGHTS, rank_places
+
+USER = (12.9716, 77.5946)
+RADIUS = 5000
+TOP_K = 10
+
+
+def synthetic_places(count, seed=5):
+    rng = random.Random(seed)
+    places = []
+    for i in range(count):
+        place = {
+            "place_id": f"place-{i}",
+            "geometry": {"location": {"lat": USER[0] + rng.uniform(-0.06, 0.06), "lng": USER[1] + rng.uniform(-0.06, 0.06)}},
+        }
+        if rng.random() > 0.1:
+            place["rating"] = round(rng.uniform(1, 5), 1)
+            place["user_ratings_total"] = rng.randint(0, 20000)
+        places.append(place)
+    return places
+
+
+def python_rank(places, lat, lon, k):
+    max_reviews = math.log1p(max(place.get("user_ratings_total", 0) for place in places))
+    scored = []
+    for index, place in enumerate(places):
+        location = place["geometry"]["location"]
+        distance = haversine_m(lat, lon, location["lat"], location["lng"])
+        score = (
+            DEFAULT_WEIGHTS["distance"] * max(0.0, 1 - distance / RADIUS)
+            + DEFAULT_WEIGHTS["rating"] * place.get("rating", 0) / 5
+            + DEFAULT_WEIGHTS["popularity"] * math.log1p(place.get("user_ratings_total", 0)) / max_reviews
+        )
+        scored.append((-score, distance, index))
+    scored.sort()
+    return [places[index] for _, _, index in scored[:k]]
+
+
+def best_of(function, *args, repeat=5):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = function(*args)
+        timings.append(time.perf_counter() - start)
+    return min(timings), result
+
+
+def main(count):
+    places = synthetic_places(count)
+    python_time, expected = best_of(python_rank, places, *USER, TOP_K)
+    numpy_time, ranked = best_of(lambda: rank_places(places, *USER, k=TOP_K, radius=RADIUS))
+    assert [p["place_id"] for p in ranked] == [p["place_id"] for p in expected], "rankings disagree"
+
+    print(f"{count} places, top {TOP_K}")
+    print(f"  python loop + sort   {python_time * 1000:8.2f} ms")
+    print(f"  numpy + argpartition {numpy_time * 1000:8.2f} ms  ({python_time / numpy_time:.1f}x)")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 10000)
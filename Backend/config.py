@@ -3,6 +3,8 @@ from flask import Flask
 from flask_sqlalchemy import SQLAlchemy
 from flask_session import Session  # For server-side session managementAdd commentMore actions
 from flasgger import Swagger
+from modules.job_queue import JobQueue
+from modules.crawler_http import CrawlerHttp
 
 app = Flask(__name__, static_folder="../Frontend")
 app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///database.db'
@@ -41,4 +43,16 @@ swagger_template = {
 
 swagger = Swagger(app, config=swagger_config, template=swagger_template)
 
-db = SQLAlchemy(app)
\ No newline at end of file
+db = SQLAlchemy(app)
+
+# Background jobs for long-running scrapes, stored next to the app database
+app.config["JOB_WORKERS"] = 2
+job_queue = JobQueue(os.path.join(app.instance_path, "jobs.db"))
+
+# One HTTP layer for every hospital scraper, so per-domain politeness spacing is shared
+crawler_http = CrawlerHttp(cache_dir=os.path.join(app.instance_path, "crawl_cache"))
+
+# Places API endpoint; point it at a places_standin.py server to run without Google
+app.config["PLACES_BASE_URL"] = os.environ.get("PLACES_BASE_URL", "https://maps.googleapis.com/maps/api/place")
+# When set, real Places responses are saved here as fixtures for places_standin.py
+app.config["PLACES_RECORD_DIR"] = os.environ.get("PLACES_RECORD_DIR")
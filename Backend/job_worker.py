@@ -0,0 +1,29 @@
+"""
+Runs background job workers as separate processes, so long scrapes never tie up web workers.
+
+Usage:
+    python job_worker.py            # one worker per JOB_WORKERS setting
+    python job_worker.py 4          # four worker processes
+"""
+
+import sys
+from multiprocessing import Process
+
+
+def run_worker():
+    # Importing the app registers every route module, and with them their job handlers
+    from app import app
+    from config import job_queue
+    job_queue.work(app)
+
+
+if __name__ == "__main__":
+    from config import app
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else app.config["JOB_WORKERS"]
+
+    workers = [Process(target=run_worker, name=f"job-worker-{number}") for number in range(1, count + 1)]
+    for worker in workers:
+        worker.start()
+    print(f"Started {count} job workers")
+    for worker in workers:
+        worker.join()
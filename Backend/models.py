@@ -1,4 +1,7 @@
+import re
 from datetime import datetime, timezone
+from sqlalchemy import inspect, text
+from sqlalchemy.schema import CreateTable
 from config import db
 from werkzeug.security import generate_password_hash, check_password_hash
 
@@ -35,6 +38,11 @@ class Hospitals(db.Model):
     rating = db.Column(db.Numeric(2,1), nullable=True)
     num_rating = db.Column(db.Integer, nullable=True)
     type = db.Column(db.String, nullable=True)
+    opening_hours_json = db.Column(db.Text, nullable=True)
+    # When each group of Google place details was last refreshed
+    contact_updated_at = db.Column(db.DateTime, nullable=True)
+    rating_updated_at = db.Column(db.DateTime, nullable=True)
+    hours_updated_at = db.Column(db.DateTime, nullable=True)
 
     def to_dict(self):
             return {
@@ -67,6 +75,10 @@ class Pharmacy(db.Model):
     opening_hours_json = db.Column(db.Text, nullable=True)
     business_status = db.Column(db.String(50), nullable=True)
     delivery_available = db.Column(db.Boolean, default=False)
+    # When each group of Google place details was last refreshed
+    contact_updated_at = db.Column(db.DateTime, nullable=True)
+    rating_updated_at = db.Column(db.DateTime, nullable=True)
+    hours_updated_at = db.Column(db.DateTime, nullable=True)
     
     def to_dict(self):
         return {
@@ -91,11 +103,34 @@ class Doctors(db.Model):
     name = db.Column(db.String, nullable=False)
     hospital_id = db.Column(db.Integer, db.ForeignKey('hospitals.hospital_id'), nullable=False)
     specialization = db.Column(db.String, nullable=False)
-    experience = db.Column(db.Integer, nullable=False)
+    experience = db.Column(db.Integer, nullable=True)  # Not published by most hospital websites
     rating = db.Column(db.Numeric(2,1), nullable=True)
     num_rating = db.Column(db.Integer, nullable=True)
+    designation = db.Column(db.String, nullable=True)
+    contact = db.Column(db.String, nullable=True)
+    image_url = db.Column(db.String, nullable=True)
+    source_url = db.Column(db.String, nullable=True)  # Hospital page the doctor was scraped from
+    scraped_for = db.Column(db.String, nullable=True)  # Specialty searched when the page was scraped
+    updated_at = db.Column(db.DateTime, nullable=True)
     hospital = db.relationship('Hospitals', backref='doctors')
 
+class HospitalCrawls(db.Model):
+    __tablename__ = 'hospital_crawls'
+    hospital_id = db.Column(db.Integer, db.ForeignKey('hospitals.hospital_id'), primary_key=True)
+    doctor_type = db.Column(db.String, primary_key=True)
+    crawled_at = db.Column(db.DateTime, nullable=False)
+    hospital = db.relationship('Hospitals', backref='crawls')
+
+class DoctorPageSnapshots(db.Model):
+    __tablename__ = 'doctor_page_snapshots'
+    snapshot_id = db.Column(db.Integer, primary_key=True, autoincrement=True)
+    hospital_id = db.Column(db.Integer, db.ForeignKey('hospitals.hospital_id'), nullable=False)
+    doctor_type = db.Column(db.String, nullable=False)
+    url = db.Column(db.String, nullable=False)
+    content_hash = db.Column(db.String(64), nullable=False)
+    crawled_at = db.Column(db.DateTime, nullable=False)
+    __table_args__ = (db.UniqueConstraint('hospital_id', 'doctor_type', 'url'),)
+
 class User(db.Model):
     __tablename__ = 'users'
     user_id = db.Column(db.Integer, primary_key=True, autoincrement=True)
@@ -220,3 +255,45 @@ class YogaAsanaImages(db.Model):
             "image_url": self.image_url,
             "display_order": self.display_order
         }
+
+
+def upgrade_schema():
+    """
+    Brings tables created by older versions up to the models. Missing columns are added as
+    nullable columns, and SQLite tables with a column the models now allow to be null are
+    rebuilt, since SQLite cannot drop a NOT NULL constraint in place. db.create_all() only
+    creates missing tables, so older databases would otherwise fail with "no such column"
+    or reject rows that leave such a column empty.
+    """
+    with db.engine.begin() as connection:
+        inspector = inspect(connection)
+        existing_tables = set(inspector.get_table_names())
+        for table in db.metadata.sorted_tables:
+            if table.name not in existing_tables:
+                continue
+            existing = {column["name"]: column for column in inspector.get_columns(table.name)}
+            for column in table.columns:
+                if column.name not in existing:
+                    column_type = column.type.compile(dialect=db.engine.dialect)
+                    connection.execute(text(f'ALTER TABLE "{table.name}" ADD COLUMN "{column.name}" {column_type}'))
+            relaxed = [
+                column for column in table.columns
+                if column.nullable and not column.primary_key
+                and column.name in existing and not existing[column.name]["nullable"]
+            ]
+            if relaxed and db.engine.dialect.name == "sqlite":
+                _rebuild_sqlite_table(connection, table)
+
+
+def _rebuild_sqlite_table(connection, table):
+    # SQLite's documented recipe: create the new table, copy the rows, drop the old one, rename
+    new_name = f"_new_{table.name}"
+    create = str(CreateTable(table).compile(dialect=connection.dialect)).strip()
+    create = re.sub(rf'^CREATE TABLE "?{re.escape(table.name)}"?', f'CREATE TABLE "{new_name}"', create, count=1)
+    connection.execute(text(create))
+    columns = ", ".join(f'"{column.name}"' for column in table.columns)
+    connection.execute(text(f'INSERT INTO "{new_name}" ({columns}) SELECT {columns} FROM "{table.name}"'))
+    connection.execute(text(f'DROP TABLE "{table.name}"'))
+    connection.execute(text(f'ALTER TABLE "{new_name}" RENAME TO "{table.name}"'))
+    for index in table.indexes:
+        index.create(connection)
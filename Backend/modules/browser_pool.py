@@ -0,0 +1,108 @@
+import atexit
+import threading
+import time
+from contextlib import contextmanager
+from selenium.common.exceptions import TimeoutException
+
+
+class BrowserPool:
+    """
+    Pool of warm headless browsers shared by every rendering call.
+    Browsers are created lazily up to `size`, handed out one caller at a time and cleaned
+    between uses. A browser is retired after `max_pages` pages, or straight away if it
+    raised anything other than a page-load timeout, since a crashed Chrome cannot be trusted.
+    """
+
+    def __init__(self, factory, size=2, max_pages=50, checkout_timeout=120):
+        self.factory = factory
+        self.size = size
+        self.max_pages = max_pages
+        self.checkout_timeout = checkout_timeout
+        self.idle = []
+        self.lock = threading.Lock()
+        # Signalled whenever a browser is returned or retired, so waiting callers can take or replace it
+        self.available = threading.Condition(self.lock)
+        self.created = 0
+        self.page_counts = {}
+        self.stats = {"launched": 0, "reused": 0, "recycled": 0, "crashed": 0}
+        atexit.register(self.close)
+
+    def checkout(self):
+        deadline = time.monotonic() + self.checkout_timeout
+        with self.available:
+            while not self.idle and self.created >= self.size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise TimeoutError(f"No browser became free within {self.checkout_timeout} seconds")
+                self.available.wait(remaining)
+            if self.idle:
+                self.stats["reused"] += 1
+                return self.idle.pop()
+            self.created += 1
+
+        try:
+            driver = self.factory()
+        except Exception:
+            with self.available:
+                self.created -= 1
+                self.available.notify()
+            raise
+        self.page_counts[id(driver)] = 0
+        self._count("launched")
+        return driver
+
+    def checkin(self, driver, broken=False):
+        pages = self.page_counts.get(id(driver), 0) + 1
+        self.page_counts[id(driver)] = pages
+
+        if not broken:
+            try:
+                # Drop the captured traffic and site state left by the previous page
+                del driver.requests
+                driver.delete_all_cookies()
+            except Exception:
+                broken = True
+
+        if broken or pages >= self.max_pages:
+            self._count("crashed" if broken else "recycled")
+            self._retire(driver)
+        else:
+            with self.available:
+                self.idle.append(driver)
+                self.available.notify()
+
+    @contextmanager
+    def browser(self):
+        driver = self.checkout()
+        broken = False
+        try:
+            yield driver
+        except TimeoutException:
+            raise
+        except Exception:
+            broken = True
+            raise
+        finally:
+            self.checkin(driver, broken)
+
+    def _retire(self, driver):
+        self.page_counts.pop(id(driver), None)
+        with self.available:
+            self.created -= 1
+            self.available.notify()
+        try:
+            driver.quit()
+        except Exception as e:
+            print(f"Error closing browser: {str(e)}")
+
+    def _count(self, event):
+        with self.lock:
+            self.stats[event] += 1
+
+    def close(self):
+        while True:
+            with self.lock:
+                if not self.idle:
+                    break
+                driver = self.idle.pop()
+            self._retire(driver)
@@ -2,17 +2,27 @@ import os
 from dotenv import load_dotenv
 from groq import Groq
 import json
+from modules import outbound
 
 load_dotenv()
 
 class Chatbot:
-    def __init__(self, api_key, system_prompt=""):
+    def __init__(self, api_key, system_prompt="", timeout=30, governor=None):
         self.api_key = api_key
-        self.client = Groq(api_key=self.api_key)
+        # Retries are left to the shared groq_chat upstream guard
+        self.client = Groq(api_key=self.api_key, timeout=timeout, max_retries=0)
         self.system_prompt = system_prompt
+        self.upstream = (governor or outbound.governor).upstream("groq_chat")
+
+    def complete(self, messages, model="llama-3.3-70b-versatile", **kwargs):
+        """
+        Chat completion through the groq_chat upstream guard. Raises outbound.OutboundError
+        straight away while Groq is unavailable or the request budget is spent.
+        """
+        return self.upstream.call(self.client.chat.completions.create, messages=messages, model=model, **kwargs)
 
     def get_response(self, user_input, history={"user": "", "assistant": ""}):
-        chat_completion = self.client.chat.completions.create(
+        chat_completion = self.complete(
             messages=[
                 {
 
@@ -32,7 +42,6 @@ class Chatbot:
                     "content": user_input,
                 }
             ],
-            model="llama-3.3-70b-versatile",
         )
         try:
             response = chat_completion.choices[0].message.content
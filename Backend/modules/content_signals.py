@@ -0,0 +1,79 @@
+import json
+import re
+
+# "Dr. Asha Rao", "Dr Asha", "DR. K. RAO"
+DOCTOR_NAME_PATTERN = re.compile(r"\bD[Rr]\.?\s+(?:[A-Z]\.?\s*)*[A-Z][A-Za-z]+")
+SPECIALTY_TERMS = re.compile(
+    r"cardiolog|neurolog|orthop(?:a)?edic|pa?ediatric|gyn(?:a)?ecolog|obstetric|oncolog|dermatolog|psychiatr|"
+    r"radiolog|surgeon|surgery|physician|consultant|urolog|nephrolog|gastroenterolog|ophthalmolog|ent specialist|"
+    r"endocrinolog|pulmonolog|rheumatolog|geriatric|internal medicine|general medicine|mbbs|\bdnb\b|frcs|mrcp",
+    re.IGNORECASE,
+)
+JSON_LD_PATTERN = re.compile(
+    r"<script[^>]+type=[\"']application/ld\+json[\"'][^>]*>(.*?)</script>", re.IGNORECASE | re.DOTALL
+)
+APP_SHELL_PATTERN = re.compile(r"<div[^>]+id=[\"'](?:root|app|__next|___gatsby)[\"'][^>]*>\s*</div>", re.IGNORECASE)
+TAG_PATTERN = re.compile(r"<(script|style|noscript)[^>]*>.*?</\1>|<[^>]+>", re.IGNORECASE | re.DOTALL)
+
+
+def json_ld_blocks(html):
+    """Every JSON-LD object on the page, with @graph containers flattened"""
+    blocks = []
+    for raw in JSON_LD_PATTERN.findall(html):
+        try:
+            data = json.loads(raw.strip())
+        except ValueError:
+            continue
+        pending = data if isinstance(data, list) else [data]
+        while pending:
+            item = pending.pop(0)
+            if not isinstance(item, dict):
+                continue
+            if isinstance(item.get("@graph"), list):
+                pending.extend(item["@graph"])
+            blocks.append(item)
+    return blocks
+
+
+def _types(block):
+    types = block.get("@type", [])
+    types = types if isinstance(types, list) else [types]
+    return {str(value).lower() for value in types}
+
+
+def specialty_stems(doctor_type):
+    # "Cardiologist" also matches "cardiology", "orthopedic surgeon" matches either word
+    stems = set()
+    for word in re.findall(r"[a-z]+", doctor_type.lower()):
+        if len(word) >= 4:
+            stems.add(word[:max(4, len(word) - 3)])
+    return stems
+
+
+def doctor_signals(html, doctor_type=""):
+    """
+    Cheap signals for whether a fetched page already shows doctors, without rendering it:
+    doctor names, specialty terms, JSON-LD people and the amount of visible text.
+    """
+    text = re.sub(r"\s+", " ", TAG_PATTERN.sub(" ", html))
+    lowered = text.lower()
+    people = [block for block in json_ld_blocks(html) if _types(block) & {"physician", "person"}]
+    return {
+        "doctor_names": len(set(DOCTOR_NAME_PATTERN.findall(text))),
+        "specialty_terms": len(SPECIALTY_TERMS.findall(text)),
+        "requested_specialty": any(stem in lowered for stem in specialty_stems(doctor_type)),
+        "json_ld_people": len(people),
+        "text_length": len(text.strip()),
+        "app_shell": bool(APP_SHELL_PATTERN.search(html)),
+    }
+
+
+def has_doctor_content(signals):
+    """True when the static HTML is good enough to extract doctors from without a browser"""
+    if signals["json_ld_people"]:
+        return True
+    if signals["app_shell"] and signals["text_length"] < 1000:
+        return False
+    if signals["doctor_names"] >= 3:
+        return True
+    return signals["doctor_names"] >= 1 and (signals["requested_specialty"] or signals["specialty_terms"] >= 2)
@@ -0,0 +1,200 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+
+
+class CrawlFrontier:
+    """
+    Persistent priority frontier of hospital website crawls stored in a local SQLite file.
+    Rows are kept per (domain, specialty): every URL the crawl should visit, its link score,
+    depth, status and when it was last fetched. Workers in any thread or process lease the
+    best-scored pending URL atomically, so concurrent searches for the same hospital split the
+    crawl instead of repeating it. A crawl round fetches at most max_pages URLs per
+    recrawl_after window, failed fetches included, and keeps the max_links best-scored links;
+    later searches reuse the links found until the window passes, and a lease left behind by
+    a dead worker is picked up again once it runs out.
+    With db_path ":memory:" the frontier lives in one connection and is only shared within
+    this object, for scrapers that do not share crawls.
+    """
+
+    def __init__(self, db_path, lease_seconds=120, recrawl_after=7 * 86400, max_links=50):
+        self.db_path = db_path
+        self.max_links = max_links
+        self.lease_seconds = lease_seconds
+        self.recrawl_after = recrawl_after
+        self.memory = None
+        if db_path == ":memory:":
+            self.memory = sqlite3.connect(db_path, isolation_level=None, check_same_thread=False)
+            self.memory.row_factory = sqlite3.Row
+            self.memory_lock = threading.Lock()
+
+        directory = os.path.dirname(db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with self._connection() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS frontier (
+                    domain TEXT NOT NULL,
+                    specialty TEXT NOT NULL,
+                    url_key TEXT NOT NULL,
+                    url TEXT NOT NULL,
+                    score REAL NOT NULL DEFAULT 0,
+                    depth INTEGER NOT NULL DEFAULT 0,
+                    relevant INTEGER NOT NULL DEFAULT 0,
+                    status TEXT NOT NULL DEFAULT 'pending',
+                    worker TEXT,
+                    lease_until REAL,
+                    last_fetched REAL,
+                    attempts INTEGER NOT NULL DEFAULT 0,
+                    discovered_at REAL NOT NULL,
+                    PRIMARY KEY (domain, specialty, url_key)
+                )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_frontier_status ON frontier (domain, specialty, status, score)")
+            # How each crawl last found its doctor pages, so repeat searches skip re-reading sitemaps
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS discoveries (
+                    domain TEXT NOT NULL,
+                    specialty TEXT NOT NULL,
+                    method TEXT NOT NULL,
+                    urls TEXT NOT NULL,
+                    discovered_at REAL NOT NULL,
+                    PRIMARY KEY (domain, specialty)
+                )
+            """)
+
+    @contextmanager
+    def _connection(self):
+        if self.memory is not None:
+            # The in-memory database exists only on this connection, so threads take turns on it
+            with self.memory_lock:
+                yield self.memory
+            return
+        # Autocommit connection; lease() opens its own write transaction
+        conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        try:
+            yield conn
+        finally:
+            conn.close()
+
+    def seed(self, domain, specialty, url_key, url):
+        with self._connection() as conn:
+            conn.execute(
+                "INSERT OR IGNORE INTO frontier (domain, specialty, url_key, url, discovered_at) VALUES (?, ?, ?, ?, ?)",
+                (domain, specialty, url_key, url, time.time()),
+            )
+
+    def add_links(self, domain, specialty, links, depth):
+        """
+        Records relevant links as (url_key, url, score); a known URL keeps its best score.
+        Links beyond the max_links best-scored ones of the crawl are dropped unless fetched.
+        """
+        now = time.time()
+        with self._connection() as conn:
+            conn.executemany(
+                "INSERT INTO frontier (domain, specialty, url_key, url, score, depth, relevant, discovered_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, 1, ?) "
+                "ON CONFLICT (domain, specialty, url_key) DO UPDATE SET "
+                "score = MAX(score, excluded.score), depth = MIN(depth, excluded.depth), relevant = 1",
+                [(domain, specialty, url_key, url, score, depth, now) for url_key, url, score in links],
+            )
+            conn.execute(
+                "DELETE FROM frontier WHERE domain = ? AND specialty = ? AND status = 'pending' AND depth > 0 "
+                "AND url_key NOT IN (SELECT url_key FROM frontier WHERE domain = ? AND specialty = ? AND relevant = 1 "
+                "ORDER BY score DESC, LENGTH(url_key) LIMIT ?)",
+                (domain, specialty, domain, specialty, self.max_links),
+            )
+
+    def lease(self, domain, specialty, worker_id, max_pages):
+        """
+        Atomically leases the best pending URL of this crawl to worker_id. Returns None once
+        the round has used max_pages fetches (finished, failed or in flight), or nothing is left to fetch.
+        """
+        now = time.time()
+        round_start = now - self.recrawl_after
+        with self._connection() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                used = conn.execute(
+                    "SELECT COUNT(*) FROM frontier WHERE domain = ? AND specialty = ? AND ("
+                    "(status IN ('done', 'failed') AND last_fetched >= ?) OR (status = 'leased' AND lease_until >= ?))",
+                    (domain, specialty, round_start, now),
+                ).fetchone()[0]
+                row = None
+                if used < max_pages:
+                    row = conn.execute(
+                        "SELECT url_key, url, depth FROM frontier WHERE domain = ? AND specialty = ? AND ("
+                        "status = 'pending' OR (status = 'leased' AND lease_until < ?) "
+                        "OR (status IN ('done', 'failed') AND last_fetched < ?)) "
+                        # The homepage (depth 0) goes first, then links best score first
+                        "ORDER BY depth > 0, score DESC, depth, LENGTH(url_key) LIMIT 1",
+                        (domain, specialty, now, round_start),
+                    ).fetchone()
+                if row is None:
+                    conn.execute("COMMIT")
+                    return None
+                conn.execute(
+                    "UPDATE frontier SET status = 'leased', worker = ?, lease_until = ?, attempts = attempts + 1 "
+                    "WHERE domain = ? AND specialty = ? AND url_key = ?",
+                    (worker_id, now + self.lease_seconds, domain, specialty, row["url_key"]),
+                )
+                conn.execute("COMMIT")
+                return {"url_key": row["url_key"], "url": row["url"], "depth": row["depth"]}
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+
+    def complete(self, domain, specialty, url_key, failed=False):
+        with self._connection() as conn:
+            conn.execute(
+                "UPDATE frontier SET status = ?, lease_until = NULL, last_fetched = ? "
+                "WHERE domain = ? AND specialty = ? AND url_key = ?",
+                ("failed" if failed else "done", time.time(), domain, specialty, url_key),
+            )
+
+    def in_flight(self, domain, specialty):
+        """Number of URLs of this crawl currently leased by some worker"""
+        with self._connection() as conn:
+            return conn.execute(
+                "SELECT COUNT(*) FROM frontier WHERE domain = ? AND specialty = ? AND status = 'leased' AND lease_until >= ?",
+                (domain, specialty, time.time()),
+            ).fetchone()[0]
+
+    def links(self, domain, specialty):
+        """(scores, urls): the relevant links found so far, both keyed by url_key"""
+        with self._connection() as conn:
+            rows = conn.execute(
+                "SELECT url_key, url, score FROM frontier WHERE domain = ? AND specialty = ? AND relevant = 1",
+                (domain, specialty),
+            ).fetchall()
+        return {row["url_key"]: row["score"] for row in rows}, {row["url_key"]: row["url"] for row in rows}
+
+    def record_discovery(self, domain, specialty, method, urls):
+        """Remembers how this crawl found its doctor pages: "sitemap" with their urls, or "crawl" """
+        with self._connection() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO discoveries (domain, specialty, method, urls, discovered_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (domain, specialty, method, json.dumps(urls), time.time()),
+            )
+
+    def discovery(self, domain, specialty):
+        """(method, urls) recorded for this crawl within the recrawl_after window, else None"""
+        with self._connection() as conn:
+            row = conn.execute(
+                "SELECT method, urls FROM discoveries WHERE domain = ? AND specialty = ? AND discovered_at >= ?",
+                (domain, specialty, time.time() - self.recrawl_after),
+            ).fetchone()
+        return (row["method"], json.loads(row["urls"])) if row else None
+
+    def stats(self):
+        with self._connection() as conn:
+            rows = conn.execute("SELECT status, COUNT(*) FROM frontier GROUP BY status").fetchall()
+        counts = {"pending": 0, "leased": 0, "done": 0, "failed": 0}
+        counts.update({row[0]: row[1] for row in rows})
+        return counts
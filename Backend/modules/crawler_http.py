@@ -0,0 +1,197 @@
+import hashlib
+import json
+import os
+import threading
+import time
+import requests
+from requests.adapters import HTTPAdapter
+from urllib.parse import urlparse
+from urllib.robotparser import RobotFileParser
+
+DEFAULT_USER_AGENT = "ShravanBot/1.0 (+doctor finder for senior citizens)"
+
+
+class RobotsDisallowed(Exception):
+    pass
+
+
+class CrawlResponse:
+    """The parts of an HTTP response the crawler needs, whether fetched or served from disk"""
+
+    def __init__(self, url, status_code, text, headers, from_cache=False):
+        self.url = url
+        self.status_code = status_code
+        self.text = text
+        self.headers = headers
+        self.from_cache = from_cache
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise requests.HTTPError(f"{self.status_code} error for url: {self.url}")
+
+
+class CrawlerHttp:
+    """
+    HTTP layer for crawling hospital websites.
+    Uses one pooled session, keeps responses on disk and revalidates them with
+    ETag/Last-Modified, respects cached robots.txt rules and spaces out requests to the
+    same domain, so recrawls of a hospital mostly resolve as local hits or 304s.
+    """
+
+    def __init__(self, cache_dir=None, user_agent=DEFAULT_USER_AGENT, timeout=10, min_interval=1.0,
+                 fresh_for=3600, robots_ttl=86400, pool_size=10):
+        self.cache_dir = cache_dir
+        self.user_agent = user_agent
+        self.timeout = timeout
+        self.min_interval = min_interval
+        self.fresh_for = fresh_for
+        self.robots_ttl = robots_ttl
+
+        self.session = requests.Session()
+        self.session.headers["User-Agent"] = user_agent
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+        self.lock = threading.Lock()
+        self.robots = {}
+        self.domain_locks = {}
+        self.last_request = {}
+        self.stats = {"fetched": 0, "not_modified": 0, "cache_hits": 0, "robots_blocked": 0}
+
+        if cache_dir:
+            os.makedirs(cache_dir, exist_ok=True)
+
+    def _count(self, event):
+        with self.lock:
+            self.stats[event] += 1
+
+    def _domain_lock(self, netloc):
+        with self.lock:
+            return self.domain_locks.setdefault(netloc, threading.Lock())
+
+    def _polite_get(self, url, headers=None, stream=False):
+        # Requests to one domain are serialised and spaced at least min_interval (or the
+        # robots.txt crawl-delay) apart; different domains proceed in parallel
+        netloc = urlparse(url).netloc
+        with self._domain_lock(netloc):
+            delay = max(self.min_interval, self._crawl_delay(netloc))
+            wait = self.last_request.get(netloc, 0) + delay - time.monotonic()
+            if wait > 0:
+                time.sleep(wait)
+            try:
+                return self.session.get(url, headers=headers, timeout=self.timeout, stream=stream)
+            finally:
+                self.last_request[netloc] = time.monotonic()
+
+    def _robots_for(self, url):
+        parsed = urlparse(url)
+        netloc = parsed.netloc
+        with self.lock:
+            cached = self.robots.get(netloc)
+        if cached and time.time() - cached[0] < self.robots_ttl:
+            return cached[1]
+
+        parser = RobotFileParser()
+        robots_url = f"{parsed.scheme}://{netloc}/robots.txt"
+        try:
+            response = self._polite_get(robots_url)
+            # As urllib.robotparser: a protected robots.txt forbids everything, a missing one nothing
+            if response.status_code in (401, 403):
+                parser.disallow_all = True
+            elif response.status_code >= 400:
+                parser.allow_all = True
+            else:
+                parser.parse(response.text.splitlines())
+        except Exception:
+            # An unreachable robots.txt is treated as no restrictions
+            parser.allow_all = True
+        with self.lock:
+            self.robots[netloc] = (time.time(), parser)
+        return parser
+
+    def _crawl_delay(self, netloc):
+        with self.lock:
+            cached = self.robots.get(netloc)
+        if not cached:
+            return 0
+        return cached[1].crawl_delay(self.user_agent) or 0
+
+    def allowed(self, url):
+        return self._robots_for(url).can_fetch(self.user_agent, url)
+
+    def sitemaps(self, url):
+        """Sitemap URLs listed in the robots.txt of url's site"""
+        return self._robots_for(url).site_maps() or []
+
+    def _cache_path(self, url):
+        return os.path.join(self.cache_dir, hashlib.sha256(url.encode("utf-8")).hexdigest() + ".json")
+
+    def _load(self, url):
+        if not self.cache_dir:
+            return None
+        try:
+            with open(self._cache_path(url), "r", encoding="utf-8") as file:
+                return json.load(file)
+        except (OSError, ValueError):
+            return None
+
+    def _save(self, url, entry):
+        if not self.cache_dir:
+            return
+        path = self._cache_path(url)
+        temp_path = f"{path}.{threading.get_ident()}.tmp"
+        with open(temp_path, "w", encoding="utf-8") as file:
+            json.dump(entry, file)
+        os.replace(temp_path, path)
+
+    def get(self, url):
+        """Fetch a page, answering from the disk cache or a conditional request where possible"""
+        if not self.allowed(url):
+            self._count("robots_blocked")
+            raise RobotsDisallowed(f"robots.txt disallows {url}")
+
+        entry = self._load(url)
+        if entry and time.time() - entry["fetched_at"] < self.fresh_for:
+            self._count("cache_hits")
+            return CrawlResponse(url, entry["status_code"], entry["text"], entry["headers"], from_cache=True)
+
+        headers = {}
+        if entry and entry["headers"].get("ETag"):
+            headers["If-None-Match"] = entry["headers"]["ETag"]
+        if entry and entry["headers"].get("Last-Modified"):
+            headers["If-Modified-Since"] = entry["headers"]["Last-Modified"]
+
+        response = self._polite_get(url, headers=headers)
+        if response.status_code == 304 and entry:
+            self._count("not_modified")
+            entry["fetched_at"] = time.time()
+            self._save(url, entry)
+            return CrawlResponse(url, entry["status_code"], entry["text"], entry["headers"], from_cache=True)
+
+        self._count("fetched")
+        kept_headers = {
+            name: response.headers[name]
+            for name in ("ETag", "Last-Modified", "Content-Type")
+            if name in response.headers
+        }
+        if response.status_code == 200:
+            self._save(url, {
+                "status_code": response.status_code,
+                "text": response.text,
+                "headers": kept_headers,
+                "fetched_at": time.time(),
+            })
+        return CrawlResponse(response.url, response.status_code, response.text, kept_headers)
+
+    def stream(self, url):
+        """
+        Streaming GET for large documents such as sitemaps, which bypass the disk cache.
+        The caller reads response.raw and must close the response.
+        """
+        if not self.allowed(url):
+            self._count("robots_blocked")
+            raise RobotsDisallowed(f"robots.txt disallows {url}")
+        response = self._polite_get(url, stream=True)
+        self._count("fetched")
+        return response
@@ -0,0 +1,178 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from modules.page_fingerprint import DuplicatePage, PageFingerprints
+
+
+class DoctorFinderPipeline:
+    """
+    Staged doctor finder: place details -> doctor page discovery -> page fetch/render -> LLM extraction.
+    Every stage has its own worker pool and hands work to the next stage as soon as an item is
+    ready, so one hospital's pages can be rendering while another's links are still being found.
+    The total time approaches the slowest single hospital chain instead of the sum of all of them.
+    """
+
+    def __init__(self, nearby_places, web_scraper, link_workers=4, render_workers=2, extract_workers=4,
+                 pages_per_hospital=3, deadline=300, store=None):
+        self.nearby_places = nearby_places
+        self.web_scraper = web_scraper
+        self.store = store
+        self.pages_per_hospital = pages_per_hospital
+        self.deadline = deadline
+        # Rendering launches a headless Chrome per worker, so it gets the smallest pool
+        self.link_pool = ThreadPoolExecutor(max_workers=link_workers, thread_name_prefix="doctor-links")
+        self.render_pool = ThreadPoolExecutor(max_workers=render_workers, thread_name_prefix="doctor-render")
+        self.extract_pool = ThreadPoolExecutor(max_workers=extract_workers, thread_name_prefix="doctor-extract")
+
+    def run(self, place_ids, specialist, place_type="hospital", progress=None):
+        """
+        Runs every stage for the given places and returns the scrape results keyed by place_id.
+        Hospitals still in flight when the deadline passes keep whatever pages finished.
+        progress(fraction, message), when given, is called as each page finishes.
+        With a DoctorStore, freshly crawled hospitals are served from the database, unchanged
+        pages reuse their stored doctors and new results are saved once the run ends.
+        """
+        state = _PipelineRun(progress)
+        started = time.monotonic()
+
+        for place_id, details in self.nearby_places.iter_place_details(place_ids, place_type):
+            website = details.get('website')
+            name = details.get('name', '')
+            if not website:
+                with state.lock:
+                    state.results[place_id] = {"name": name, "doctor_info": [], "error": "No website found for this place."}
+                continue
+            snapshots = {}
+            if self.store:
+                stored = self.store.fresh_result(place_id, specialist)
+                if stored:
+                    with state.lock:
+                        state.results[place_id] = stored
+                    continue
+                snapshots = self.store.page_snapshots(place_id, specialist)
+            state.submit(self.link_pool, self._discover_links, state, place_id, name, website, specialist, snapshots)
+
+        state.wait(self.deadline - (time.monotonic() - started))
+        results = state.snapshot(place_ids)
+
+        if self.store:
+            for place_id, result in results.items():
+                if "pages" in result and not result.get("cached"):
+                    with state.lock:
+                        content_hashes = dict(state.content_hashes.get(place_id, {}))
+                    try:
+                        self.store.save_result(place_id, specialist, result, content_hashes)
+                    except Exception as e:
+                        # The scrape itself is still returned; the next search will crawl again
+                        result["store_error"] = f"Could not save scraped doctors: {str(e)}"
+        return results
+
+    def _discover_links(self, state, place_id, name, website, specialist, snapshots):
+        doctor_pages = self.web_scraper.find_doctor_page_links(website, specialist)[:self.pages_per_hospital]
+        if not doctor_pages:
+            return
+        with state.lock:
+            state.results[place_id] = {
+                "name": name,
+                "website": website,
+                "doctor_scrape": [None] * len(doctor_pages),
+                "pages": doctor_pages,
+            }
+            state.pages_total += len(doctor_pages)
+        # Pages of one hospital that show the same content are only rendered and extracted once
+        fingerprints = PageFingerprints()
+        for position, page in enumerate(doctor_pages):
+            state.submit(self.render_pool, self._render_page, state, place_id, position, page, specialist, snapshots,
+                         fingerprints)
+
+    def _render_page(self, state, place_id, position, page, specialist, snapshots, fingerprints):
+        try:
+            html, json_responses = self.web_scraper.fetch_page(page, specialist, fingerprints=fingerprints)
+        except DuplicatePage:
+            state.set_page(place_id, position, [])
+            return
+        except Exception as e:
+            state.set_page(place_id, position, f"Error: {str(e)}")
+            return
+        state.submit(self.extract_pool, self._extract_page, state, place_id, position, page, html, json_responses,
+                     specialist, snapshots)
+
+    def _extract_page(self, state, place_id, position, page, html, json_responses, specialist, snapshots):
+        try:
+            body_text = self.web_scraper.page_text(html)
+            content_hash = self.web_scraper.content_hash(body_text)
+            previous = snapshots.get(page)
+            if previous and previous[0] == content_hash:
+                # Same text as the last crawl, so the stored doctors are still correct
+                doctors = previous[1]
+            else:
+                doctors = self.web_scraper.extract_doctor_information(
+                    html, json_responses, specialist, body_text=body_text, url=page
+                )
+            with state.lock:
+                state.content_hashes.setdefault(place_id, {})[page] = content_hash
+        except Exception as e:
+            doctors = f"Error: {str(e)}"
+        state.set_page(place_id, position, doctors)
+
+
+class _PipelineRun:
+    """Results and outstanding task count for a single pipeline run"""
+
+    def __init__(self, progress=None):
+        self.results = {}
+        self.lock = threading.Lock()
+        self.idle = threading.Condition(self.lock)
+        self.outstanding = 0
+        self.progress = progress
+        self.pages_done = 0
+        self.pages_total = 0
+        self.content_hashes = {}
+
+    def submit(self, pool, fn, *args):
+        # Counted before submission so the run cannot look finished while a stage hands off
+        with self.lock:
+            self.outstanding += 1
+        pool.submit(self._run_task, fn, *args)
+
+    def _run_task(self, fn, *args):
+        try:
+            fn(*args)
+        except Exception as e:
+            print(f"Doctor finder stage {fn.__name__} failed: {str(e)}")
+        finally:
+            with self.lock:
+                self.outstanding -= 1
+                if self.outstanding == 0:
+                    self.idle.notify_all()
+
+    def set_page(self, place_id, position, doctors):
+        with self.lock:
+            self.results[place_id]["doctor_scrape"][position] = doctors
+            self.pages_done += 1
+            pages_done, pages_total = self.pages_done, self.pages_total
+        if self.progress:
+            # Page scraping is reported as the 10%-100% span, after the places search
+            self.progress(0.1 + 0.9 * pages_done / pages_total, f"Scraped {pages_done} of {pages_total} pages found so far")
+
+    def snapshot(self, place_ids):
+        # Copied under the lock because stragglers may still write after the deadline
+        with self.lock:
+            snapshot = {}
+            for place_id in place_ids:
+                if place_id in self.results:
+                    result = dict(self.results[place_id])
+                    if "doctor_scrape" in result:
+                        result["doctor_scrape"] = list(result["doctor_scrape"])
+                    snapshot[place_id] = result
+            return snapshot
+
+    def wait(self, timeout):
+        end = time.monotonic() + max(timeout, 0)
+        with self.lock:
+            while self.outstanding:
+                remaining = end - time.monotonic()
+                if remaining <= 0:
+                    print(f"Doctor finder deadline reached with {self.outstanding} tasks still running")
+                    break
+                self.idle.wait(remaining)
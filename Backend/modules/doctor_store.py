@@ -0,0 +1,173 @@
+import logging
+from datetime import timedelta
+from modules.place_cache import utcnow
+
+logger = logging.getLogger(__name__)
+
+
+class DoctorStore:
+    """
+    Keeps scraped doctors in the Doctors table, linked to their hospital by place_id.
+    Each hospital/specialty crawl is timestamped and every scraped page keeps a hash of its
+    text, so repeat searches are answered from the database while the crawl is fresh, and
+    re-crawls only send pages whose text actually changed to the LLM.
+    """
+
+    def __init__(self, db, hospital_model, doctor_model, crawl_model, snapshot_model, ttl=timedelta(days=7)):
+        self.db = db
+        self.hospital_model = hospital_model
+        self.doctor_model = doctor_model
+        self.crawl_model = crawl_model
+        self.snapshot_model = snapshot_model
+        self.ttl = ttl
+
+    def hospital_for(self, place_id):
+        return self.hospital_model.query.filter_by(place_id=place_id).first()
+
+    def _doctor_to_dict(self, doctor):
+        return {
+            "Name": doctor.name,
+            "Designation": doctor.designation,
+            "Specialization": doctor.specialization,
+            "Contact": doctor.contact,
+            "Doctor_Image": doctor.image_url,
+        }
+
+    def fresh_result(self, place_id, doctor_type):
+        """
+        Returns the stored scrape for a hospital, shaped like a pipeline result, when it was
+        crawled for this specialty within the TTL. Returns None when it must be crawled again.
+        """
+        hospital = self.hospital_for(place_id)
+        if hospital is None:
+            return None
+        crawl = self.db.session.get(self.crawl_model, (hospital.hospital_id, doctor_type.lower()))
+        if crawl is None or utcnow() - crawl.crawled_at >= self.ttl:
+            return None
+
+        snapshots = self.snapshot_model.query.filter_by(
+            hospital_id=hospital.hospital_id, doctor_type=doctor_type.lower()
+        ).order_by(self.snapshot_model.snapshot_id).all()
+        pages = [snapshot.url for snapshot in snapshots]
+        return {
+            "name": hospital.hospital_name,
+            "website": hospital.website,
+            "doctor_scrape": [self.page_doctors(hospital.hospital_id, url, doctor_type) for url in pages],
+            "pages": pages,
+            "cached": True,
+        }
+
+    def page_doctors(self, hospital_id, url, doctor_type):
+        doctors = self.doctor_model.query.filter_by(
+            hospital_id=hospital_id, source_url=url, scraped_for=doctor_type.lower()
+        ).all()
+        return [self._doctor_to_dict(doctor) for doctor in doctors]
+
+    def page_snapshots(self, place_id, doctor_type):
+        """{url: (content_hash, doctors)} for every page previously scraped for this hospital"""
+        hospital = self.hospital_for(place_id)
+        if hospital is None:
+            return {}
+        snapshots = self.snapshot_model.query.filter_by(
+            hospital_id=hospital.hospital_id, doctor_type=doctor_type.lower()
+        ).all()
+        return {
+            snapshot.url: (snapshot.content_hash, self.page_doctors(hospital.hospital_id, snapshot.url, doctor_type))
+            for snapshot in snapshots
+        }
+
+    def save_result(self, place_id, doctor_type, result, content_hashes):
+        """
+        Upserts the doctors found on each successfully scraped page and records the crawl.
+        content_hashes maps page url to the hash of the text the doctors were extracted from.
+        A crawl where no page succeeded is not recorded, so the next search crawls again.
+        Raises when the database rejects the result, after rolling the session back.
+        """
+        hospital = self.hospital_for(place_id)
+        if hospital is None:
+            return
+        doctor_type = doctor_type.lower()
+        now = utcnow()
+
+        try:
+            saved = 0
+            for url, doctors in zip(result.get("pages", []), result.get("doctor_scrape", [])):
+                if not isinstance(doctors, list) or url not in content_hashes:
+                    continue
+                self._save_page(hospital, doctor_type, url, doctors, now)
+                snapshot = self.snapshot_model.query.filter_by(
+                    hospital_id=hospital.hospital_id, doctor_type=doctor_type, url=url
+                ).first()
+                if snapshot is None:
+                    snapshot = self.snapshot_model(
+                        hospital_id=hospital.hospital_id, doctor_type=doctor_type, url=url
+                    )
+                    self.db.session.add(snapshot)
+                snapshot.content_hash = content_hashes[url]
+                snapshot.crawled_at = now
+                saved += 1
+            if not saved:
+                return
+
+            # Pages the latest crawl no longer found are dropped along with their doctors
+            pages = set(result.get("pages", []))
+            previous = self.snapshot_model.query.filter_by(
+                hospital_id=hospital.hospital_id, doctor_type=doctor_type
+            ).all()
+            for snapshot in previous:
+                if snapshot.url not in pages:
+                    self.doctor_model.query.filter_by(
+                        hospital_id=hospital.hospital_id, source_url=snapshot.url, scraped_for=doctor_type
+                    ).delete()
+                    self.db.session.delete(snapshot)
+
+            crawl = self.db.session.get(self.crawl_model, (hospital.hospital_id, doctor_type))
+            if crawl is None:
+                crawl = self.crawl_model(hospital_id=hospital.hospital_id, doctor_type=doctor_type)
+                self.db.session.add(crawl)
+            crawl.crawled_at = now
+
+            self.db.session.commit()
+        except Exception:
+            self.db.session.rollback()
+            logger.exception("Error saving scraped doctors for %s", place_id)
+            raise
+
+    def _save_page(self, hospital, doctor_type, url, doctors, now):
+        existing = {
+            doctor.name.lower(): doctor
+            for doctor in self.doctor_model.query.filter_by(
+                hospital_id=hospital.hospital_id, source_url=url, scraped_for=doctor_type
+            ).all()
+        }
+        seen = set()
+        for scraped in doctors:
+            name = _clean(scraped.get("Name")) if isinstance(scraped, dict) else None
+            if not name or name.lower() in seen:
+                continue
+            seen.add(name.lower())
+
+            doctor = existing.get(name.lower())
+            if doctor is None:
+                doctor = self.doctor_model(
+                    hospital_id=hospital.hospital_id, name=name, source_url=url, scraped_for=doctor_type
+                )
+                self.db.session.add(doctor)
+            doctor.specialization = _clean(scraped.get("Specialization")) or doctor_type
+            doctor.designation = _clean(scraped.get("Designation"))
+            doctor.contact = _clean(scraped.get("Contact"))
+            doctor.image_url = _clean(scraped.get("Doctor_Image"))
+            doctor.updated_at = now
+
+        # Doctors that disappeared from the page are no longer listed by the hospital
+        for name, doctor in existing.items():
+            if name not in seen:
+                self.db.session.delete(doctor)
+
+
+def _clean(value):
+    # The LLM is told to return "none" for missing fields
+    if value is None:
+        return None
+    value = str(value).strip()
+    return None if value.lower() in ("", "none", "null", "n/a") else value
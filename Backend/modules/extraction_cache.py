@@ -0,0 +1,89 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+
+
+class ExtractionCache:
+    """
+    Persistent cache of LLM doctor extractions stored in a local SQLite file.
+    Entries are keyed by the hash of the normalised page text, the specialty and the prompt
+    version, so a page whose text has not changed is never sent to the LLM twice. The least
+    recently used entries are evicted once the cache holds more than max_entries results.
+    """
+
+    def __init__(self, db_path, max_entries=5000):
+        self.db_path = db_path
+        self.max_entries = max_entries
+        self.lock = threading.Lock()
+        self.stats = {"hits": 0, "misses": 0, "evictions": 0}
+
+        directory = os.path.dirname(db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with self._connection() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS extractions (
+                    content_hash TEXT NOT NULL,
+                    doctor_type TEXT NOT NULL,
+                    prompt_version TEXT NOT NULL,
+                    result TEXT NOT NULL,
+                    created_at REAL NOT NULL,
+                    last_used REAL NOT NULL,
+                    PRIMARY KEY (content_hash, doctor_type, prompt_version)
+                )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_extractions_last_used ON extractions (last_used)")
+
+    @contextmanager
+    def _connection(self):
+        conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+        try:
+            yield conn
+        finally:
+            conn.close()
+
+    def _count(self, event, amount=1):
+        with self.lock:
+            self.stats[event] += amount
+
+    def get(self, content_hash, doctor_type, prompt_version):
+        """Returns the cached doctor list, or None on a miss"""
+        key = (content_hash, doctor_type.lower(), str(prompt_version))
+        with self._connection() as conn:
+            row = conn.execute(
+                "SELECT result FROM extractions WHERE content_hash = ? AND doctor_type = ? AND prompt_version = ?",
+                key,
+            ).fetchone()
+            if row is None:
+                self._count("misses")
+                return None
+            conn.execute(
+                "UPDATE extractions SET last_used = ? WHERE content_hash = ? AND doctor_type = ? AND prompt_version = ?",
+                (time.time(),) + key,
+            )
+        self._count("hits")
+        return json.loads(row[0])
+
+    def put(self, content_hash, doctor_type, prompt_version, result):
+        now = time.time()
+        with self._connection() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO extractions "
+                "(content_hash, doctor_type, prompt_version, result, created_at, last_used) VALUES (?, ?, ?, ?, ?, ?)",
+                (content_hash, doctor_type.lower(), str(prompt_version), json.dumps(result), now, now),
+            )
+            evicted = conn.execute(
+                "DELETE FROM extractions WHERE rowid IN ("
+                "SELECT rowid FROM extractions ORDER BY last_used DESC, rowid DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,),
+            ).rowcount
+        if evicted > 0:
+            self._count("evictions", evicted)
+
+    def __len__(self):
+        with self._connection() as conn:
+            return conn.execute("SELECT COUNT(*) FROM extractions").fetchone()[0]
@@ -0,0 +1,123 @@
+import math
+import threading
+
+EARTH_RADIUS_M = 6371000
+METERS_PER_DEGREE = 111320
+GEOHASH_BASE32 = "0123456789bcdefghjkmnpqrstuvwxyz"
+
+
+def haversine_m(lat1, lon1, lat2, lon2):
+    """Great-circle distance in meters between two coordinates"""
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    dphi = phi2 - phi1
+    dlambda = math.radians(lon2 - lon1)
+    a = math.sin(dphi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(dlambda / 2) ** 2
+    return 2 * EARTH_RADIUS_M * math.asin(math.sqrt(a))
+
+
+def geohash_encode(lat, lon, precision=6):
+    lat_range, lon_range = [-90.0, 90.0], [-180.0, 180.0]
+    chars, bits, bit_count, even = [], 0, 0, True
+    while len(chars) < precision:
+        value, bounds = (lon, lon_range) if even else (lat, lat_range)
+        mid = (bounds[0] + bounds[1]) / 2
+        bits <<= 1
+        if value >= mid:
+            bits |= 1
+            bounds[0] = mid
+        else:
+            bounds[1] = mid
+        even = not even
+        bit_count += 1
+        if bit_count == 5:
+            chars.append(GEOHASH_BASE32[bits])
+            bits, bit_count = 0, 0
+    return "".join(chars)
+
+
+def geohash_cell_size(precision):
+    """(height, width) of a geohash cell in degrees"""
+    total_bits = precision * 5
+    lon_bits = (total_bits + 1) // 2
+    lat_bits = total_bits // 2
+    return 180.0 / (2 ** lat_bits), 360.0 / (2 ** lon_bits)
+
+
+class GeoGridIndex:
+    """
+    In-memory spatial index that buckets points by geohash cell.
+    A radius query only visits the cells overlapping the search circle's bounding box and then
+    refines the candidates with an exact haversine distance.
+    """
+
+    def __init__(self, precision=6):
+        self.precision = precision
+        self.cell_height, self.cell_width = geohash_cell_size(precision)
+        self.buckets = {}
+        self.points = {}
+        self.lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.points)
+
+    def add(self, key, lat, lon, item):
+        lat, lon = float(lat), float(lon)
+        with self.lock:
+            self._remove(key)
+            cell = geohash_encode(lat, lon, self.precision)
+            self.buckets.setdefault(cell, {})[key] = (lat, lon, item)
+            self.points[key] = cell
+
+    def remove(self, key):
+        with self.lock:
+            self._remove(key)
+
+    def _remove(self, key):
+        cell = self.points.pop(key, None)
+        if cell is not None:
+            bucket = self.buckets[cell]
+            bucket.pop(key, None)
+            if not bucket:
+                del self.buckets[cell]
+
+    def _cells_for_box(self, min_lat, max_lat, min_lon, max_lon):
+        cells = set()
+        lat = min_lat
+        while True:
+            lon = min_lon
+            while True:
+                cells.add(geohash_encode(lat, lon, self.precision))
+                if lon >= max_lon:
+                    break
+                lon = min(lon + self.cell_width, max_lon)
+            if lat >= max_lat:
+                break
+            lat = min(lat + self.cell_height, max_lat)
+        return cells
+
+    def query_radius(self, lat, lon, radius_m, limit=None):
+        """Returns [(distance_m, item), ...] within radius_m, nearest first"""
+        lat, lon = float(lat), float(lon)
+        dlat = radius_m / METERS_PER_DEGREE
+        dlon = radius_m / (METERS_PER_DEGREE * max(math.cos(math.radians(lat)), 0.01))
+        min_lat, max_lat = max(lat - dlat, -90.0), min(lat + dlat, 90.0)
+        min_lon, max_lon = max(lon - dlon, -180.0), min(lon + dlon, 180.0)
+
+        with self.lock:
+            cell_count = ((max_lat - min_lat) / self.cell_height + 1) * ((max_lon - min_lon) / self.cell_width + 1)
+            if cell_count > len(self.buckets):
+                # Very large radius over a sparse index: scanning every bucket is cheaper
+                candidates = [point for bucket in self.buckets.values() for point in bucket.values()]
+            else:
+                cells = self._cells_for_box(min_lat, max_lat, min_lon, max_lon)
+                candidates = [point for cell in cells for point in self.buckets.get(cell, {}).values()]
+
+        matches = []
+        for point_lat, point_lon, item in candidates:
+            if not (min_lat <= point_lat <= max_lat and min_lon <= point_lon <= max_lon):
+                continue
+            distance = haversine_m(lat, lon, point_lat, point_lon)
+            if distance <= radius_m:
+                matches.append((distance, item))
+        matches.sort(key=lambda match: match[0])
+        return matches[:limit] if limit else matches
@@ -0,0 +1,223 @@
+import re
+
+import lxml.html
+from bs4 import BeautifulSoup
+from lxml import etree
+
+# Elements that never hold the doctor listing itself
+BOILERPLATE_TAGS = ("nav", "header", "footer", "aside", "script", "style", "noscript", "form", "iframe", "svg")
+BOILERPLATE_CLASS_PATTERN = re.compile(
+    r"(?:^|[-_\s])(?:nav|navbar|navigation|menu|footer|breadcrumbs?|cookies?|sidebar|social|share|newsletter|"
+    r"site-header|topbar|top-bar|skip-link)(?:$|[-_\s])",
+    re.IGNORECASE,
+)
+# Stripping is undone when it leaves less text than this, e.g. pages that wrap everything in <header>
+MIN_MAIN_TEXT = 200
+# Their contents are code, not text, for BeautifulSoup's get_text as well
+NON_TEXT_TAGS = {"script", "style", "template"}
+
+
+def _boilerplate_marker(classes, element_id, role):
+    return (" ".join(classes) + " " + (element_id or "") + " " + (role or "")).strip()
+
+
+def _image_source(image):
+    # Lazy-loaded images keep the real address in a data attribute and a placeholder in src
+    if image is None:
+        return None
+    source = image.get("data-src") or image.get("data-lazy-src") or image.get("src")
+    return None if not source or source.startswith("data:") else source
+
+
+def _normalise(text):
+    return " ".join(text.split()) or None
+
+
+CONTACT_HREF_PATTERN = re.compile(r"^(?:mailto|tel):", re.IGNORECASE)
+
+
+class SoupBackend:
+    """The reference backend: BeautifulSoup's pure-Python html.parser tree"""
+
+    name = "html.parser"
+
+    def links(self, html):
+        """(href, text, title) of every anchor with an href, text stripped as get_text(strip=True)"""
+        soup = BeautifulSoup(html, "html.parser")
+        return [(link.get("href", ""), link.get_text(strip=True), link.get("title", "")) for link in soup.find_all("a", href=True)]
+
+    def main_text(self, html):
+        """Visible page text with navigation, footers, sidebars and other boilerplate removed, one block per line"""
+        soup = BeautifulSoup(html, "html.parser")
+        root = soup.find("body") or soup
+        full_text = root.get_text(separator="\n", strip=True)
+
+        for element in root.find_all(BOILERPLATE_TAGS):
+            element.decompose()
+        for element in root.find_all(self._is_boilerplate):
+            element.decompose()
+        text = root.get_text(separator="\n", strip=True)
+        return text if len(text) >= MIN_MAIN_TEXT else full_text
+
+    def structured_elements(self, html, itemtype_pattern, card_tags, card_class_pattern):
+        """
+        Raw material for structured doctor extraction, from one parse of the page:
+        microdata items as (itemtype, {itemprop: value}) for scopes whose itemtype matches,
+        and doctor cards as (text lines, contact href, image source) for card_tags elements
+        whose class or id matches card_class_pattern.
+        """
+        soup = BeautifulSoup(html, "html.parser")
+        items = []
+        for scope in soup.find_all(attrs={"itemtype": itemtype_pattern}):
+            properties = {}
+            for element in scope.find_all(attrs={"itemprop": True}):
+                if element.find_parent(attrs={"itemscope": True}) is not scope:
+                    continue
+                for prop in element["itemprop"].split():
+                    if prop not in properties:
+                        properties[prop] = self._property_value(element, prop)
+            items.append((scope["itemtype"], properties))
+
+        cards = []
+        for card in soup.find_all(card_tags, attrs={"class": True}):
+            if not card_class_pattern.search(" ".join(card.get("class") or []) + " " + (card.get("id") or "")):
+                continue
+            contact = card.find("a", href=CONTACT_HREF_PATTERN)
+            image = card if card.name == "img" else card.find("img")
+            cards.append((
+                card.get_text("\n", strip=True).split("\n"), contact["href"] if contact else None, _image_source(image)
+            ))
+        return items, cards
+
+    @staticmethod
+    def _property_value(element, prop):
+        if element.name == "img":
+            return _image_source(element)
+        if element.name == "meta":
+            return _normalise(element.get("content") or "")
+        if element.name == "a" and prop in ("email", "telephone"):
+            return element.get("href", "").split(":", 1)[-1] or _normalise(element.get_text(" "))
+        return _normalise(element.get_text(" ", strip=True))
+
+    @staticmethod
+    def _is_boilerplate(element):
+        if element.attrs is None:
+            return False
+        marker = _boilerplate_marker(element.get("class") or [], element.get("id"), element.get("role"))
+        return bool(BOILERPLATE_CLASS_PATTERN.search(marker))
+
+
+class LxmlBackend:
+    """
+    libxml2's C parser through lxml, producing the same links and text as SoupBackend several
+    times faster. Text is walked directly off the tree instead of building Python objects per node.
+    """
+
+    name = "lxml"
+
+    def _parse(self, html):
+        # Bytes, so pages starting with an XML encoding declaration are accepted
+        parser = lxml.html.HTMLParser(encoding="utf-8")
+        try:
+            return lxml.html.document_fromstring(html.encode("utf-8", errors="replace"), parser=parser)
+        except (etree.ParserError, ValueError):
+            return None
+
+    def _strings(self, element):
+        # Text, children and their tails in document order; comments only contribute their tails
+        if element.text and element.tag not in NON_TEXT_TAGS:
+            yield element.text
+        if element.tag in NON_TEXT_TAGS:
+            return
+        for child in element:
+            if isinstance(child.tag, str):
+                yield from self._strings(child)
+            if child.tail:
+                yield child.tail
+
+    def _text(self, element, separator):
+        return separator.join(string for string in (raw.strip() for raw in self._strings(element)) if string)
+
+    def links(self, html):
+        document = self._parse(html)
+        if document is None:
+            return []
+        return [
+            (link.get("href"), self._text(link, ""), link.get("title", ""))
+            for link in document.iter("a")
+            if link.get("href") is not None
+        ]
+
+    def main_text(self, html):
+        document = self._parse(html)
+        if document is None:
+            return ""
+        root = document.find("body")
+        root = document if root is None else root
+        full_text = self._text(root, "\n")
+
+        boilerplate = [
+            element for element in root.iter(etree.Element)
+            if element.tag in BOILERPLATE_TAGS or BOILERPLATE_CLASS_PATTERN.search(
+                _boilerplate_marker((element.get("class") or "").split(), element.get("id"), element.get("role"))
+            )
+        ]
+        for element in boilerplate:
+            # drop_tree keeps the text that follows the element, as decompose does
+            if element.getparent() is not None:
+                element.drop_tree()
+        text = self._text(root, "\n")
+        return text if len(text) >= MIN_MAIN_TEXT else full_text
+
+
+    def structured_elements(self, html, itemtype_pattern, card_tags, card_class_pattern):
+        document = self._parse(html)
+        if document is None:
+            return [], []
+        items = []
+        for scope in document.iter(etree.Element):
+            if scope.get("itemtype") is None or not itemtype_pattern.search(scope.get("itemtype")):
+                continue
+            properties = {}
+            for element in scope.iterdescendants(etree.Element):
+                if element.get("itemprop") is None or self._item_scope(element) is not scope:
+                    continue
+                for prop in element.get("itemprop").split():
+                    if prop not in properties:
+                        properties[prop] = self._property_value(element, prop)
+            items.append((scope.get("itemtype"), properties))
+
+        cards = []
+        for card in document.iter(*card_tags):
+            if card.get("class") is None:
+                continue
+            if not card_class_pattern.search(" ".join(card.get("class").split()) + " " + (card.get("id") or "")):
+                continue
+            contact = next((link.get("href") for link in card.iterdescendants("a")
+                            if link.get("href") is not None and CONTACT_HREF_PATTERN.search(link.get("href"))), None)
+            image = card if card.tag == "img" else next(card.iterdescendants("img"), None)
+            cards.append((self._text(card, "\n").split("\n"), contact, _image_source(image)))
+        return items, cards
+
+    @staticmethod
+    def _item_scope(element):
+        return next((parent for parent in element.iterancestors() if parent.get("itemscope") is not None), None)
+
+    def _property_value(self, element, prop):
+        if element.tag == "img":
+            return _image_source(element)
+        if element.tag == "meta":
+            return _normalise(element.get("content") or "")
+        if element.tag == "a" and prop in ("email", "telephone"):
+            return (element.get("href") or "").split(":", 1)[-1] or _normalise(self._text(element, " "))
+        return _normalise(self._text(element, " "))
+
+
+PARSER_BACKENDS = {backend.name: backend for backend in (LxmlBackend, SoupBackend)}
+
+
+def parser_backend(name="lxml"):
+    """A parser backend by name: "lxml" (default) or "html.parser" """
+    if name not in PARSER_BACKENDS:
+        raise ValueError(f"Unknown HTML parser backend '{name}', expected one of {sorted(PARSER_BACKENDS)}")
+    return PARSER_BACKENDS[name]()
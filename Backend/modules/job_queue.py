@@ -0,0 +1,194 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from contextlib import contextmanager, nullcontext
+
+
+class JobQueue:
+    """
+    Durable background job queue stored in a local SQLite file.
+    Long-running endpoints enqueue a job and return its id straight away; worker threads or
+    processes claim jobs with a time-limited lease. A job whose worker dies is picked up again
+    once its lease runs out, so queued and in-flight work survives restarts.
+    """
+
+    def __init__(self, db_path, lease_seconds=600, max_attempts=3):
+        self.db_path = db_path
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        self.handlers = {}
+        self.workers = []
+        self.workers_lock = threading.Lock()
+
+        directory = os.path.dirname(db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with self._connection() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS jobs (
+                    job_id TEXT PRIMARY KEY,
+                    kind TEXT NOT NULL,
+                    payload TEXT NOT NULL,
+                    status TEXT NOT NULL,
+                    progress REAL NOT NULL DEFAULT 0,
+                    message TEXT,
+                    result TEXT,
+                    error TEXT,
+                    attempts INTEGER NOT NULL DEFAULT 0,
+                    worker TEXT,
+                    lease_until REAL,
+                    created_at REAL NOT NULL,
+                    updated_at REAL NOT NULL
+                )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_jobs_status ON jobs (status, created_at)")
+
+    @contextmanager
+    def _connection(self):
+        # Autocommit connection; claim() opens its own write transaction
+        conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        try:
+            yield conn
+        finally:
+            conn.close()
+
+    def register(self, kind, handler):
+        """handler(payload, progress) runs the job; progress(fraction, message=None) reports status"""
+        self.handlers[kind] = handler
+
+    def enqueue(self, kind, payload):
+        job_id = uuid.uuid4().hex
+        now = time.time()
+        with self._connection() as conn:
+            conn.execute(
+                "INSERT INTO jobs (job_id, kind, payload, status, created_at, updated_at) VALUES (?, ?, ?, 'queued', ?, ?)",
+                (job_id, kind, json.dumps(payload), now, now),
+            )
+        return job_id
+
+    def get(self, job_id):
+        with self._connection() as conn:
+            row = conn.execute("SELECT * FROM jobs WHERE job_id = ?", (job_id,)).fetchone()
+        if row is None:
+            return None
+        return {
+            "job_id": row["job_id"],
+            "kind": row["kind"],
+            "status": row["status"],
+            "progress": row["progress"],
+            "message": row["message"],
+            "result": json.loads(row["result"]) if row["result"] else None,
+            "error": row["error"],
+            "attempts": row["attempts"],
+            "created_at": row["created_at"],
+            "updated_at": row["updated_at"],
+        }
+
+    def claim(self, worker_id):
+        """Atomically leases the oldest runnable job to worker_id, or returns None"""
+        now = time.time()
+        with self._connection() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                # Jobs whose lease expired too many times are given up on instead of retried forever
+                conn.execute(
+                    "UPDATE jobs SET status = 'failed', error = 'Worker lease expired too many times', updated_at = ? "
+                    "WHERE status = 'running' AND lease_until < ? AND attempts >= ?",
+                    (now, now, self.max_attempts),
+                )
+                row = conn.execute(
+                    "SELECT job_id, kind, payload FROM jobs "
+                    "WHERE status = 'queued' OR (status = 'running' AND lease_until < ?) "
+                    "ORDER BY created_at LIMIT 1",
+                    (now,),
+                ).fetchone()
+                if row is None:
+                    conn.execute("COMMIT")
+                    return None
+                conn.execute(
+                    "UPDATE jobs SET status = 'running', worker = ?, attempts = attempts + 1, lease_until = ?, updated_at = ? "
+                    "WHERE job_id = ?",
+                    (worker_id, now + self.lease_seconds, now, row["job_id"]),
+                )
+                conn.execute("COMMIT")
+                return {"job_id": row["job_id"], "kind": row["kind"], "payload": json.loads(row["payload"])}
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+
+    def update_progress(self, job_id, progress, message=None):
+        # Reporting progress also renews the lease
+        now = time.time()
+        with self._connection() as conn:
+            conn.execute(
+                "UPDATE jobs SET progress = ?, message = COALESCE(?, message), lease_until = ?, updated_at = ? "
+                "WHERE job_id = ? AND status = 'running'",
+                (max(0.0, min(progress, 1.0)), message, now + self.lease_seconds, now, job_id),
+            )
+
+    def complete(self, job_id, result):
+        with self._connection() as conn:
+            conn.execute(
+                "UPDATE jobs SET status = 'done', progress = 1, result = ?, lease_until = NULL, updated_at = ? WHERE job_id = ?",
+                (json.dumps(result), time.time(), job_id),
+            )
+
+    def fail(self, job_id, error):
+        with self._connection() as conn:
+            conn.execute(
+                "UPDATE jobs SET status = 'failed', error = ?, lease_until = NULL, updated_at = ? WHERE job_id = ?",
+                (error, time.time(), job_id),
+            )
+
+    def run_next(self, worker_id, app=None):
+        """Claims and runs one job. Returns False when the queue was empty."""
+        job = self.claim(worker_id)
+        if job is None:
+            return False
+
+        job_id = job["job_id"]
+        handler = self.handlers.get(job["kind"])
+        if handler is None:
+            self.fail(job_id, f"No handler registered for job kind '{job['kind']}'")
+            return True
+
+        def progress(fraction, message=None):
+            self.update_progress(job_id, fraction, message)
+
+        try:
+            with app.app_context() if app else nullcontext():
+                result = handler(job["payload"], progress)
+            self.complete(job_id, result)
+        except Exception as e:
+            print(f"Job {job_id} ({job['kind']}) failed: {str(e)}")
+            self.fail(job_id, str(e))
+        return True
+
+    def work(self, app=None, worker_id=None, poll_interval=1.0, stop_event=None):
+        worker_id = worker_id or f"{os.getpid()}-{threading.get_ident()}"
+        stop_event = stop_event or threading.Event()
+        while not stop_event.is_set():
+            try:
+                if not self.run_next(worker_id, app):
+                    stop_event.wait(poll_interval)
+            except Exception as e:
+                print(f"Job worker {worker_id} error: {str(e)}")
+                stop_event.wait(poll_interval)
+
+    def start_workers(self, app=None, count=1):
+        """Starts in-process worker threads once; separate processes can run job_worker.py instead"""
+        with self.workers_lock:
+            while len(self.workers) < count:
+                worker = threading.Thread(
+                    target=self.work,
+                    kwargs={"app": app},
+                    name=f"job-worker-{len(self.workers) + 1}",
+                    daemon=True,
+                )
+                worker.start()
+                self.workers.append(worker)
@@ -0,0 +1,130 @@
+import json
+import re
+import threading
+import zlib
+
+import brotli
+import zstandard
+
+RELEVANT_URL_PATTERN = re.compile(
+    r"doctor|physician|staff|faculty|consultant|specialist|team|people|speciali[sz]|department|expert",
+    re.IGNORECASE,
+)
+# "doctorName": ..., "staff_list": ... found in a raw body without parsing it
+RELEVANT_KEY_PATTERN = re.compile(
+    rb'"[^"\\]{0,40}(?:doctor|physician|staff|faculty|consultant|specialist|designation|qualification)[^"\\]{0,40}"\s*:',
+    re.IGNORECASE,
+)
+URL_WEIGHT = 50
+MAX_KEY_HITS = 50
+
+
+def relevance(url, body):
+    """How likely a JSON response lists doctors, from its URL and the key names in its body"""
+    url_hits = len(set(match.lower() for match in RELEVANT_URL_PATTERN.findall(url)))
+    key_hits = min(MAX_KEY_HITS, len(RELEVANT_KEY_PATTERN.findall(body)))
+    return url_hits * URL_WEIGHT + key_hits
+
+
+def bounded_decode(body, encoding, limit):
+    """
+    body decoded for its Content-Encoding, stopping once more than limit bytes come out, so an
+    oversized or compression bomb body is never decompressed in full. Raises ValueError if undecodable.
+    """
+    encoding = (encoding or "identity").strip().lower()
+    try:
+        if encoding in ("identity", "none"):
+            return body[:limit + 1]
+        if encoding in ("gzip", "x-gzip"):
+            return zlib.decompressobj(16 + zlib.MAX_WBITS).decompress(body, limit + 1)
+        if encoding == "deflate":
+            try:
+                return zlib.decompressobj().decompress(body, limit + 1)
+            except zlib.error:
+                # Some servers send raw deflate without the zlib header
+                return zlib.decompressobj(-zlib.MAX_WBITS).decompress(body, limit + 1)
+        if encoding == "br":
+            # The output buffer stops growing at the limit, give or take one block
+            return brotli.Decompressor().process(body, output_buffer_limit=limit + 1)[:limit + 1]
+        if encoding == "zstd":
+            decoded = b""
+            with zstandard.ZstdDecompressor().stream_reader(body) as reader:
+                while len(decoded) <= limit:
+                    chunk = reader.read(limit + 1 - len(decoded))
+                    if not chunk:
+                        break
+                    decoded += chunk
+            return decoded
+    except (zlib.error, brotli.error, zstandard.ZstdError) as error:
+        raise ValueError(f"undecodable {encoding} body: {error}") from error
+    raise ValueError(f"unsupported Content-Encoding {encoding}")
+
+
+def serialise_for_prompt(json_responses, max_chars):
+    """json.dumps of the responses in order, stopping once max_chars of them are written"""
+    text = ""
+    for response in json_responses:
+        text += (", " if text else "") + json.dumps(response, ensure_ascii=False)
+        if len(text) >= max_chars:
+            break
+    return "[" + text[:max_chars] + "]"
+
+
+class JsonCapture:
+    """
+    Picks the JSON responses of a rendered page worth passing on for extraction. Bodies are
+    decompressed and ranked by relevance before any is parsed; only the best ones are parsed,
+    none larger than max_response_bytes as sent or decoded and at most max_total_bytes and
+    max_responses overall. Decompression stops as soon as a body passes max_response_bytes.
+    """
+
+    def __init__(self, max_response_bytes=256 * 1024, max_total_bytes=1024 * 1024, max_responses=10):
+        self.max_response_bytes = max_response_bytes
+        self.max_total_bytes = max_total_bytes
+        self.max_responses = max_responses
+        self.lock = threading.Lock()
+        self.stats = {"seen": 0, "captured": 0, "too_large": 0, "over_budget": 0, "invalid": 0}
+
+    def _count(self, event, amount=1):
+        with self.lock:
+            self.stats[event] += amount
+
+    def capture(self, requests):
+        """[{"url", "data"}] for the selected responses among seleniumwire requests, best first"""
+        candidates = []
+        for request in requests:
+            response = request.response
+            if not response or "application/json" not in response.headers.get("Content-Type", ""):
+                continue
+            self._count("seen")
+            if len(response.body) > self.max_response_bytes:
+                self._count("too_large")
+                continue
+            try:
+                # Bodies are kept as sent, so key names are only visible once decompressed
+                body = bounded_decode(response.body, response.headers.get("Content-Encoding"), self.max_response_bytes)
+            except ValueError:
+                self._count("invalid")
+                continue
+            if len(body) > self.max_response_bytes:
+                self._count("too_large")
+                continue
+            candidates.append((relevance(request.url, body), request.url, body))
+
+        captured, total_bytes = [], 0
+        for position, (_, url, body) in enumerate(sorted(candidates, key=lambda item: -item[0])):
+            if len(captured) >= self.max_responses:
+                self._count("over_budget", len(candidates) - position)
+                break
+            if total_bytes + len(body) > self.max_total_bytes:
+                self._count("over_budget")
+                continue
+            try:
+                data = json.loads(body.decode("utf-8", errors="ignore"))
+            except ValueError:
+                self._count("invalid")
+                continue
+            total_bytes += len(body)
+            captured.append({"url": url, "data": data})
+        self._count("captured", len(captured))
+        return captured
@@ -0,0 +1,116 @@
+import re
+from functools import lru_cache
+
+# Keywords looked for in anchor text and title attributes on hospital websites
+TEXT_KEYWORDS = (
+    # Basic terms
+    'about-us', 'doctor', 'doctors', 'our doctors',
+    'specialist', 'specialists', 'department', 'departments', 'our team',
+
+    # Medical staff terms
+    'medical team', 'healthcare team', 'medical staff', 'clinical team',
+    'physicians', 'physician', 'consultants', 'consultant', 'faculty',
+    'medical faculty', 'clinical faculty', 'staff', 'medical professionals',
+
+    # Department/Service terms
+    'services', 'medical services', 'clinical services', 'specialties',
+    'specialty', 'specialization', 'divisions', 'division', 'units',
+    'medical units', 'clinical units', 'centers', 'centre', 'center',
+
+    # About/Info terms
+    'about', 'about us', 'team', 'our staff', 'meet our', 'meet the',
+    'leadership', 'directory', 'staff directory', 'physician directory',
+    'find a doctor', 'find doctor', 'search doctor', 'book appointment',
+
+    # Medical specialties
+    'cardiology', 'neurology', 'orthopedic', 'pediatric', 'gynecology',
+    'oncology', 'dermatology', 'psychiatry', 'radiology', 'surgery',
+    'emergency', 'internal medicine', 'family medicine', 'pathology',
+
+    # Common variations
+    'dr.', 'dr', 'md', 'phd', 'profile', 'profiles', 'bio', 'biography',
+    'credentials', 'experience', 'expertise', 'qualifications'
+)
+
+# Keywords looked for in the URL path
+URL_KEYWORDS = (
+    'doctor', 'doctors', 'physician', 'staff', 'team', 'about',
+    'department', 'service', 'specialty', 'faculty', 'profile',
+    'bio', 'directory', 'find', 'search', 'meet'
+)
+
+# URLs containing any of these are never doctor listings
+EXCLUDE_PATTERNS = (
+    'login', 'register', 'cart', 'checkout', 'payment', 'admin',
+    'wp-admin', 'wp-content', 'privacy', 'terms', 'cookie',
+    'newsletter', 'subscription', 'download', 'pdf', 'image',
+    'photo', 'gallery', 'news', 'blog', 'event', 'calendar'
+)
+
+# Keywords that point at pages listing individual doctors rather than general site sections
+STRONG_KEYWORDS = frozenset({
+    'doctor', 'doctors', 'our doctors', 'physician', 'physicians', 'consultant', 'consultants',
+    'specialist', 'specialists', 'medical team', 'medical staff', 'faculty', 'medical faculty',
+    'find a doctor', 'find doctor', 'search doctor', 'physician directory', 'meet our', 'meet the',
+    'dr.', 'profile', 'profiles',
+})
+
+PATH_PATTERN = re.compile(r'/(doctor|physician|staff|team|about|department|specialty)s?/')
+EXCLUDE_PATTERN = re.compile("|".join(re.escape(pattern) for pattern in EXCLUDE_PATTERNS))
+
+STRONG_WEIGHT = 3
+SPECIALTY_WEIGHT = 5
+PATH_PATTERN_WEIGHT = 2
+
+
+def _alternation(keywords):
+    # Longest keywords first so a phrase like "our doctors" wins over "doctor" at the same position
+    unique = sorted({keyword for keyword in keywords if keyword}, key=len, reverse=True)
+    return re.compile("|".join(re.escape(keyword) for keyword in unique))
+
+
+class LinkClassifier:
+    """
+    Decides which links on a hospital website are worth following for a specialty.
+    All keywords are compiled into one regex per field, so each anchor costs a single scan
+    instead of one substring test per keyword, and relevant links get a score used to rank them.
+    """
+
+    def __init__(self, doctor_type):
+        self.doctor_type = doctor_type.lower()
+        self.text_pattern = _alternation(TEXT_KEYWORDS + (self.doctor_type,))
+        self.url_pattern = _alternation(URL_KEYWORDS + (self.doctor_type,))
+
+    def is_relevant(self, text, title, url_path):
+        """text, title and url_path are expected in lowercase"""
+        if not self.doctor_type:
+            # An empty specialty matches everything, as a substring test would
+            return True
+        return bool(
+            (text and self.text_pattern.search(text))
+            or (title and self.text_pattern.search(title))
+            or self.url_pattern.search(url_path)
+            or PATH_PATTERN.search(url_path)
+        )
+
+    def score(self, text, title, url_path):
+        """Higher scores for links that look like doctor listings for this specialty"""
+        matched = set(self.text_pattern.findall(text)) | set(self.text_pattern.findall(title))
+        score = sum(STRONG_WEIGHT if keyword in STRONG_KEYWORDS else 1 for keyword in matched)
+        score += len(set(self.url_pattern.findall(url_path)))
+        if self.doctor_type and (self.doctor_type in text or self.doctor_type in title or self.doctor_type in url_path):
+            score += SPECIALTY_WEIGHT
+        if PATH_PATTERN.search(url_path):
+            score += PATH_PATTERN_WEIGHT
+        return score
+
+    def rank(self, scored_urls):
+        """Drops excluded URLs and orders the rest by score, then by length (shorter first)"""
+        kept = [url for url in scored_urls if not EXCLUDE_PATTERN.search(url.lower())]
+        return sorted(kept, key=lambda url: (-scored_urls[url], len(url), url))
+
+
+@lru_cache(maxsize=32)
+def link_classifier_for(doctor_type):
+    """Classifiers are built once per specialty and shared between crawls"""
+    return LinkClassifier(doctor_type)
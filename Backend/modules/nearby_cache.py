@@ -0,0 +1,116 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+
+
+class NearbySearchCache:
+    """
+    Two-tier cache of nearby search results keyed by NearbyPlaces.search_key
+    (geohash cell, place type, radius bucket).
+    L1 is an in-process LRU of the hottest areas; L2 is a local SQLite file shared by every
+    worker process and kept across restarts. Entries younger than ttl are fresh. Older entries
+    are still served up to stale_ttl, and the caller is expected to refresh them in the background.
+    """
+
+    def __init__(self, db_path, ttl=6 * 3600, stale_ttl=7 * 86400, max_memory_entries=512):
+        self.db_path = db_path
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.max_memory_entries = max_memory_entries
+        self.memory = OrderedDict()
+        self.lock = threading.Lock()
+        self.counters = {"memory_hits": 0, "disk_hits": 0, "stale_hits": 0, "misses": 0}
+
+        directory = os.path.dirname(db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with self._connection() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS nearby_searches (
+                    search_key TEXT PRIMARY KEY,
+                    results TEXT NOT NULL,
+                    stored_at REAL NOT NULL
+                )
+            """)
+
+    @contextmanager
+    def _connection(self):
+        conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+        try:
+            yield conn
+        finally:
+            conn.close()
+
+    def _serialise_key(self, key):
+        return "|".join(str(part) for part in key)
+
+    def _remember(self, key, stored_at, results):
+        # Caller holds self.lock
+        self.memory[key] = (stored_at, results)
+        self.memory.move_to_end(key)
+        while len(self.memory) > self.max_memory_entries:
+            self.memory.popitem(last=False)
+
+    def _count(self, event):
+        with self.lock:
+            self.counters[event] += 1
+
+    def get(self, key, max_age=None):
+        """
+        Returns (results, is_stale), or None when nothing usable is cached. Entries older than
+        max_age (default stale_ttl) are ignored; a larger max_age serves older results when the
+        upstream is unavailable.
+        """
+        max_age = self.stale_ttl if max_age is None else max_age
+        key = self._serialise_key(key)
+        now = time.time()
+
+        with self.lock:
+            entry = self.memory.get(key)
+            if entry is not None:
+                self.memory.move_to_end(key)
+        tier = "memory_hits"
+
+        if entry is None:
+            with self._connection() as conn:
+                row = conn.execute(
+                    "SELECT stored_at, results FROM nearby_searches WHERE search_key = ?", (key,)
+                ).fetchone()
+            if row is not None:
+                entry = (row[0], json.loads(row[1]))
+                with self.lock:
+                    self._remember(key, *entry)
+            tier = "disk_hits"
+
+        if entry is None or now - entry[0] >= max_age:
+            self._count("misses")
+            return None
+        is_stale = now - entry[0] >= self.ttl
+        self._count("stale_hits" if is_stale else tier)
+        return entry[1], is_stale
+
+    def put(self, key, results):
+        key = self._serialise_key(key)
+        stored_at = time.time()
+        with self.lock:
+            self._remember(key, stored_at, results)
+        with self._connection() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO nearby_searches (search_key, results, stored_at) VALUES (?, ?, ?)",
+                (key, json.dumps(results), stored_at),
+            )
+            # Entries past stale_ttl can never be served again
+            conn.execute("DELETE FROM nearby_searches WHERE stored_at < ?", (stored_at - self.stale_ttl,))
+
+    def stats(self):
+        with self.lock:
+            counters = dict(self.counters)
+        lookups = sum(counters.values())
+        hits = lookups - counters["misses"]
+        counters["hit_rate"] = round(hits / lookups, 3) if lookups else 0.0
+        return counters
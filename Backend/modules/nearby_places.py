@@ -2,32 +2,268 @@ import os
 from dotenv import load_dotenv
 import requests
 import json
+import copy
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed, TimeoutError
+from requests.adapters import HTTPAdapter
+from modules.geo_index import geohash_encode
+from modules.single_flight import SingleFlight
+from modules import outbound
 
 load_dotenv()
 
+DETAIL_FIELDS = ['name', 'rating', 'formatted_phone_number', 'website', 'opening_hours', 'geometry']
+MAX_RESULT_PAGES = 3
+PAGE_TOKEN_ATTEMPTS = 3
+PLACES_BASE_URL = "https://maps.googleapis.com/maps/api/place"
+
 class NearbyPlaces:
-    def __init__(self, api_key):
+    def __init__(self, api_key, max_workers=8, timeout=10, cache=None, coalesce_precision=7, coalesce_radius_step=250,
+                 search_cache=None, page_token_delay=2.0, governor=None, base_url=PLACES_BASE_URL, recorder=None):
         self.api_key = api_key
+        self.base_url = base_url.rstrip("/")
+        self.recorder = recorder
+        self.timeout = timeout
+        self.cache = cache
+        self.search_cache = search_cache
+        self.page_token_delay = page_token_delay
+        self.refreshing = set()
+        self.refreshing_lock = threading.Lock()
+        self.coalesce_precision = coalesce_precision
+        self.coalesce_radius_step = coalesce_radius_step
+        self.single_flight = SingleFlight()
+        self.upstream = (governor or outbound.governor).upstream("google_places")
+
+        # One pooled session and one bounded pool shared by every request, so a burst of
+        # searches never opens more than max_workers connections to the Places API
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=max_workers)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="place-details")
+
+    def _get_json(self, endpoint, params):
+        # Runs under the google_places upstream guard, which retries what this raises
+        response = self.session.get(f"{self.base_url}/{endpoint}/json", params=params, timeout=self.timeout)
+        response.raise_for_status()
+        data = response.json()
+        if data.get("status") == "OVER_QUERY_LIMIT":
+            raise outbound.UpstreamRateLimited(data.get("error_message", "Places API quota exceeded"))
+        if self.recorder and data.get("status", "OK") in ("OK", "ZERO_RESULTS"):
+            self.recorder.record(endpoint, params, data)
+        return data
+
+    def search_key(self, lat, lon, type, radius, max_pages=1):
+        # Searches from the same ~150m geohash cell with radii in the same step are
+        # interchangeable, so they can share one outbound request
+        cell = geohash_encode(float(lat), float(lon), self.coalesce_precision)
+        radius_bucket = round(float(radius) / self.coalesce_radius_step)
+        return cell, type, radius_bucket, max_pages
+
+    def find_nearby_places(self, lat, lon, type="hospital", radius=5000, max_pages=1):
+        """
+        Nearby search on the Places API, following next_page_token for up to max_pages pages
+        (Google returns at most 3 pages of 20). Concurrent searches with the same search_key are
+        coalesced into one request whose results every caller receives.
+        With a search_cache, cached areas are answered locally; stale entries are still served
+        and refreshed in the background, and expired ones are served when the API is unavailable.
+        """
+        key = self.search_key(lat, lon, type, radius, max_pages)
+        if self.search_cache:
+            cached = self.search_cache.get(key)
+            if cached is not None:
+                results, is_stale = cached
+                if is_stale:
+                    self._refresh_in_background(key, lat, lon, type, radius, max_pages)
+                return copy.deepcopy(results)
+
+        try:
+            results, _ = self.single_flight.do(key, self._fetch_and_cache, key, lat, lon, type, radius, max_pages)
+        except Exception:
+            # While the Places API is down or throttled, an expired result beats no result
+            expired = self.search_cache.get(key, max_age=float("inf")) if self.search_cache else None
+            if expired is None:
+                raise
+            print(f"Places API unavailable, serving expired nearby {type} results")
+            results = expired[0]
+        # Callers may modify the returned places, so each one gets its own copy of the shared list
+        return copy.deepcopy(results)
+
+    def _fetch_and_cache(self, key, lat, lon, type, radius, max_pages):
+        results = self._fetch_nearby_places(lat, lon, type, radius, max_pages)
+        if self.search_cache:
+            self.search_cache.put(key, results)
+        return results
+
+    def _refresh_in_background(self, key, lat, lon, type, radius, max_pages):
+        with self.refreshing_lock:
+            if key in self.refreshing:
+                return
+            self.refreshing.add(key)
+
+        def refresh():
+            try:
+                self.single_flight.do(key, self._fetch_and_cache, key, lat, lon, type, radius, max_pages)
+            except Exception as e:
+                print(f"Background refresh of nearby {type} search failed: {str(e)}")
+            finally:
+                with self.refreshing_lock:
+                    self.refreshing.discard(key)
+
+        self.executor.submit(refresh)
+
+    def _fetch_nearby_places(self, lat, lon, type="hospital", radius=5000, max_pages=1):
+        return [place for page in self.iter_nearby_pages(lat, lon, type, radius, max_pages) for place in page]
 
-    def find_nearby_places(self, lat, lon, type="hospital", radius=5000):
-        google_maps_url = "https://maps.googleapis.com/maps/api/place/nearbysearch/json"
+    def iter_nearby_pages(self, lat, lon, type="hospital", radius=5000, max_pages=MAX_RESULT_PAGES):
+        """
+        Yields each page of Places nearby results as soon as it arrives, following
+        next_page_token. Google only accepts a token a couple of seconds after issuing it, so
+        later pages wait page_token_delay and retry while the token is not yet valid.
+        """
         params = {
             'location': f'{lat},{lon}',
             'radius': radius,
             'type': type,
             'key': self.api_key
         }
-        response = requests.get(google_maps_url, params=params)
-        return response.json()["results"]
+        for page_number in range(max_pages):
+            data = self.upstream.call(self._get_json, "nearbysearch", params)
+            attempts = 1
+            while data.get("status") == "INVALID_REQUEST" and "pagetoken" in params and attempts < PAGE_TOKEN_ATTEMPTS:
+                time.sleep(self.page_token_delay)
+                data = self.upstream.call(self._get_json, "nearbysearch", params)
+                attempts += 1
 
-    def place_details(self, place_id):
-        google_maps_url = f"https://maps.googleapis.com/maps/api/place/details/json?placeid={place_id}&key={self.api_key}"
+            yield data["results"]
+
+            token = data.get("next_page_token")
+            if not token:
+                return
+            params = {'pagetoken': token, 'key': self.api_key}
+            time.sleep(self.page_token_delay)
+
+    def find_places(self, lat, lon, type="hospital", radius=5000, source="remote", min_local_results=3, max_pages=1):
+        """
+        Nearby search that can be answered from the places already stored by the cache.
+        With source='local' the stored Hospitals/Pharmacy rows are searched first, and the
+        remote API is only called when fewer than min_local_results places are found.
+        If the remote search fails, any stored places nearby are returned instead.
+        Returns (results, source_used).
+        """
+        local_results = None
+        if source == "local" and self.cache:
+            local_results = self.cache.nearby(float(lat), float(lon), type, float(radius))
+            if len(local_results) >= min_local_results:
+                return local_results, "local"
+        try:
+            return self.find_nearby_places(lat, lon, type, radius, max_pages), "remote"
+        except Exception:
+            if local_results is None and self.cache:
+                local_results = self.cache.nearby(float(lat), float(lon), type, float(radius))
+            if not local_results:
+                raise
+            print(f"Places API unavailable, serving {len(local_results)} stored {type} results")
+            return local_results, "local"
+
+    def iter_place_pages(self, lat, lon, type="hospital", radius=5000, source="remote", min_local_results=3,
+                         max_pages=MAX_RESULT_PAGES):
+        """
+        Streaming counterpart of find_places, yielding (results, source_used) per page.
+        Cached or local searches arrive as a single page; remote searches page by page.
+        """
+        if source == "local" and self.cache:
+            local_results = self.cache.nearby(float(lat), float(lon), type, float(radius))
+            if len(local_results) >= min_local_results:
+                yield local_results, "local"
+                return
+
+        key = self.search_key(lat, lon, type, radius, max_pages)
+        if self.search_cache:
+            cached = self.search_cache.get(key)
+            if cached is not None:
+                results, is_stale = cached
+                if is_stale:
+                    self._refresh_in_background(key, lat, lon, type, radius, max_pages)
+                yield copy.deepcopy(results), "remote"
+                return
+
+        results = []
+        for page in self.iter_nearby_pages(lat, lon, type, radius, max_pages):
+            results.extend(page)
+            yield page, "remote"
+        if self.search_cache:
+            self.search_cache.put(key, results)
+
+    def place_details(self, place_id, fields=None):
         params = {
-            
-            'fields': 'name,rating,formatted_phone_number,website,opening_hours,geometry',
-            
+            'placeid': place_id,
+            'fields': ','.join(fields or DETAIL_FIELDS),
+            'key': self.api_key
         }
-        response = requests.get(google_maps_url, params=params)
-        return response.json()["result"]
+        return self.upstream.call(self._get_json, "details", params)["result"]
+
+    def iter_place_details(self, place_ids, place_type="hospital", deadline=None):
+        """
+        Fetch details for several places in parallel, yielding (place_id, details) pairs as
+        soon as each one is available.
+        When a cache is configured, fresh field groups are served from it and only the stale
+        fields are requested from Google; fetched details are written back once the batch ends.
+        Each call is bounded by self.timeout and the whole batch by deadline (defaults to twice
+        the per-call timeout). Places that fail or are still pending at the deadline are left
+        out, so the caller gets whatever arrived instead of an error.
+        """
+        deadline = self.timeout * 2 if deadline is None else deadline
+        unique_ids = list(dict.fromkeys(place_id for place_id in place_ids if place_id))
+
+        cached, stale_groups, futures = {}, {}, {}
+        for place_id in unique_ids:
+            if self.cache:
+                cached[place_id], stale_groups[place_id] = self.cache.lookup(place_id)
+            else:
+                cached[place_id], stale_groups[place_id] = {}, None
+            groups = stale_groups[place_id]
+            if groups == []:
+                continue
+            fields = self.cache.fields_for(groups) if groups else None
+            futures[self.executor.submit(self.place_details, place_id, fields)] = place_id
+
+        try:
+            for place_id in unique_ids:
+                if stale_groups[place_id] == []:
+                    yield place_id, cached[place_id]
+
+            finished = set()
+            try:
+                for future in as_completed(futures, timeout=deadline):
+                    place_id = futures[future]
+                    finished.add(place_id)
+                    result = dict(cached[place_id])
+                    try:
+                        fetched = future.result()
+                        result.update(fetched)
+                        if self.cache:
+                            self.cache.store(place_id, fetched, stale_groups[place_id], place_type)
+                    except Exception as e:
+                        print(f"Error fetching place details for {place_id}: {str(e)}")
+                    if result:
+                        yield place_id, result
+            except TimeoutError:
+                for future, place_id in futures.items():
+                    if place_id not in finished:
+                        future.cancel()
+                        print(f"Place details timed out for {place_id}")
+                        if cached[place_id]:
+                            yield place_id, dict(cached[place_id])
+        finally:
+            if self.cache and futures:
+                self.cache.commit()
 
-    
\ No newline at end of file
+    def place_details_many(self, place_ids, place_type="hospital", deadline=None):
+        """
+        Fetch details for several places in parallel, see iter_place_details.
+        Returns a dict of details keyed by place_id, in the order the ids were given.
+        """
+        found = dict(self.iter_place_details(place_ids, place_type, deadline))
+        return {place_id: found[place_id] for place_id in dict.fromkeys(place_ids) if place_id in found}
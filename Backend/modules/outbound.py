@@ -0,0 +1,251 @@
+import random
+import threading
+import time
+import groq
+import requests
+
+
+class OutboundError(Exception):
+    """Raised when an upstream call is refused without being attempted"""
+
+
+class CircuitOpenError(OutboundError):
+    pass
+
+
+class RateLimitExceeded(OutboundError):
+    pass
+
+
+class UpstreamRateLimited(Exception):
+    """Raised by callers when an upstream answers 200 but reports a quota error in its body"""
+
+
+def _status_code(error):
+    status = getattr(error, "status_code", None)
+    if status is None:
+        status = getattr(getattr(error, "response", None), "status_code", None)
+    return status if isinstance(status, int) else None
+
+
+def is_rate_limited(error):
+    return isinstance(error, UpstreamRateLimited) or _status_code(error) == 429
+
+
+def is_retryable(error):
+    """Connection problems, timeouts, 429s and 5xx responses are worth another attempt"""
+    if is_rate_limited(error):
+        return True
+    if isinstance(error, (requests.ConnectionError, requests.Timeout, groq.APIConnectionError)):
+        return True
+    status = _status_code(error)
+    return status is not None and status >= 500
+
+
+class TokenBucket:
+    """
+    Token bucket whose refill rate adapts to the upstream: it is halved whenever the upstream
+    reports rate limiting and creeps back up to max_rate after successful calls.
+    """
+
+    def __init__(self, rate, capacity, min_rate=None):
+        self.max_rate = rate
+        self.min_rate = min_rate or rate / 8
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def acquire(self, timeout):
+        """Takes one token, waiting up to timeout seconds for it. Returns False if none came."""
+        deadline = time.monotonic() + timeout
+        while True:
+            with self.lock:
+                self._refill()
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return True
+                wait = (1 - self.tokens) / self.rate
+            if time.monotonic() + wait > deadline:
+                return False
+            time.sleep(wait)
+
+    def slow_down(self):
+        with self.lock:
+            self.rate = max(self.min_rate, self.rate / 2)
+
+    def speed_up(self):
+        with self.lock:
+            self.rate = min(self.max_rate, self.rate + self.max_rate / 20)
+
+
+class CircuitBreaker:
+    """
+    Opens after failure_threshold consecutive failed calls, so further calls fail fast.
+    After reset_timeout one trial call is let through; its outcome closes or re-opens the circuit.
+    """
+
+    def __init__(self, failure_threshold=5, reset_timeout=30):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at = None
+        self.trial_running = False
+        self.lock = threading.Lock()
+
+    @property
+    def state(self):
+        with self.lock:
+            if self.opened_at is None:
+                return "closed"
+            if time.monotonic() - self.opened_at >= self.reset_timeout:
+                return "half_open"
+            return "open"
+
+    def allow(self):
+        with self.lock:
+            if self.opened_at is None:
+                return True
+            if time.monotonic() - self.opened_at < self.reset_timeout or self.trial_running:
+                return False
+            self.trial_running = True
+            return True
+
+    def cancel_trial(self):
+        # A trial call that never reached the upstream says nothing about its health
+        with self.lock:
+            self.trial_running = False
+
+    def record_success(self):
+        with self.lock:
+            self.failures = 0
+            self.opened_at = None
+            self.trial_running = False
+
+    def record_failure(self):
+        with self.lock:
+            self.failures += 1
+            if self.trial_running or self.failures >= self.failure_threshold:
+                self.opened_at = time.monotonic()
+            self.trial_running = False
+
+
+class Upstream:
+    """
+    Guards the calls made to one upstream service: at most max_concurrency calls in flight,
+    a token bucket for the request rate, jittered exponential retries of transient errors and
+    a circuit breaker that fails fast while the upstream is down.
+    """
+
+    def __init__(self, name, rate=10, burst=10, max_concurrency=8, timeout=10, retries=2, backoff=0.5,
+                 failure_threshold=5, reset_timeout=30):
+        self.name = name
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff = backoff
+        self.bucket = TokenBucket(rate, burst)
+        self.breaker = CircuitBreaker(failure_threshold, reset_timeout)
+        self.slots = threading.BoundedSemaphore(max_concurrency)
+        self.lock = threading.Lock()
+        self.counters = {"calls": 0, "succeeded": 0, "failed": 0, "retried": 0, "rejected": 0, "throttled": 0}
+
+    def _count(self, event):
+        with self.lock:
+            self.counters[event] += 1
+
+    def call(self, function, *args, **kwargs):
+        """
+        Runs function(*args, **kwargs) under this upstream's limits and returns its result.
+        Raises CircuitOpenError or RateLimitExceeded without calling the upstream when it is
+        unavailable, and re-raises the last error once the retries are used up.
+        """
+        self._count("calls")
+        if not self.breaker.allow():
+            self._count("rejected")
+            raise CircuitOpenError(f"{self.name} is unavailable, circuit open")
+
+        if not self.slots.acquire(timeout=self.timeout):
+            self._count("throttled")
+            self.breaker.cancel_trial()
+            raise RateLimitExceeded(f"Too many calls in flight to {self.name}")
+        try:
+            attempt = 0
+            while True:
+                if not self.bucket.acquire(self.timeout):
+                    self._count("throttled")
+                    self.breaker.cancel_trial()
+                    raise RateLimitExceeded(f"Request rate limit reached for {self.name}")
+                try:
+                    result = function(*args, **kwargs)
+                except Exception as e:
+                    if is_rate_limited(e):
+                        self.bucket.slow_down()
+                    if not is_retryable(e):
+                        # The upstream answered; a bad request is not an outage
+                        self.breaker.record_success()
+                        self._count("failed")
+                        raise
+                    if attempt >= self.retries:
+                        self.breaker.record_failure()
+                        self._count("failed")
+                        raise
+                    attempt += 1
+                    self._count("retried")
+                    # Full jitter keeps retrying workers from hitting the upstream in lockstep
+                    time.sleep(random.uniform(0, self.backoff * 2 ** (attempt - 1)))
+                    continue
+                self.bucket.speed_up()
+                self.breaker.record_success()
+                self._count("succeeded")
+                return result
+        finally:
+            self.slots.release()
+
+    def stats(self):
+        with self.lock:
+            counters = dict(self.counters)
+        counters["state"] = self.breaker.state
+        counters["rate"] = round(self.bucket.rate, 2)
+        return counters
+
+
+# Limits for the upstreams this backend calls; Places allows far more, Groq's free tier far less.
+# Groq's budget is split so doctor extraction bursts cannot queue, throttle or trip the breaker
+# of the interactive chat; together the two stay within the account's 0.5 requests a second.
+UPSTREAM_SETTINGS = {
+    "google_places": {"rate": 50, "burst": 50, "max_concurrency": 16, "timeout": 10},
+    "groq_chat": {"rate": 0.2, "burst": 3, "max_concurrency": 2, "timeout": 20},
+    "groq_extract": {"rate": 0.3, "burst": 4, "max_concurrency": 3, "timeout": 60},
+}
+
+
+class OutboundGovernor:
+    """Registry of the Upstream guards shared by every client in this process"""
+
+    def __init__(self, settings=None):
+        self.settings = dict(UPSTREAM_SETTINGS if settings is None else settings)
+        self.upstreams = {}
+        self.lock = threading.Lock()
+
+    def upstream(self, name):
+        with self.lock:
+            if name not in self.upstreams:
+                self.upstreams[name] = Upstream(name, **self.settings.get(name, {}))
+            return self.upstreams[name]
+
+    def call(self, name, function, *args, **kwargs):
+        return self.upstream(name).call(function, *args, **kwargs)
+
+    def stats(self):
+        with self.lock:
+            upstreams = dict(self.upstreams)
+        return {name: upstream.stats() for name, upstream in upstreams.items()}
+
+
+governor = OutboundGovernor()
@@ -0,0 +1,41 @@
+from modules.html_backends import parser_backend
+
+CHARS_PER_TOKEN = 4
+
+_default_backend = parser_backend()
+
+
+def main_text(html):
+    """Visible page text with navigation, footers, sidebars and other boilerplate removed, one block per line"""
+    return _default_backend.main_text(html)
+
+
+def estimate_tokens(text):
+    return len(text) // CHARS_PER_TOKEN + 1
+
+
+def chunk_text(text, max_tokens=1500, overlap_lines=2):
+    """
+    Splits text on line boundaries into chunks of at most max_tokens (estimated), repeating
+    the last overlap_lines lines of a chunk at the start of the next one so a doctor entry cut
+    at a boundary is still seen whole. Lines longer than a chunk are split on their own.
+    """
+    max_chars = max_tokens * CHARS_PER_TOKEN
+    lines = []
+    for line in text.split("\n"):
+        lines += [line[start:start + max_chars] for start in range(0, len(line), max_chars)] or [line]
+
+    chunks, current, size = [], [], 0
+    for line in lines:
+        if current and size + len(line) + 1 > max_chars:
+            chunks.append("\n".join(current))
+            current = current[-overlap_lines:] if overlap_lines else []
+            size = sum(len(kept) + 1 for kept in current)
+            # Carried-over lines must still leave room for the new one
+            while current and size + len(line) + 1 > max_chars:
+                size -= len(current.pop(0)) + 1
+        current.append(line)
+        size += len(line) + 1
+    if current and any(line.strip() for line in current):
+        chunks.append("\n".join(current))
+    return chunks
@@ -0,0 +1,100 @@
+import hashlib
+import re
+import threading
+from urllib.parse import parse_qsl, urlencode, urlparse, urlunparse
+
+import numpy as np
+
+# Query parameters that never change what a page shows
+TRACKING_PARAMS = {"gclid", "fbclid", "msclkid", "ref", "ref_src", "source", "mc_cid", "mc_eid", "_ga"}
+TRACKING_PREFIXES = ("utm_",)
+# Parameters whose value 1 is the page a site shows without them
+FIRST_PAGE_PARAMS = {"page", "p", "pg", "paged"}
+INDEX_FILES = re.compile(r"/(?:index|default)\.(?:html?|php|aspx?)$", re.IGNORECASE)
+DEFAULT_PORTS = {"http": 80, "https": 443}
+
+SIMHASH_BITS = 64
+SHINGLE_WORDS = 3
+# Pages with less text than this (e.g. empty app shells) are never treated as duplicates
+MIN_FINGERPRINT_TEXT = 500
+
+
+class DuplicatePage(Exception):
+    """Raised when a fetched page is a near-duplicate of a page already seen in the same crawl"""
+
+    def __init__(self, url, duplicate_of):
+        super().__init__(f"{url} duplicates {duplicate_of}")
+        self.url = url
+        self.duplicate_of = duplicate_of
+
+
+def canonical_url(url):
+    """
+    One spelling per page: lowercase scheme and host, no default port, fragment, tracking
+    parameters, trailing slash or index file, and sorted query parameters.
+    /doctors, /doctors/, /doctors?page=1 and /doctors/index.html all map to /doctors.
+    """
+    parsed = urlparse(url.strip())
+    scheme = parsed.scheme.lower()
+    host = (parsed.hostname or "").lower()
+    if parsed.port and parsed.port != DEFAULT_PORTS.get(scheme):
+        host = f"{host}:{parsed.port}"
+
+    path = re.sub(r"/{2,}", "/", parsed.path or "/")
+    path = INDEX_FILES.sub("/", path)
+    if len(path) > 1:
+        path = path.rstrip("/")
+
+    query = []
+    for name, value in parse_qsl(parsed.query, keep_blank_values=True):
+        lowered = name.lower()
+        if lowered in TRACKING_PARAMS or lowered.startswith(TRACKING_PREFIXES):
+            continue
+        if lowered in FIRST_PAGE_PARAMS and value == "1":
+            continue
+        query.append((name, value))
+    return urlunparse((scheme, host, path, "", urlencode(sorted(query)), ""))
+
+
+def simhash(text, bits=SIMHASH_BITS):
+    """SimHash of the word shingles in text: similar texts differ in few bits"""
+    words = re.findall(r"\w+", text.lower())
+    shingles = {" ".join(words[index:index + SHINGLE_WORDS]) for index in range(max(1, len(words) - SHINGLE_WORDS + 1))}
+    hashes = np.array(
+        [int.from_bytes(hashlib.blake2b(shingle.encode("utf-8"), digest_size=8).digest(), "big") for shingle in shingles],
+        dtype=np.uint64,
+    )
+    # One row of bits per shingle; each column votes +1 for a set bit and -1 for a clear one
+    bit_matrix = (hashes[:, None] >> np.arange(bits, dtype=np.uint64)) & np.uint64(1)
+    votes = bit_matrix.sum(axis=0, dtype=np.int64) * 2 - len(hashes)
+    return sum(1 << int(bit) for bit in np.flatnonzero(votes > 0))
+
+
+def similarity(first, second, bits=SIMHASH_BITS):
+    """Share of matching bits between two SimHash fingerprints"""
+    return 1 - bin(first ^ second).count("1") / bits
+
+
+class PageFingerprints:
+    """
+    Fingerprints of the pages fetched during one hospital crawl. A page whose text is at least
+    threshold similar to a different page already seen is reported as that page's duplicate.
+    """
+
+    def __init__(self, threshold=0.9):
+        self.threshold = threshold
+        self.fingerprints = {}
+        self.lock = threading.Lock()
+
+    def duplicate_of(self, url, text):
+        """The URL this page duplicates, or None after recording the page as new"""
+        if len(text.strip()) < MIN_FINGERPRINT_TEXT:
+            return None
+        url = canonical_url(url)
+        fingerprint = simhash(text)
+        with self.lock:
+            for seen_url, seen in self.fingerprints.items():
+                if seen_url != url and similarity(fingerprint, seen) >= self.threshold:
+                    return seen_url
+            self.fingerprints[url] = fingerprint
+        return None
@@ -0,0 +1,216 @@
+import json
+import threading
+from datetime import datetime, timedelta, timezone
+from modules.geo_index import GeoGridIndex
+
+
+def utcnow():
+    # SQLite drops tzinfo, so timestamps are stored and compared as naive UTC
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+class PlaceDetailsCache:
+    """
+    Read-through/write-through cache for Google place details, stored in the Hospitals
+    and Pharmacy tables. Details are split into field groups that age at different rates,
+    so a stale rating only costs a rating lookup instead of a full details request.
+    """
+
+    FIELD_GROUPS = {
+        "contact": ["name", "formatted_phone_number", "website", "geometry"],
+        "rating": ["rating"],
+        "hours": ["opening_hours"],
+    }
+
+    DEFAULT_TTL = {
+        "contact": timedelta(days=30),
+        "rating": timedelta(days=7),
+        "hours": timedelta(hours=12),
+    }
+
+    def __init__(self, db, hospital_model, pharmacy_model, ttl=None):
+        self.db = db
+        self.hospital_model = hospital_model
+        self.pharmacy_model = pharmacy_model
+        self.ttl = {**self.DEFAULT_TTL, **(ttl or {})}
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.partial_hits = 0
+        self.misses = 0
+        # Spatial indexes over the stored places, built on the first local search
+        self.indexes = None
+        # Rows stored but not yet committed, per thread like the database session that holds them
+        self.pending = threading.local()
+
+    def fields_for(self, groups):
+        return [field for group in groups for field in self.FIELD_GROUPS[group]]
+
+    def _find_row(self, place_id):
+        row = self.pharmacy_model.query.filter_by(place_id=place_id).first()
+        if row is None:
+            row = self.hospital_model.query.filter_by(place_id=place_id).first()
+        return row
+
+    def _row_to_details(self, row, groups):
+        is_pharmacy = isinstance(row, self.pharmacy_model)
+        details = {}
+        if "contact" in groups:
+            latitude = row.latitude if is_pharmacy else row.latitudes
+            longitude = row.longitude if is_pharmacy else row.longitudes
+            details["name"] = row.name if is_pharmacy else row.hospital_name
+            phone = row.phone_number if is_pharmacy else row.phone
+            if phone:
+                details["formatted_phone_number"] = phone
+            if row.website:
+                details["website"] = row.website
+            if latitude is not None and longitude is not None:
+                details["geometry"] = {"location": {"lat": float(latitude), "lng": float(longitude)}}
+        if "rating" in groups and row.rating is not None:
+            details["rating"] = float(row.rating)
+        if "hours" in groups and row.opening_hours_json:
+            details["opening_hours"] = json.loads(row.opening_hours_json)
+        return details
+
+    def lookup(self, place_id):
+        """
+        Returns (details, stale_groups) for a place. details holds every fresh field group
+        found in the database and stale_groups lists the groups that must be fetched again.
+        """
+        row = self._find_row(place_id)
+        if row is None:
+            with self.lock:
+                self.misses += 1
+            return {}, list(self.FIELD_GROUPS)
+
+        now = utcnow()
+        fresh, stale = [], []
+        for group in self.FIELD_GROUPS:
+            updated_at = getattr(row, f"{group}_updated_at")
+            if updated_at is not None and now - updated_at < self.ttl[group]:
+                fresh.append(group)
+            else:
+                stale.append(group)
+
+        with self.lock:
+            if not stale:
+                self.hits += 1
+            elif fresh:
+                self.partial_hits += 1
+            else:
+                self.misses += 1
+        return self._row_to_details(row, fresh), stale
+
+    def store(self, place_id, details, groups, place_type="hospital"):
+        """
+        Upserts the given field groups of a place's details. New places go into the
+        Pharmacy table when place_type is 'pharmacy' and into Hospitals otherwise.
+        """
+        row = self._find_row(place_id)
+        location = details.get("geometry", {}).get("location", {})
+
+        if row is None:
+            if "contact" not in groups or not details.get("name") or not location:
+                return
+            if place_type == "pharmacy":
+                row = self.pharmacy_model(place_id=place_id)
+            else:
+                row = self.hospital_model(place_id=place_id, type=place_type)
+            self.db.session.add(row)
+
+        is_pharmacy = isinstance(row, self.pharmacy_model)
+        now = utcnow()
+        if "contact" in groups:
+            if is_pharmacy:
+                row.name = details.get("name") or row.name
+                row.phone_number = details.get("formatted_phone_number")
+                if location:
+                    row.latitude = location.get("lat")
+                    row.longitude = location.get("lng")
+            else:
+                row.hospital_name = details.get("name") or row.hospital_name
+                row.phone = details.get("formatted_phone_number")
+                if location:
+                    row.latitudes = location.get("lat")
+                    row.longitudes = location.get("lng")
+            row.website = details.get("website")
+            row.contact_updated_at = now
+        if "rating" in groups:
+            row.rating = details.get("rating")
+            row.rating_updated_at = now
+        if "hours" in groups:
+            opening_hours = details.get("opening_hours")
+            row.opening_hours_json = json.dumps(opening_hours) if opening_hours else None
+            row.hours_updated_at = now
+        self._pending_rows().append(row)
+
+    def _pending_rows(self):
+        if not hasattr(self.pending, "rows"):
+            self.pending.rows = []
+        return self.pending.rows
+
+    def commit(self):
+        rows, self.pending.rows = self._pending_rows(), []
+        try:
+            self.db.session.commit()
+        except Exception as e:
+            self.db.session.rollback()
+            print(f"Error saving place details cache: {str(e)}")
+            return
+        if self.indexes is not None:
+            for row in rows:
+                self._index_row(row)
+
+    def _index_row(self, row):
+        if isinstance(row, self.pharmacy_model):
+            index, latitude, longitude = self.indexes["pharmacy"], row.latitude, row.longitude
+            summary = {"name": row.name, "user_ratings_total": row.user_ratings_total, "type": "pharmacy"}
+        else:
+            index, latitude, longitude = self.indexes["hospital"], row.latitudes, row.longitudes
+            summary = {"name": row.hospital_name, "user_ratings_total": row.num_rating, "type": row.type}
+        if latitude is None or longitude is None:
+            return
+        summary["place_id"] = row.place_id
+        summary["location"] = {"lat": float(latitude), "lng": float(longitude)}
+        summary["rating"] = float(row.rating) if row.rating is not None else None
+        index.add(row.place_id, latitude, longitude, summary)
+
+    def build_indexes(self):
+        self.indexes = {"pharmacy": GeoGridIndex(), "hospital": GeoGridIndex()}
+        for row in self.pharmacy_model.query.filter(self.pharmacy_model.place_id.isnot(None)).all():
+            self._index_row(row)
+        for row in self.hospital_model.query.filter(self.hospital_model.place_id.isnot(None)).all():
+            self._index_row(row)
+
+    def nearby(self, lat, lon, type="hospital", radius=5000):
+        """
+        Radius search over the stored places, nearest first.
+        Results are shaped like Places nearby search results, with an extra distance in meters.
+        """
+        if self.indexes is None:
+            self.build_indexes()
+        index = self.indexes["pharmacy" if type == "pharmacy" else "hospital"]
+
+        results = []
+        for distance, summary in index.query_radius(lat, lon, radius):
+            if type != "pharmacy" and summary["type"] not in (None, type):
+                continue
+            results.append({
+                "place_id": summary["place_id"],
+                "name": summary["name"],
+                "geometry": {"location": summary["location"]},
+                "rating": summary["rating"],
+                "user_ratings_total": summary["user_ratings_total"],
+                "types": [summary["type"] or type],
+                "distance": round(distance, 1),
+            })
+        return results
+
+    def stats(self):
+        with self.lock:
+            lookups = self.hits + self.partial_hits + self.misses
+            return {
+                "hits": self.hits,
+                "partial_hits": self.partial_hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+            }
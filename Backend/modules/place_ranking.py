@@ -0,0 +1,99 @@
+import math
+import numpy as np
+
+EARTH_RADIUS_M = 6371000
+
+# Relative weight of closeness, rating and number of ratings in a place's score
+DEFAULT_WEIGHTS = {"distance": 0.5, "rating": 0.3, "popularity": 0.2}
+
+
+def _number(value):
+    try:
+        return float(value or 0)
+    except (TypeError, ValueError):
+        return 0.0
+
+
+def _columns(places):
+    # One pass over the dicts; everything after this works on whole arrays
+    nan = float("nan")
+    rows = []
+    for place in places:
+        location = (place.get("geometry") or {}).get("location") or {}
+        lat, lng = location.get("lat"), location.get("lng")
+        rows.append((
+            nan if lat is None or lng is None else lat,
+            nan if lat is None or lng is None else lng,
+            _number(place.get("rating")),
+            _number(place.get("user_ratings_total")),
+        ))
+    columns = np.array(rows, dtype=float).reshape(len(rows), 4)
+    return columns[:, 0], columns[:, 1], columns[:, 2], columns[:, 3]
+
+
+def haversine_m(lat, lon, lats, lons):
+    """Distances in meters from (lat, lon) to every point in the lats/lons arrays"""
+    phi1 = math.radians(lat)
+    phi2 = np.radians(lats)
+    dphi = phi2 - phi1
+    dlambda = np.radians(lons) - math.radians(lon)
+    a = np.sin(dphi / 2) ** 2 + math.cos(phi1) * np.cos(phi2) * np.sin(dlambda / 2) ** 2
+    return 2 * EARTH_RADIUS_M * np.arcsin(np.sqrt(np.clip(a, 0, 1)))
+
+
+def score_places(places, lat, lon, radius=None, weights=None):
+    """
+    Scores Places results for a user at (lat, lon). Returns (scores, distances) arrays.
+    Closeness is measured against radius (or the farthest candidate), rating out of 5 and
+    popularity as log(user_ratings_total) relative to the most reviewed candidate.
+    Places without coordinates get an infinite distance and no closeness credit.
+    """
+    weights = weights or DEFAULT_WEIGHTS
+    lats, lons, ratings, reviews = _columns(places)
+    distances = haversine_m(float(lat), float(lon), lats, lons)
+    distances = np.where(np.isnan(distances), np.inf, distances)
+
+    finite = distances[np.isfinite(distances)]
+    reach = float(radius) if radius else (float(finite.max()) if finite.size else 0.0)
+    closeness = np.clip(1 - distances / reach, 0, 1) if reach > 0 else np.where(np.isfinite(distances), 1.0, 0.0)
+
+    rating = np.clip(ratings / 5, 0, 1)
+    popularity = np.log1p(np.maximum(reviews, 0))
+    if popularity.max(initial=0) > 0:
+        popularity = popularity / popularity.max()
+
+    scores = (
+        weights["distance"] * closeness
+        + weights["rating"] * rating
+        + weights["popularity"] * popularity
+    )
+    return scores, distances
+
+
+def rank_places(places, lat, lon, k=None, radius=None, weights=None):
+    """
+    Returns the k best places (all of them when k is None), best first.
+    Only the top k are fully sorted; the rest are discarded with a partial selection. Each
+    returned place is a shallow copy with its 'distance' in meters set.
+    """
+    if not places:
+        return []
+    scores, distances = score_places(places, lat, lon, radius, weights)
+
+    count = len(places) if k is None else max(0, min(k, len(places)))
+    if count == 0:
+        return []
+    if count < len(places):
+        candidates = np.argpartition(-scores, count - 1)[:count]
+    else:
+        candidates = np.arange(len(places))
+    # Ties are broken by distance, then by the original order
+    order = candidates[np.lexsort((candidates, distances[candidates], -scores[candidates]))]
+
+    ranked = []
+    for i in order:
+        place = dict(places[i])
+        if np.isfinite(distances[i]):
+            place["distance"] = round(float(distances[i]), 1)
+        ranked.append(place)
+    return ranked
@@ -0,0 +1,163 @@
+import hashlib
+import json
+import os
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qsl, urlparse
+
+from modules.geo_index import haversine_m
+
+
+def fixture_key(endpoint, params):
+    """Stable fixture name for a Places request; the API key never takes part in it"""
+    relevant = sorted((name, str(value)) for name, value in params.items() if name != "key")
+    digest = hashlib.sha256(json.dumps([endpoint, relevant]).encode("utf-8")).hexdigest()[:24]
+    return f"{endpoint}-{digest}"
+
+
+class PlacesRecorder:
+    """
+    Saves every successful Places API response NearbyPlaces receives as a JSON fixture, so
+    the replay server can later answer the same requests without Google or an API key.
+    """
+
+    def __init__(self, fixture_dir):
+        self.fixture_dir = fixture_dir
+        os.makedirs(fixture_dir, exist_ok=True)
+
+    def record(self, endpoint, params, data):
+        fixture = {
+            "endpoint": endpoint,
+            "params": {name: str(value) for name, value in params.items() if name != "key"},
+            "response": data,
+        }
+        path = os.path.join(self.fixture_dir, fixture_key(endpoint, params) + ".json")
+        temp_path = f"{path}.{threading.get_ident()}.tmp"
+        with open(temp_path, "w", encoding="utf-8") as file:
+            json.dump(fixture, file, ensure_ascii=False, indent=1)
+        os.replace(temp_path, path)
+
+
+def load_fixtures(fixture_dir):
+    fixtures = {}
+    for name in sorted(os.listdir(fixture_dir)):
+        if not name.endswith(".json"):
+            continue
+        with open(os.path.join(fixture_dir, name), "r", encoding="utf-8") as file:
+            fixture = json.load(file)
+        fixtures[fixture_key(fixture["endpoint"], fixture["params"])] = fixture
+    return fixtures
+
+
+class ReplayServer:
+    """
+    Local stand-in for the Places API that answers from recorded fixtures.
+    Point NearbyPlaces (PLACES_BASE_URL) at self.url. Each response is delayed by latency
+    plus up to jitter seconds, and error_rate of the requests fail with a 500 or an
+    OVER_QUERY_LIMIT body, for load tests on machines without internet access.
+    A nearby search with no exact recording is answered with the recording of the same place
+    type closest to the requested location.
+    """
+
+    def __init__(self, fixture_dir, host="127.0.0.1", port=0, latency=0.0, jitter=0.0, error_rate=0.0, seed=None):
+        self.fixtures = load_fixtures(fixture_dir)
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.random = random.Random(seed)
+        self.random_lock = threading.Lock()
+        self.stats = {"requests": 0, "replayed": 0, "nearest": 0, "missing": 0, "injected_errors": 0}
+        self.stats_lock = threading.Lock()
+        self.server = ThreadingHTTPServer((host, port), self._handler_class())
+        self.server.daemon_threads = True
+        self.thread = None
+
+    @property
+    def url(self):
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def _count(self, event):
+        with self.stats_lock:
+            self.stats[event] += 1
+
+    def _roll(self):
+        with self.random_lock:
+            return self.random.random(), self.random.uniform(0, self.jitter)
+
+    def _nearest_search(self, params):
+        try:
+            lat, lon = (float(part) for part in params.get("location", "").split(","))
+        except ValueError:
+            return None
+        best, best_distance = None, None
+        for fixture in self.fixtures.values():
+            recorded = fixture["params"]
+            if fixture["endpoint"] != "nearbysearch" or "location" not in recorded or recorded.get("type") != params.get("type"):
+                continue
+            fixture_lat, fixture_lon = (float(part) for part in recorded["location"].split(","))
+            distance = haversine_m(lat, lon, fixture_lat, fixture_lon)
+            if best_distance is None or distance < best_distance:
+                best, best_distance = fixture, distance
+        return best
+
+    def respond(self, path, params):
+        """(status_code, body) for a request to path with the given query params"""
+        self._count("requests")
+        roll, jitter = self._roll()
+        time.sleep(self.latency + jitter)
+
+        if roll < self.error_rate:
+            self._count("injected_errors")
+            if roll < self.error_rate / 2:
+                return 500, {"error_message": "Injected server error"}
+            return 200, {"status": "OVER_QUERY_LIMIT", "error_message": "Injected quota error", "results": []}
+
+        endpoint = path.strip("/").split("/")[0]
+        fixture = self.fixtures.get(fixture_key(endpoint, params))
+        if fixture is not None:
+            self._count("replayed")
+            return 200, fixture["response"]
+        if endpoint == "nearbysearch" and "pagetoken" not in params:
+            fixture = self._nearest_search(params)
+            if fixture is not None:
+                self._count("nearest")
+                return 200, fixture["response"]
+
+        self._count("missing")
+        if endpoint == "details":
+            return 200, {"status": "NOT_FOUND", "result": {}}
+        return 200, {"status": "ZERO_RESULTS", "results": []}
+
+    def _handler_class(self):
+        replay = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                parsed = urlparse(self.path)
+                status, body = replay.respond(parsed.path, dict(parse_qsl(parsed.query)))
+                payload = json.dumps(body).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+    def start(self):
+        self.thread = threading.Thread(target=self.server.serve_forever, name="places-replay", daemon=True)
+        self.thread.start()
+        return self
+
+    def serve_forever(self):
+        self.server.serve_forever()
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
@@ -0,0 +1,130 @@
+import re
+import threading
+from urllib.parse import urlparse
+
+# Resources a doctor listing never needs in order to render its text
+HEAVY_EXTENSIONS = (
+    "png", "jpg", "jpeg", "gif", "webp", "avif", "svg", "ico", "bmp",
+    "woff", "woff2", "ttf", "otf", "eot",
+    "mp4", "webm", "mov", "avi", "mp3", "ogg", "wav", "m4a",
+    "pdf", "zip",
+)
+HEAVY_ACCEPT_PREFIXES = ("image/", "video/", "audio/", "font/")
+
+# Analytics, ads, chat widgets, embeds and web font hosts commonly found on hospital websites
+TRACKER_DOMAINS = (
+    "googletagmanager.com", "google-analytics.com", "doubleclick.net", "googlesyndication.com",
+    "googleadservices.com", "facebook.net", "facebook.com", "hotjar.com", "clarity.ms", "stats.wp.com",
+    "zoho.in", "zohopublic.in", "tawk.to", "youtube.com", "ytimg.com", "twitter.com", "linkedin.com",
+    "instagram.com", "whatsapp.com", "fonts.googleapis.com", "fonts.gstatic.com",
+)
+
+# Requests that can return doctor JSON from any host: API paths and JSON files
+API_PATH_PATTERN = r"/(?:api|graphql|wp-json|rest|v\d+)(?:[/?]|$)|\.json(?:\?|$)"
+# Headless CMS and search backends that hospital sites load their listings from
+API_DOMAINS = (
+    "contentful.com", "ctfassets.net", "sanity.io", "prismic.io", "storyblok.com", "strapiapp.com", "datocms.com",
+    "hygraph.com", "graphcms.com", "algolia.net", "algolianet.com", "firebaseio.com", "supabase.co",
+)
+
+# Second-level labels under which registrable domains have three labels, e.g. apollo.co.in
+_SHARED_SECOND_LEVEL = {"co", "com", "org", "net", "ac", "gov", "edu", "nic", "res", "gen"}
+
+
+def site_of(host):
+    """Registrable part of a host name: www.apollohospitals.com -> apollohospitals.com"""
+    labels = (host or "").lower().split(":")[0].strip(".").split(".")
+    if len(labels) >= 3 and len(labels[-1]) == 2 and labels[-2] in _SHARED_SECOND_LEVEL:
+        return ".".join(labels[-3:])
+    return ".".join(labels[-2:])
+
+
+def _matches_domain(host, domains):
+    host = host.lower()
+    return any(host == domain or host.endswith("." + domain) for domain in domains)
+
+
+class InterceptionPolicy:
+    """
+    Decides which requests the rendering browser may make and which ones seleniumwire captures.
+    Heavy resources and trackers are blocked inside Chrome (content settings and CDP URL
+    blocking), only first-party traffic and API requests to any host are captured by the proxy,
+    and captured requests are filtered again by type. With block_third_party every other domain
+    is refused as well, at the cost of capturing (and aborting) third-party requests in the proxy.
+    """
+
+    def __init__(self, block_extensions=HEAVY_EXTENSIONS, block_domains=TRACKER_DOMAINS, block_third_party=False,
+                 max_captured_requests=200):
+        self.block_extensions = tuple(block_extensions)
+        self.block_domains = tuple(block_domains)
+        self.block_third_party = block_third_party
+        self.max_captured_requests = max_captured_requests
+        self.extension_pattern = re.compile(
+            r"\.(?:%s)$" % "|".join(re.escape(extension) for extension in self.block_extensions), re.IGNORECASE
+        )
+        self.lock = threading.Lock()
+        self.stats = {"allowed": 0, "blocked": 0}
+
+    def chrome_prefs(self):
+        return {
+            "profile.managed_default_content_settings.images": 2,
+            "profile.managed_default_content_settings.media_stream": 2,
+            "profile.default_content_setting_values.notifications": 2,
+        }
+
+    def seleniumwire_options(self):
+        return {
+            "request_storage": "memory",
+            "request_storage_max_size": self.max_captured_requests,
+            "ignore_http_methods": ["OPTIONS", "HEAD"],
+        }
+
+    def blocked_url_patterns(self):
+        """Patterns for CDP Network.setBlockedURLs, applied before requests reach the proxy"""
+        patterns = []
+        for extension in self.block_extensions:
+            patterns += [f"*.{extension}", f"*.{extension}?*"]
+        for domain in self.block_domains:
+            patterns += [f"*://{domain}/*", f"*://*.{domain}/*"]
+        return patterns
+
+    def scopes_for(self, url):
+        """
+        seleniumwire scopes: the page's own site plus API-looking requests and API hosts anywhere,
+        so listings served from a separate API or CMS backend are still captured. Everything is
+        in scope when third parties are blocked.
+        """
+        if self.block_third_party:
+            return []
+        site = re.escape(site_of(urlparse(url).netloc))
+        api_hosts = "|".join(re.escape(domain) for domain in API_DOMAINS)
+        return [
+            rf"^https?://([^/]*\.)?{site}(:\d+)?/",
+            rf"^https?://[^/]+(?:/[^?#]*?)?(?:{API_PATH_PATTERN})",
+            rf"^https?://([^/]*\.)?(?:{api_hosts})(:\d+)?/",
+        ]
+
+    def should_block(self, url, headers, first_party_site):
+        parsed = urlparse(url)
+        host = parsed.hostname or ""
+        if self.block_third_party and site_of(host) != first_party_site:
+            return True
+        if _matches_domain(host, self.block_domains):
+            return True
+        if self.extension_pattern.search(parsed.path):
+            return True
+        accept = (headers.get("Accept") or "").lower()
+        return accept.startswith(HEAVY_ACCEPT_PREFIXES)
+
+    def interceptor_for(self, url):
+        """seleniumwire request_interceptor for rendering url"""
+        first_party_site = site_of(urlparse(url).netloc)
+
+        def interceptor(request):
+            blocked = self.should_block(request.url, request.headers, first_party_site)
+            with self.lock:
+                self.stats["blocked" if blocked else "allowed"] += 1
+            if blocked:
+                request.abort()
+
+        return interceptor
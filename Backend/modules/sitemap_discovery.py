@@ -0,0 +1,132 @@
+import gzip
+import io
+import re
+import threading
+import xml.etree.ElementTree as ElementTree
+from urllib.parse import urljoin, urlparse
+
+from modules.link_classifier import link_classifier_for
+from modules.page_fingerprint import canonical_url
+from modules.request_policy import site_of
+
+# Probed when robots.txt lists no sitemap; WordPress SEO plugins redirect it to their index
+DEFAULT_SITEMAP_PATH = "/sitemap.xml"
+GZIP_MAGIC = b"\x1f\x8b"
+
+
+def _local_name(tag):
+    return tag.rsplit("}", 1)[-1]
+
+
+def _slug_text(path):
+    # "/our-doctors/dr-meera-iyer-cardiology/" -> "our doctors dr meera iyer cardiology"
+    return " ".join(re.split(r"[/\-_.]+", path)).strip()
+
+
+def iter_sitemap(stream):
+    """
+    Streams ("sitemap" | "url", loc) pairs out of a sitemap or sitemap index file object,
+    gzip-compressed or not, without holding the whole document in memory.
+    """
+    stream = io.BufferedReader(stream) if not hasattr(stream, "peek") else stream
+    if stream.peek(2)[:2] == GZIP_MAGIC:
+        stream = gzip.GzipFile(fileobj=stream)
+
+    loc = None
+    for _, element in ElementTree.iterparse(stream, events=("end",)):
+        name = _local_name(element.tag)
+        if name == "loc":
+            loc = (element.text or "").strip()
+        elif name in ("sitemap", "url"):
+            if loc:
+                yield name, loc
+            loc = None
+            # Finished entries are dropped so memory stays flat on sitemaps with many URLs
+            element.clear()
+
+
+class SitemapDiscovery:
+    """
+    Finds doctor pages through a hospital's sitemaps instead of crawling its navigation.
+    Sitemaps come from robots.txt (or /sitemap.xml when it lists none) and sitemap indexes are
+    followed, reading child sitemaps that look doctor-related first. Every listed page on the
+    hospital's site is scored with the link classifier on its URL alone, and variants of one URL
+    are counted once.
+    """
+
+    def __init__(self, http, max_sitemaps=10, max_urls=50000):
+        self.http = http
+        self.max_sitemaps = max_sitemaps
+        self.max_urls = max_urls
+        self.lock = threading.Lock()
+        self.stats = {"sitemaps_read": 0, "urls_seen": 0, "sitemap_errors": 0}
+
+    def _count(self, event, amount=1):
+        with self.lock:
+            self.stats[event] += amount
+
+    def sitemap_urls(self, homepage_url):
+        listed = self.http.sitemaps(homepage_url)
+        if listed:
+            return listed
+        return [urljoin(homepage_url, DEFAULT_SITEMAP_PATH)]
+
+    def _read(self, sitemap_url):
+        response = self.http.stream(sitemap_url)
+        try:
+            response.raise_for_status()
+            # Undo Content-Encoding: gzip; .xml.gz files are detected by iter_sitemap itself
+            response.raw.decode_content = True
+            # Buffered readers on top of raw must see an empty read at the end, not a closed file
+            response.raw.auto_close = False
+            yield from iter_sitemap(response.raw)
+        finally:
+            response.close()
+
+    def discover(self, homepage_url, doctor_type, limit=20):
+        """
+        Doctor page URLs from the sitemaps, best first. Returns None when the site has no
+        readable sitemap, and an empty list when its sitemaps list no doctor pages.
+        """
+        classifier = link_classifier_for(doctor_type)
+        site = site_of(urlparse(homepage_url).netloc)
+        pending = [(0, url) for url in self.sitemap_urls(homepage_url)]
+        visited = set()
+        link_scores = {}
+        original_urls = {}
+        urls_seen = 0
+        found_sitemap = False
+
+        while pending and len(visited) < self.max_sitemaps and urls_seen < self.max_urls:
+            pending.sort(key=lambda item: -item[0])
+            _, sitemap_url = pending.pop(0)
+            if sitemap_url in visited:
+                continue
+            visited.add(sitemap_url)
+            try:
+                for kind, loc in self._read(sitemap_url):
+                    if kind == "sitemap":
+                        path = urlparse(loc).path.lower()
+                        pending.append((classifier.score(_slug_text(path), "", path), loc))
+                        continue
+                    urls_seen += 1
+                    if urls_seen > self.max_urls:
+                        break
+                    parsed = urlparse(loc)
+                    path = parsed.path.lower()
+                    text = _slug_text(path)
+                    if site_of(parsed.netloc) != site or not classifier.is_relevant(text, "", path):
+                        continue
+                    page_key = canonical_url(loc)
+                    original_urls.setdefault(page_key, loc)
+                    link_scores[page_key] = max(classifier.score(text, "", path), link_scores.get(page_key, 0))
+                found_sitemap = True
+                self._count("sitemaps_read")
+            except Exception as e:
+                self._count("sitemap_errors")
+                print(f"Could not read sitemap {sitemap_url}: {str(e)}")
+
+        self._count("urls_seen", min(urls_seen, self.max_urls))
+        if not found_sitemap:
+            return None
+        return [original_urls[page_key] for page_key in classifier.rank(link_scores)[:limit]]
@@ -0,0 +1,190 @@
+import re
+from urllib.parse import urljoin
+
+from modules.content_signals import (
+    DOCTOR_NAME_PATTERN, SPECIALTY_TERMS, _types, json_ld_blocks, specialty_stems,
+)
+from modules.html_backends import parser_backend
+
+DOCTOR_TYPES = {"physician"}
+# Where schema.org organisations list their doctors
+MEMBER_FIELDS = ("employee", "employees", "member", "members", "physician", "physicians", "founder")
+MICRODATA_TYPE_PATTERN = re.compile(r"schema\.org/(?:Physician|Person)\b", re.IGNORECASE)
+CARD_CLASS_PATTERN = re.compile(
+    r"doctor|physician|consultant|specialist|faculty|team-member|team_member|profile|expert", re.IGNORECASE
+)
+CARD_TAGS = ("div", "li", "article", "section", "a", "figure")
+# "Dr. Meera Iyer" or "Dr. Meera Iyer, MBBS, DM" on a line of its own
+NAME_LINE_PATTERN = re.compile(r"^D[Rr]\.?\s+(?:[A-Z]\.?\s*)*[A-Z][A-Za-z.'\- ]{1,60}(?:,.{0,80})?$")
+# A single card-like element is too weak a signal on its own
+MIN_DOCTOR_CARDS = 2
+# Fewer structured doctors than this, e.g. one featured Physician on a listing, is left to the LLM
+MIN_STRUCTURED_DOCTORS = 2
+# Requested specialties that cover every doctor on a page
+GENERIC_DOCTOR_TYPES = {"doctor", "doctors", "physician", "physicians", "specialist", "specialists", "consultant"}
+
+
+def _text(value):
+    if isinstance(value, list):
+        value = ", ".join(_text(item) for item in value if _text(item))
+    if isinstance(value, dict):
+        value = value.get("name") or value.get("url") or value.get("@id")
+    if value is None:
+        return None
+    value = " ".join(str(value).split())
+    return value or None
+
+
+def _doctor(name, designation=None, specialization=None, contact=None, image=None):
+    return {
+        "Name": name,
+        "Designation": designation,
+        "Specialization": specialization,
+        "Contact": contact,
+        "Doctor_Image": image,
+    }
+
+
+def _looks_like_doctor(block):
+    types = _types(block)
+    if types & DOCTOR_TYPES:
+        return True
+    if "person" not in types:
+        return False
+    described = " ".join(filter(None, (_text(block.get("name")), _text(block.get("jobTitle")),
+                                       _text(block.get("medicalSpecialty")), _text(block.get("description")))))
+    return bool(DOCTOR_NAME_PATTERN.search(described) or SPECIALTY_TERMS.search(described))
+
+
+def from_json_ld(blocks, base_url=None):
+    """Doctors described by schema.org Physician (or doctor-like Person) objects, including organisation members"""
+    doctors = []
+    pending = list(blocks)
+    while pending:
+        block = pending.pop(0)
+        if not isinstance(block, dict):
+            continue
+        for field in MEMBER_FIELDS:
+            members = block.get(field)
+            pending.extend(members if isinstance(members, list) else [members])
+        if not _looks_like_doctor(block) or not _text(block.get("name")):
+            continue
+        image = _text(block.get("image"))
+        doctors.append(_doctor(
+            _text(block.get("name")),
+            _text(block.get("jobTitle")),
+            _text(block.get("medicalSpecialty")) or _text(block.get("knowsAbout")),
+            _text(block.get("email")) or _text(block.get("telephone")),
+            urljoin(base_url, image) if image and base_url else image,
+        ))
+    return doctors
+
+
+def _absolute(source, base_url):
+    return urljoin(base_url, source) if source and base_url else source
+
+
+def from_microdata(items, base_url=None):
+    """Doctors among microdata items, given as (itemtype, {itemprop: value}) by a parser backend"""
+    doctors = []
+    for itemtype, properties in items:
+        block = {"@type": itemtype.rsplit("/", 1)[-1], **properties}
+        if _looks_like_doctor(block) and properties.get("name"):
+            doctors.append(_doctor(
+                properties["name"],
+                properties.get("jobTitle"),
+                properties.get("medicalSpecialty"),
+                properties.get("email") or properties.get("telephone"),
+                _absolute(properties.get("image"), base_url),
+            ))
+    return doctors
+
+
+def from_doctor_cards(cards, base_url=None):
+    """
+    Doctor cards, given as (text lines, contact href, image source) by a parser backend for
+    elements whose class mentions doctors or profiles: cards whose text holds exactly one
+    "Dr. ..." line, with the designation on the following line.
+    """
+    doctors = []
+    for lines, contact, image in cards:
+        names = [index for index, line in enumerate(lines) if NAME_LINE_PATTERN.match(line)]
+        if len(names) != 1:
+            continue
+        name, _, qualifications = lines[names[0]].partition(",")
+        following = [line for line in lines[names[0] + 1:] if len(line) <= 120]
+        specialization = next((line for line in following if SPECIALTY_TERMS.search(line)), None)
+        doctors.append(_doctor(
+            name.strip(),
+            following[0] if following else qualifications.strip() or None,
+            specialization,
+            (contact.split(":", 1)[1].split("?")[0] or None) if contact else None,
+            _absolute(image, base_url),
+        ))
+    return doctors
+
+
+def _name_key(name):
+    name = re.sub(r"^dr\.?\s+", "", name.lower())
+    return re.sub(r"[^a-z0-9]+", " ", name).strip()
+
+
+def _missing(value):
+    # LLM extractions spell a missing field as "none"
+    return value is None or str(value).strip().lower() in ("", "none", "null", "n/a")
+
+
+def merge_doctors(*sources):
+    """Deduplicates doctors by name, filling fields missing in one source from the others"""
+    merged = {}
+    for doctors in sources:
+        for doctor in doctors:
+            key = _name_key(doctor["Name"])
+            if not key:
+                continue
+            if key not in merged:
+                merged[key] = dict(doctor)
+                continue
+            for field, value in doctor.items():
+                if _missing(merged[key].get(field)) and not _missing(value):
+                    merged[key][field] = value
+    return list(merged.values())
+
+
+def matches_specialty(doctor, doctor_type):
+    words = set(re.findall(r"[a-z]+", doctor_type.lower()))
+    if not words or words <= GENERIC_DOCTOR_TYPES:
+        return True
+    # British spellings: gynaecology, paediatrics, orthopaedics
+    described = " ".join(filter(None, (doctor.get("Designation"), doctor.get("Specialization")))).lower()
+    described = described.replace("ae", "e")
+    return any(stem in described for stem in specialty_stems(doctor_type.lower().replace("ae", "e")))
+
+
+_default_backend = parser_backend()
+
+
+def structured_doctors(html, json_responses=(), doctor_type="", base_url=None, parser=None):
+    """
+    Doctors published as structured data on a page (JSON-LD, microdata) or laid out as doctor
+    cards, in the same shape as the LLM extraction, limited to the requested specialty.
+    """
+    blocks = json_ld_blocks(html)
+    for response in json_responses:
+        data = response.get("data")
+        blocks.extend(data if isinstance(data, list) else [data])
+    found = [from_json_ld(blocks, base_url)]
+
+    if "itemtype" in html or DOCTOR_NAME_PATTERN.search(html):
+        items, card_elements = (parser or _default_backend).structured_elements(
+            html, MICRODATA_TYPE_PATTERN, CARD_TAGS, CARD_CLASS_PATTERN
+        )
+        found.append(from_microdata(items, base_url))
+        cards = from_doctor_cards(card_elements, base_url)
+        if len(cards) >= MIN_DOCTOR_CARDS or any(found):
+            found.append(cards)
+
+    doctors = merge_doctors(*found)
+    if len(doctors) < MIN_STRUCTURED_DOCTORS:
+        return []
+    return [doctor for doctor in doctors if matches_specialty(doctor, doctor_type)]
@@ -1,27 +1,71 @@
 import os
 from dotenv import load_dotenv
-import requests
 import json
+import hashlib
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from groq import Groq
-from bs4 import BeautifulSoup
 from seleniumwire import webdriver
-from selenium.webdriver.chrome.service import Service
 from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
-from urllib.parse import urljoin, urlparse
-import re
-from collections import deque
+from urllib.parse import urldefrag, urljoin, urlparse
+from modules.browser_pool import BrowserPool
+from modules.crawler_http import CrawlerHttp, RobotsDisallowed
+from modules.link_classifier import link_classifier_for
+from modules import outbound
+from modules.content_signals import doctor_signals, has_doctor_content, json_ld_blocks
+from modules.request_policy import InterceptionPolicy
+from modules.structured_doctors import merge_doctors, structured_doctors
+from modules.page_chunker import CHARS_PER_TOKEN, chunk_text
+from modules.html_backends import parser_backend
+from modules.page_fingerprint import DuplicatePage, canonical_url
+from modules.sitemap_discovery import SitemapDiscovery
+from modules.crawl_frontier import CrawlFrontier
+from modules.json_capture import JsonCapture, serialise_for_prompt
 
 load_dotenv()
 
+# Bump whenever the extraction prompts or model change, so cached extractions are not reused
+PROMPT_VERSION = "2"
+EXTRACTION_MODEL = "llama-3.3-70b-versatile"
+# Seconds between checks while another worker holds the last pages of a hospital crawl,
+# and the longest a search waits for them before answering with the links found so far
+FRONTIER_POLL_INTERVAL = 0.5
+FRONTIER_MAX_WAIT = 10
+# Token budget of one extraction call's page text, and how many calls one page may take
+CHUNK_TOKENS = 1500
+MAX_CHUNKS = 8
+MAX_JSON_CHUNKS = 2
+
 class WebsiteScraper:
-    def __init__(self, api_key=None):
+    def __init__(self, api_key=None, browser_pool_size=2, pages_per_browser=50, cache_dir=None, extraction_cache=None,
+                 request_policy=None, extraction_workers=4, frontier=None, html_parser="lxml",
+                 json_capture=None, http=None):
         self.api_key = api_key
-        self.client = Groq(api_key=self.api_key)
+        self.request_policy = request_policy or InterceptionPolicy()
+        self.json_capture = json_capture or JsonCapture()
+        # Link and text extraction; "html.parser" is the slower pure-Python reference
+        self.parser = parser_backend(html_parser)
+        # Retries are left to the shared groq_extract upstream guard
+        self.client = Groq(api_key=self.api_key, timeout=60, max_retries=0)
+        self.upstream = outbound.governor.upstream("groq_extract")
+        self.extraction_cache = extraction_cache
+        self.extraction_pool = ThreadPoolExecutor(max_workers=extraction_workers, thread_name_prefix="doctor-chunks")
+        self.browser_pool = BrowserPool(self._launch_browser, size=browser_pool_size, max_pages=pages_per_browser)
+        # Pass a shared CrawlerHttp so every scraper keeps to the same per-domain spacing
+        self.http = http or CrawlerHttp(cache_dir=cache_dir)
+        self.sitemaps = SitemapDiscovery(self.http)
+        # Without a shared frontier file, crawls are only shared within this scraper
+        self.frontier = frontier or CrawlFrontier(":memory:")
+        self.tier_lock = threading.Lock()
+        self.tier_stats = {"static": 0, "browser": 0, "static_failed": 0, "duplicate": 0}
+        self.extraction_stats = {"structured": 0, "cached": 0, "llm": 0}
+        self.discovery_stats = {"sitemap": 0, "crawl": 0, "reused": 0}
 
-    def get_rendered_html(self, url):
+    def _launch_browser(self):
         chrome_options = Options()
         chrome_options.add_argument("--headless=chrome")
         chrome_options.add_argument("--no-sandbox")
@@ -33,179 +77,221 @@ class WebsiteScraper:
             (KHTML, like Gecko) Chrome/114.0.0.0 Safari/537.36"
         )
         chrome_options.add_argument("--log-level=3")
+        chrome_options.add_argument("--blink-settings=imagesEnabled=false")
+        chrome_options.add_argument("--autoplay-policy=user-gesture-required")
+        chrome_options.add_experimental_option("prefs", self.request_policy.chrome_prefs())
 
-        driver = webdriver.Chrome(options=chrome_options)
-
+        driver = webdriver.Chrome(options=chrome_options, seleniumwire_options=self.request_policy.seleniumwire_options())
+        # Heavy files and trackers are refused inside Chrome, before they reach the capturing proxy
         try:
+            driver.execute_cdp_cmd("Network.enable", {})
+            driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": self.request_policy.blocked_url_patterns()})
+        except Exception as e:
+            print(f"Could not set blocked URLs in the browser: {e}")
+        return driver
+
+    def get_rendered_html(self, url):
+        with self.browser_pool.browser() as driver:
+            driver.scopes = self.request_policy.scopes_for(url)
+            driver.request_interceptor = self.request_policy.interceptor_for(url)
             driver.get(url)
             WebDriverWait(driver, 10).until(
                 EC.presence_of_element_located((By.TAG_NAME, "body"))
             )
 
-            json_responses = []
-            for request in driver.requests:
-                if request.response and "application/json" in request.response.headers.get("Content-Type", ""):
-                    try:
-                        body = request.response.body.decode("utf-8", errors="ignore")
-                        data = json.loads(body)
-                        json_responses.append({
-                            "url": request.url,
-                            "data": data
-                        })
-                    except Exception:
-                        pass
+            # Only the most relevant JSON bodies are decoded and parsed, within byte budgets
+            json_responses = self.json_capture.capture(driver.requests)
 
             html = driver.page_source
             return html, json_responses
-        finally:
-            driver.quit()
 
     def find_doctor_page_links(self, homepage_url, doctor_type, max_pages=5):
         """
-        Enhanced method to crawl multiple pages and find doctor-related URLs with robust keyword matching
+        Finds doctor-related URLs on a hospital website, from its sitemaps when they list any
+        and otherwise by crawling up to max_pages pages with robust keyword matching.
+        How a hospital's pages were found is kept in the frontier, so repeat searches within its
+        recrawl window neither re-read the sitemaps nor try them again before crawling.
+        """
+        domain, specialty = urlparse(homepage_url).netloc.lower(), doctor_type.lower()
+        known = self.frontier.discovery(domain, specialty)
+        if known and known[0] == "sitemap":
+            with self.tier_lock:
+                self.discovery_stats["reused"] += 1
+            return known[1]
+
+        sitemap_urls = None
+        if known is None:
+            try:
+                sitemap_urls = self.sitemaps.discover(homepage_url, doctor_type)
+            except Exception as e:
+                print(f"Sitemap discovery failed for {homepage_url}: {str(e)}")
+            else:
+                method = "sitemap" if sitemap_urls else "crawl"
+                self.frontier.record_discovery(domain, specialty, method, sitemap_urls or [])
+        if sitemap_urls:
+            with self.tier_lock:
+                self.discovery_stats["sitemap"] += 1
+            print(f"Found {len(sitemap_urls)} potential doctor page URLs in the sitemaps of {homepage_url}")
+            return sitemap_urls
+
+        with self.tier_lock:
+            self.discovery_stats["crawl"] += 1
+        return self.crawl_doctor_page_links(homepage_url, doctor_type, max_pages)
+
+    def crawl_doctor_page_links(self, homepage_url, doctor_type, max_pages=5):
+        """
+        Enhanced method to crawl multiple pages and find doctor-related URLs with robust keyword matching.
+        Pages are leased from the shared crawl frontier, so concurrent and repeated searches for
+        the same hospital continue one crawl instead of each starting their own.
         """
-        visited_urls = set()
-        all_found_urls = set()
-        urls_to_visit = deque([homepage_url])
         base_domain = urlparse(homepage_url).netloc
+        domain = base_domain.lower()
+        specialty = doctor_type.lower()
+        worker_id = f"{os.getpid()}-{threading.get_ident()}"
         
-        # Comprehensive keyword list for medical websites
-        doctor_keywords = [
-            # Basic terms
-            'about-us', 'doctor', 'doctors', 'our doctors', doctor_type.lower(),
-            'specialist', 'specialists', 'department', 'departments', 'our team',
-            
-            # Medical staff terms
-            'medical team', 'healthcare team', 'medical staff', 'clinical team',
-            'physicians', 'physician', 'consultants', 'cfonsultant', 'faculty',
-            'medical faculty', 'clinical faculty', 'staff', 'medical professionals',
-            
-            # Department/Service terms
-            'services', 'medical services', 'clinical services', 'specialties',
-            'specialty', 'specialization', 'divisions', 'division', 'units',
-            'medical units', 'clinical units', 'centers', 'centre', 'center',
-            
-            # About/Info terms
-            'about', 'about us', 'team', 'our staff', 'meet our', 'meet the',
-            'leadership', 'directory', 'staff directory', 'physician directory',
-            'find a doctor', 'find doctor', 'search doctor', 'book appointment',
-            
-            # Medical specialties (add more as needed)
-            'cardiology', 'neurology', 'orthopedic', 'pediatric', 'gynecology',
-            'oncology', 'dermatology', 'psychiatry', 'radiology', 'surgery',
-            'emergency', 'internal medicine', 'family medicine', 'pathology',
-            
-            # Common variations
-            'dr.', 'dr', 'md', 'phd', 'profile', 'profiles', 'bio', 'biography',
-            'credentials', 'experience', 'expertise', 'qualifications'
-        ]
-        
-        # URL path keywords
-        url_keywords = [
-            'doctor', 'doctors', 'physician', 'staff', 'team', 'about',
-            'department', 'service', 'specialty', 'faculty', 'profile',
-            'bio', 'directory', 'find', 'search', 'meet', doctor_type.lower()
-        ]
+        classifier = link_classifier_for(doctor_type)
+        self.frontier.seed(domain, specialty, canonical_url(homepage_url), homepage_url)
         
         pages_crawled = 0
+        waited = 0
         
-        while urls_to_visit and pages_crawled < max_pages:
-            current_url = urls_to_visit.popleft()
-            
-            if current_url in visited_urls:
-                continue
+        while True:
+            page = self.frontier.lease(domain, specialty, worker_id, max_pages)
+            if page is None:
+                # Another worker is still crawling this hospital; its links are part of the answer
+                if self.frontier.in_flight(domain, specialty) and waited < FRONTIER_MAX_WAIT:
+                    time.sleep(FRONTIER_POLL_INTERVAL)
+                    waited += FRONTIER_POLL_INTERVAL
+                    continue
+                break
+            current_url = page["url"]
                 
             try:
                 print(f"Crawling page {pages_crawled + 1}: {current_url}")
-                response = requests.get(current_url, timeout=10)
+                response = self.http.get(current_url)
                 response.raise_for_status()
                 
-                visited_urls.add(current_url)
                 pages_crawled += 1
                 
-                soup = BeautifulSoup(response.text, 'html.parser')
-                links = soup.find_all('a', href=True)
+                links = self.parser.links(response.text)
+                # Scores are kept per canonical URL; the first spelling seen is the one returned and fetched
+                link_scores = {}
+                original_urls = {}
                 
-                for link in links:
-                    href = link.get('href', '')
-                    text = link.get_text(strip=True).lower()
-                    title = link.get('title', '').lower()
+                for href, text, title in links:
+                    text = text.lower()
+                    title = title.lower()
                     
                     # Skip empty or invalid links
                     if not href or href.startswith('#') or href.startswith('mailto:') or href.startswith('tel:'):
                         continue
                     
                     # Convert relative URLs to absolute
-                    full_url = urljoin(current_url, href)
+                    full_url = urldefrag(urljoin(current_url, href))[0]
                     parsed_url = urlparse(full_url)
+                    page_key = canonical_url(full_url)
                     
                     # Only process URLs from the same domain
                     if parsed_url.netloc != base_domain:
                         continue
                     
-                    # Check if URL or text contains relevant keywords
-                    is_relevant = False
-                    
-                    # Check text content
-                    if text and any(keyword in text for keyword in doctor_keywords):
-                        is_relevant = True
-                    
-                    # Check title attribute
-                    if title and any(keyword in title for keyword in doctor_keywords):
-                        is_relevant = True
-                    
-                    # Check URL path
+                    # Check if URL, text or title contains relevant keywords
                     url_path = parsed_url.path.lower()
-                    if any(keyword in url_path for keyword in url_keywords):
-                        is_relevant = True
-                    
-                    # Special patterns in URL
-                    if re.search(r'/(doctor|physician|staff|team|about|department|specialty)s?/', url_path):
-                        is_relevant = True
-                    
-                    if is_relevant:
-                        all_found_urls.add(full_url)
-                        
-                        # Add to crawl queue if not visited (for next level crawling)
-                        if full_url not in visited_urls and len(urls_to_visit) < 20:  # Limit queue size
-                            urls_to_visit.append(full_url)
+                    if classifier.is_relevant(text, title, url_path):
+                        score = classifier.score(text, title, url_path)
+                        original_urls.setdefault(page_key, full_url)
+                        link_scores[page_key] = max(score, link_scores.get(page_key, 0))
+                
+                self.frontier.add_links(
+                    domain, specialty, [(key, original_urls[key], score) for key, score in link_scores.items()],
+                    page["depth"] + 1,
+                )
+                self.frontier.complete(domain, specialty, page["url_key"])
                 
             except Exception as e:
                 print(f"Error crawling {current_url}: {str(e)}")
+                self.frontier.complete(domain, specialty, page["url_key"], failed=True)
                 continue
         
-        # Remove duplicates and sort by URL length (shorter URLs often more relevant)
-        unique_urls = sorted(list(all_found_urls), key=lambda x: len(x))
-        
-        # Filter out obviously irrelevant URLs
-        filtered_urls = []
-        exclude_patterns = [
-            'login', 'register', 'cart', 'checkout', 'payment', 'admin',
-            'wp-admin', 'wp-content', 'privacy', 'terms', 'cookie',
-            'newsletter', 'subscription', 'download', 'pdf', 'image',
-            'photo', 'gallery', 'news', 'blog', 'event', 'calendar'
-        ]
-        
-        for url in unique_urls:
-            url_lower = url.lower()
-            if not any(pattern in url_lower for pattern in exclude_patterns):
-                filtered_urls.append(url)
+        # Filter out obviously irrelevant URLs and put the most doctor-like links first
+        link_scores, original_urls = self.frontier.links(domain, specialty)
+        filtered_urls = [original_urls[page_key] for page_key in classifier.rank(link_scores)]
         
         print(f"Found {len(filtered_urls)} potential doctor page URLs after crawling {pages_crawled} pages")
         return filtered_urls[:20]  # Return top 20 most relevant URLs
 
-    def fetch_doctor_information(self, url, doctor_type):
+    def _count_tier(self, tier):
+        with self.tier_lock:
+            self.tier_stats[tier] += 1
+
+    def _count_extraction(self, method):
+        with self.tier_lock:
+            self.extraction_stats[method] += 1
+
+    def _check_duplicate(self, url, html, fingerprints):
+        if fingerprints is None:
+            return
+        duplicate_of = fingerprints.duplicate_of(url, self.page_text(html))
+        if duplicate_of:
+            self._count_tier("duplicate")
+            raise DuplicatePage(url, duplicate_of)
+
+    def fetch_page(self, url, doctor_type, fingerprints=None):
+        """
+        Two-tier fetch of a doctor page. A plain (cached, robots-aware) GET is tried first and
+        kept when the HTML already shows doctors; client-rendered pages and failed fetches
+        escalate to headless Chrome. Returns (html, json_responses) like get_rendered_html,
+        with any JSON-LD on a static page passed along as json_responses.
+        Raises RobotsDisallowed for pages robots.txt disallows.
+        With the crawl's PageFingerprints, raises DuplicatePage for a page whose text nearly
+        matches one already fetched, before it is extracted (and before rendering when the
+        static HTML already shows doctors).
+        """
+        try:
+            response = self.http.get(url)
+            response.raise_for_status()
+            if "html" in response.headers.get("Content-Type", "text/html"):
+                if has_doctor_content(doctor_signals(response.text, doctor_type)):
+                    # Pages without doctors yet may be app shells that only differ once rendered
+                    self._check_duplicate(url, response.text, fingerprints)
+                    self._count_tier("static")
+                    return response.text, [{"url": url, "data": block} for block in json_ld_blocks(response.text)]
+        except (DuplicatePage, RobotsDisallowed):
+            # Pages robots.txt disallows are not fetched by the browser either
+            raise
+        except Exception as e:
+            self._count_tier("static_failed")
+            print(f"Static fetch failed for {url}, rendering instead: {str(e)}")
+        self._count_tier("browser")
         html, json_responses = self.get_rendered_html(url)
-        
-        json_text = json.dumps(json_responses, ensure_ascii=False)
+        self._check_duplicate(url, html, fingerprints)
+        return html, json_responses
+
+    def fetch_doctor_information(self, url, doctor_type, fingerprints=None):
+        try:
+            html, json_responses = self.fetch_page(url, doctor_type, fingerprints)
+        except DuplicatePage as e:
+            print(f"Skipping {e.url}, same content as {e.duplicate_of}")
+            return []
+        except RobotsDisallowed as e:
+            print(f"Skipping {url}: {str(e)}")
+            return []
+        return self.extract_doctor_information(html, json_responses, doctor_type, url=url)
+
+    def page_text(self, html):
+        return self.parser.main_text(html)
 
-        soup = BeautifulSoup(html, 'html.parser')
-        body_text = soup.find("body").get_text(separator='\n', strip=True)
+    def content_hash(self, text):
+        # Whitespace-insensitive so re-rendered but unchanged pages hash the same
+        return hashlib.sha256(" ".join(text.split()).encode("utf-8")).hexdigest()
 
-        prompt = f"""
+    def _extraction_prompt(self, kind, chunk, doctor_type):
+        source = "unstructured HTML text" if kind == "html" else "structured json text"
+        label = "HTML Text" if kind == "html" else "JSON Text"
+        return f"""
         You are a medical website data extraction agent.
 
-        From the following unstructured HTML text, extract structured doctor information. 
+        From the following {source}, extract structured doctor information. 
         Only include doctors related to "{doctor_type}". Each doctor should have:
         {{
             "Name": "Dr. John Doe",
@@ -217,59 +303,93 @@ class WebsiteScraper:
 
         Your response should be a just JSON array of objects, each representing a doctor. No other text should be included.  If you are unable to find a specified field then just return none
         if no doctors are found, return an empty array.
-        HTML Text:
-        '''{body_text[:6000]}'''
+        {label}:
+        '''{chunk}'''
         """
 
-        chat_completion = self.client.chat.completions.create(
+    def _extract_chunk(self, kind, chunk, doctor_type):
+        system = (
+            "You are an expert HTML medical page scraper. Extract structured doctor information from the provided text."
+            if kind == "html" else
+            "You are an expert JSON data extractor. Extract structured doctor information from the json data in text format provided text."
+        )
+        chat_completion = self.upstream.call(
+            self.client.chat.completions.create,
             messages=[
                 {
-                "role": "system",
-                "content": "You are an expert HTML medical page scraper. Extract structured doctor information from the provided text."
+                    "role": "system",
+                    "content": system
                 },
                 {
                     "role": "user",
-                    "content": prompt,
+                    "content": self._extraction_prompt(kind, chunk, doctor_type),
                 }
             ],
-            model="llama-3.3-70b-versatile",
+            model=EXTRACTION_MODEL,
         )
+        response = chat_completion.choices[0].message.content.strip()
+        # Models sometimes wrap the array in a markdown code fence
+        response = response[response.find("["):response.rfind("]") + 1] or response
+        doctors = json.loads(response)
+        if not isinstance(doctors, list):
+            raise ValueError("Extraction response is not a JSON array")
+        return [doctor for doctor in doctors if isinstance(doctor, dict) and doctor.get("Name")]
+
+    def _chunk_outcome(self, kind, chunk, doctor_type):
         try:
-            response = chat_completion.choices[0].message.content
-            if response == []:
-                prompt = f"""
-                    You are a medical website data extraction agent.
+            return self._extract_chunk(kind, chunk, doctor_type), None
+        except Exception as e:
+            print(f"Doctor extraction of a {kind} chunk failed: {str(e)}")
+            return None, e
 
-                    From the following structured json text, extract structured doctor information. 
-                    Only include doctors related to "{doctor_type}". Each doctor should have:
-                    {{
-                        "Name": "Dr. John Doe",
-                        "Designation": "Senior Gynecologist",
-                        "Specialization": "Gynecology",
-                        "Contact": "john.doe@domain",
-                        "Doctor_Image": "http://example.com/image.jpg"
-                    }}
+    def extraction_chunks(self, body_text, json_responses):
+        """
+        (kind, text) pairs sent to the LLM for one page: the page text, then captured JSON.
+        JSON chunks keep their slots, so very long pages lose page text instead; coverage is
+        still bounded at MAX_CHUNKS * CHUNK_TOKENS tokens (about 48k characters) per page.
+        """
+        json_chunks = []
+        if json_responses:
+            # Responses arrive best first, so only those fitting the JSON chunks are serialised
+            json_text = serialise_for_prompt(json_responses, MAX_JSON_CHUNKS * CHUNK_TOKENS * CHARS_PER_TOKEN)
+            json_chunks = [("json", chunk) for chunk in chunk_text(json_text, CHUNK_TOKENS)[:MAX_JSON_CHUNKS]]
+        html_chunks = [("html", chunk) for chunk in chunk_text(body_text, CHUNK_TOKENS)]
+        return html_chunks[:MAX_CHUNKS - len(json_chunks)] + json_chunks
 
-                    Your response should be a just JSON array of objects, each representing a doctor. No other text should be included. If you are unable to find a specified field then just return none
-                    if no doctors are found, return an empty array.
-                    JSON Text:
-                    '''{json_text[:6000]}'''
-                """
+    def extract_doctor_information(self, html, json_responses, doctor_type, body_text=None, url=None):
+        # Doctors published as structured data or doctor cards need no LLM call
+        doctors = structured_doctors(html, json_responses, doctor_type, base_url=url, parser=self.parser)
+        if doctors:
+            self._count_extraction("structured")
+            return doctors
 
-                chat_completion = self.client.chat.completions.create(
-                    messages=[
-                        {
-                        "role": "system",
-                        "content": "You are an expert JSON data extractor. Extract structured doctor information from the json data in text format provided text."
-                        },
-                        {
-                            "role": "user",
-                            "content": prompt,
-                        }
-                    ],
-                    model="llama-3.3-70b-versatile",
-                )
-                response = chat_completion.choices[0].message.content
-            return json.loads(response)
-        except Exception as e:
-            return f"Error: {str(e)}"
\ No newline at end of file
+        if body_text is None:
+            body_text = self.page_text(html)
+
+        text_hash = self.content_hash(body_text)
+        if self.extraction_cache is not None:
+            cached = self.extraction_cache.get(text_hash, doctor_type, PROMPT_VERSION)
+            if cached is not None:
+                self._count_extraction("cached")
+                return cached
+
+        self._count_extraction("llm")
+        chunks = self.extraction_chunks(body_text, json_responses)
+        if len(chunks) == 1:
+            outcomes = [self._chunk_outcome(*chunks[0], doctor_type)]
+        else:
+            # Chunks are extracted concurrently; the groq_extract upstream guard bounds the calls in flight
+            futures = [self.extraction_pool.submit(self._chunk_outcome, kind, chunk, doctor_type) for kind, chunk in chunks]
+            outcomes = [future.result() for future in futures]
+
+        results = [result for result, error in outcomes if error is None]
+        if not results:
+            error = outcomes[0][1] if outcomes else ValueError("Page has no text to extract from")
+            if isinstance(error, outbound.OutboundError):
+                raise error
+            return f"Error: {str(error)}"
+
+        doctors = merge_doctors(*results)
+        if self.extraction_cache is not None and len(results) == len(outcomes):
+            self.extraction_cache.put(text_hash, doctor_type, PROMPT_VERSION, doctors)
+        return doctors
@@ -0,0 +1,36 @@
+"""
+Serves recorded Places API responses locally, so the finders can be load tested without
+Google or an API key.
+
+Record fixtures by running the backend once against Google with PLACES_RECORD_DIR set, then:
+    python places_standin.py fixtures/places                       # http://127.0.0.1:8765
+    python places_standin.py fixtures/places --latency 0.15 --jitter 0.1 --error-rate 0.02
+
+and start the backend with PLACES_BASE_URL=http://127.0.0.1:8765
+"""
+
+import argparse
+
+from modules.places_replay import ReplayServer
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Stand-in Places API server replaying recorded fixtures")
+    parser.add_argument("fixture_dir")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds added to every response")
+    parser.add_argument("--jitter", type=float, default=0.0, help="up to this many extra random seconds")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fraction of requests that fail")
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+
+    server = ReplayServer(
+        args.fixture_dir, host=args.host, port=args.port, latency=args.latency,
+        jitter=args.jitter, error_rate=args.error_rate, seed=args.seed,
+    )
+    print(f"Replaying {len(server.fixtures)} Places fixtures on {server.url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        server.stop()
@@ -2,8 +2,13 @@ from flask import Flask, request, jsonify
 from models import db, Doctors, Hospitals
 from flasgger.utils import swag_from
 from modules.website_scraper import WebsiteScraper
+from modules.extraction_cache import ExtractionCache
+from modules.crawl_frontier import CrawlFrontier
+from modules.page_fingerprint import PageFingerprints
+from config import crawler_http, job_queue
 import requests
 import json
+import os
 
 def routes_doctors(app, db):
     
@@ -12,7 +17,12 @@ def routes_doctors(app, db):
     with open("authorisation.json", "r") as file:
         auth = json.loads(file.read())
     
-    scraper = WebsiteScraper(api_key=auth.get("GROQ_API_KEY"))
+    scraper = WebsiteScraper(
+        api_key=auth.get("GROQ_API_KEY"),
+        http=crawler_http,
+        extraction_cache=ExtractionCache(os.path.join(app.instance_path, "extraction_cache.db")),
+        frontier=CrawlFrontier(os.path.join(app.instance_path, "crawl_frontier.db")),
+    )
     
     # Search for doctors, optionally filtering by specialization
     @app.route('/api/doctors/search', methods=['GET'])
@@ -20,19 +30,39 @@ def routes_doctors(app, db):
     def search_doctors():
         specialization = request.args.get('specialization', '').strip()
         location = request.args.get('location', '').strip() # e.g., city or pincode
+        hospital_id = request.args.get('hospital_id', type=int)
+        place_id = request.args.get('place_id', '').strip()
 
-        query = Doctors.query
+        # Doctors saved by the doctor finder make this the fast path for repeat searches
+        query = Doctors.query.join(Hospitals)
 
         if specialization:
-            query = query.filter(Doctors.specialization.ilike(f'%{specialization}%'))
+            query = query.filter(db.or_(
+                Doctors.specialization.ilike(f'%{specialization}%'),
+                Doctors.scraped_for.ilike(f'%{specialization}%')
+            ))
+
+        if location:
+            query = query.filter(Hospitals.address.ilike(f'%{location}%'))
+
+        if hospital_id:
+            query = query.filter(Doctors.hospital_id == hospital_id)
+
+        if place_id:
+            query = query.filter(Hospitals.place_id == place_id)
 
         doctors = query.all()
         doctor_list = [{
             'doctor_id': d.doctor_id,
             'name': d.name,
             'specialization': d.specialization,
+            'designation': d.designation,
             'experience': d.experience,
             'rating': float(d.rating) if d.rating else None,
+            'contact': d.contact,
+            'image_url': d.image_url,
+            'source_url': d.source_url,
+            'updated_at': d.updated_at.isoformat() if d.updated_at else None,
             'hospital_name': d.hospital.hospital_name,
             'hospital_id': d.hospital_id,
             'hospital_address': d.hospital.address,
@@ -128,35 +158,44 @@ def routes_doctors(app, db):
             
             if not hospital.website:
                 return jsonify({'error': 'Hospital website not available'}), 400
-            
-            # Scrape doctor information from hospital website
-            scraped_doctors = scraper.scrape_doctor_info(hospital.website)
-            
-            if not scraped_doctors:
-                # Try to find doctor pages first
-                doctor_pages = scraper.find_doctor_page_links(hospital.website)
-                all_doctors = []
-                for page in doctor_pages[:5]:  # Limit to first 5 pages to avoid timeout
-                    page_doctors = scraper.scrape_doctor_info(page)
-                    all_doctors.extend(page_doctors)
-                scraped_doctors = all_doctors
-            
-            # Also scrape hospital information
-            hospital_info = scraper.scrape_hospital_info(hospital.website)
-            
-            result = {
+
+            data = request.get_json(silent=True) or {}
+            job_id = job_queue.enqueue('scrape_hospital_doctors', {
                 'hospital_id': hospital_id,
-                'hospital_name': hospital.hospital_name,
-                'scraped_doctors': scraped_doctors,
-                'hospital_info': hospital_info,
-                'total_scraped': len(scraped_doctors)
-            }
-            
-            return jsonify(result), 200
+                'specialization': data.get('specialization', 'doctor'),
+            })
+            return jsonify({'job_id': job_id, 'status': 'queued', 'status_url': f'/api/jobs/{job_id}'}), 202
             
         except Exception as e:
             return jsonify({'error': f'Failed to scrape doctors: {str(e)}'}), 500
 
+    def scrape_hospital_doctors_job(payload, progress):
+        """Background job behind /api/hospitals/<id>/scrape-doctors"""
+        hospital = Hospitals.query.get(payload['hospital_id'])
+        specialization = payload['specialization']
+
+        # Limit to the first 5 pages to keep the job bounded
+        doctor_pages = scraper.find_doctor_page_links(hospital.website, specialization)[:5]
+        progress(0.2, f"Found {len(doctor_pages)} doctor pages")
+
+        scraped_doctors = []
+        fingerprints = PageFingerprints()
+        for number, page in enumerate(doctor_pages, start=1):
+            page_doctors = scraper.fetch_doctor_information(page, specialization, fingerprints)
+            if isinstance(page_doctors, list):
+                scraped_doctors.extend(page_doctors)
+            progress(0.2 + 0.8 * number / len(doctor_pages), f"Scraped {number} of {len(doctor_pages)} pages")
+
+        return {
+            'hospital_id': hospital.hospital_id,
+            'hospital_name': hospital.hospital_name,
+            'scraped_doctors': scraped_doctors,
+            'pages': doctor_pages,
+            'total_scraped': len(scraped_doctors)
+        }
+
+    job_queue.register('scrape_hospital_doctors', scrape_hospital_doctors_job)
+
     # Find doctors by specialization using web scraping
     @app.route('/api/doctors/find-by-specialization', methods=['POST'])
     @swag_from("docs/find_doctors_by_specialization.yml")
@@ -287,53 +326,45 @@ def routes_doctors(app, db):
     @app.route('/api/hospitals/ai-extract', methods=['POST'])
     @swag_from("docs/ai_extract_hospital.yml")
     def ai_extract_hospital_info():
-        """Use Groq AI to extract comprehensive hospital and doctor information from HTML"""
+        """Queue a Groq AI extraction of doctor information from a hospital page"""
         try:
             data = request.get_json()
             hospital_website = data.get('hospital_website', '').strip()
-            extract_doctors = data.get('extract_doctors', True)
-            specialization_filter = data.get('specialization', '')
             
             if not hospital_website:
                 return jsonify({'error': 'Hospital website URL is required'}), 400
-            
-            # Fetch the HTML content
-            try:
-                response = requests.get(hospital_website, headers=scraper.headers, timeout=15)
-                response.raise_for_status()
-                html_content = response.text
-            except Exception as e:
-                return jsonify({'error': f'Failed to fetch website: {str(e)}'}), 400
-            
-            result = {
+
+            job_id = job_queue.enqueue('ai_extract_hospital', {
                 'hospital_website': hospital_website,
-                'extraction_method': 'groq_ai' if scraper.groq_client else 'traditional',
-                'hospital_info': None,
-                'doctors': [],
-                'total_doctors': 0
-            }
-            
-            # Extract hospital information using Groq AI
-            if scraper.groq_client:
-                hospital_info = scraper.extract_hospital_info_with_groq(html_content)
-                result['hospital_info'] = hospital_info
-                
-                # Extract doctors if requested
-                if extract_doctors:
-                    doctors = scraper.extract_doctors_with_groq(html_content, specialization_filter)
-                    result['doctors'] = doctors
-                    result['total_doctors'] = len(doctors)
-            else:
-                # Fallback to traditional methods
-                hospital_info = scraper._fallback_extract_hospital_info(html_content)
-                result['hospital_info'] = hospital_info
-                
-                if extract_doctors:
-                    doctors = scraper._fallback_extract_doctors(html_content, specialization_filter)
-                    result['doctors'] = doctors
-                    result['total_doctors'] = len(doctors)
-            
-            return jsonify(result), 200
+                'extract_doctors': data.get('extract_doctors', True),
+                'specialization': data.get('specialization', ''),
+            })
+            return jsonify({'job_id': job_id, 'status': 'queued', 'status_url': f'/api/jobs/{job_id}'}), 202
             
         except Exception as e:
-            return jsonify({'error': f'AI extraction failed: {str(e)}'}), 500
\ No newline at end of file
+            return jsonify({'error': f'AI extraction failed: {str(e)}'}), 500
+
+    def ai_extract_hospital_job(payload, progress):
+        """Background job behind /api/hospitals/ai-extract"""
+        hospital_website = payload['hospital_website']
+        result = {
+            'hospital_website': hospital_website,
+            'extraction_method': 'groq_ai',
+            'doctors': [],
+            'total_doctors': 0
+        }
+        if not payload['extract_doctors']:
+            return result
+
+        html, json_responses = scraper.fetch_page(hospital_website, payload['specialization'] or 'doctor')
+        progress(0.5, "Page fetched, extracting doctors")
+
+        doctors = scraper.extract_doctor_information(html, json_responses, payload['specialization'] or 'doctor',
+                                                     url=hospital_website)
+        if isinstance(doctors, str):
+            raise RuntimeError(doctors)
+        result['doctors'] = doctors
+        result['total_doctors'] = len(doctors)
+        return result
+
+    job_queue.register('ai_extract_hospital', ai_extract_hospital_job)
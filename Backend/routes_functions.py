@@ -1,13 +1,24 @@
 import requests
-from flask import Flask, request, session, jsonify
+from flask import Flask, request, session, jsonify, Response, stream_with_context
 from models import *
 import geocoder
 from modules.chatbot import Chatbot
-from modules.nearby_places import NearbyPlaces
+from modules.outbound import OutboundError
+from modules.nearby_places import NearbyPlaces, MAX_RESULT_PAGES, PLACES_BASE_URL
+from modules.places_replay import PlacesRecorder
+from modules.place_ranking import rank_places
+from modules.place_cache import PlaceDetailsCache
+from modules.nearby_cache import NearbySearchCache
 from modules.website_scraper import WebsiteScraper
+from modules.extraction_cache import ExtractionCache
+from modules.crawl_frontier import CrawlFrontier
+from modules.doctor_pipeline import DoctorFinderPipeline
+from modules.doctor_store import DoctorStore
 from modules.generative_ai import GenerativeAI
 from flasgger.utils import swag_from
+from config import crawler_http, job_queue
 import json
+import os
 
 
 
@@ -32,17 +43,26 @@ def function_routes(app, db, auth):
         Also the response should be in the same language as the user input.
         Also the response should be in markdown. I will direct put it in a markdown renderer. So format it pretty good. So use all bullets, emojis and all to make it look good.
     """
+    ASSISTANT_BUSY_MESSAGE = "The assistant is busy right now. Please try again in a minute."
     chatbot = Chatbot(api_key=auth.get("GROQ_API_KEY"), system_prompt=SYSTEM_PROMPT)
-    nearby_places = NearbyPlaces(api_key=auth.get("GOOGLE_MAPS_API_KEY"))
-    web_scraper = WebsiteScraper(api_key=auth.get("GROQ_API_KEY"))
+    place_cache = PlaceDetailsCache(db, Hospitals, Pharmacy)
+    nearby_places = NearbyPlaces(
+        api_key=auth.get("GOOGLE_MAPS_API_KEY"),
+        cache=place_cache,
+        search_cache=NearbySearchCache(os.path.join(app.instance_path, "nearby_cache.db")),
+        base_url=app.config.get("PLACES_BASE_URL", PLACES_BASE_URL),
+        recorder=PlacesRecorder(app.config["PLACES_RECORD_DIR"]) if app.config.get("PLACES_RECORD_DIR") else None,
+    )
+    web_scraper = WebsiteScraper(
+        api_key=auth.get("GROQ_API_KEY"),
+        http=crawler_http,
+        extraction_cache=ExtractionCache(os.path.join(app.instance_path, "extraction_cache.db")),
+        frontier=CrawlFrontier(os.path.join(app.instance_path, "crawl_frontier.db")),
+    )
+    doctor_store = DoctorStore(db, Hospitals, Doctors, HospitalCrawls, DoctorPageSnapshots)
+    doctor_pipeline = DoctorFinderPipeline(nearby_places, web_scraper, store=doctor_store)
     generative_ai = GenerativeAI(api_key=auth.get("GEMINI_API_KEY"))
 
-    def safe_float(val):
-        try:
-            return float(val)
-        except (TypeError, ValueError):
-            return 0.0
-
     def safe_int(val):
         try:
             return int(val)
@@ -187,12 +207,11 @@ def function_routes(app, db, auth):
             messages.append({"role": "user", "content": user_input})
             
             # Get response from chatbot with full history
-            chat_completion = chatbot.client.chat.completions.create(
-                messages=messages,
-                model="llama-3.3-70b-versatile",
-            )
+            chat_completion = chatbot.complete(messages)
             reply = chat_completion.choices[0].message.content
             return jsonify({'response': reply}), 200
+        except OutboundError:
+            return jsonify({'response': ASSISTANT_BUSY_MESSAGE}), 503
         except Exception as e:
             return jsonify({'response': f"Error: {str(e)}"}), 500
 
@@ -282,9 +301,8 @@ def function_routes(app, db, auth):
             messages.append({"role": "user", "content": user_input})
             
             # Get response from the personalized chatbot
-            chat_completion = chatbot.client.chat.completions.create(
-                messages=messages,
-                model="llama-3.3-70b-versatile",
+            chat_completion = chatbot.complete(
+                messages,
                 temperature=0.8,  # Slightly higher temperature for more personality
             )
             
@@ -304,6 +322,8 @@ def function_routes(app, db, auth):
                 'status': 'success'
             }), 200
             
+        except OutboundError:
+            return jsonify({'error': ASSISTANT_BUSY_MESSAGE, 'status': 'fail'}), 503
         except Exception as e:
             return jsonify({'error': f"An unexpected error occurred: {str(e)}", 'status': 'fail'}), 500
 
@@ -322,74 +342,101 @@ def function_routes(app, db, auth):
             1. Finds nearby places of the specified type within the given radius.
             2. Retrieves detailed information for each place.
             3. Attempts to scrape doctor information from each place's website for the specified specialty.
+            Steps 2 and 3 run as a staged pipeline (details, link discovery, rendering, extraction), so
+            different hospitals move through the stages at the same time.
+            The scrape runs as a background job; poll /api/jobs/<job_id> for progress and the
+            scraped doctor information keyed by place_id.
         Returns:
             JSON response with:
-                - response: Dictionary of place details keyed by place_id.
-                - scraped_data: Dictionary of scraped doctor information keyed by place_id.
-                - status: 'success' if the operation was successful.
+                - job_id: Id of the queued background job.
+                - status: 'queued'.
+                - status_url: Where to poll for the job's status and result.
         Response Codes:
-            200: Success. Returns the place details and scraped doctor data.
-            400/500: Error in processing or scraping data.
+            202: Accepted. The scrape has been queued.
+            400: Missing latitude or longitude.
         """
         print("Doctor Finder Endpoint Called")
-        # try:
         data = request.get_json()
         latitude = data.get('latitude')
         longitude = data.get('longitude')
-        type = data.get('type', 'hospital').lower()
-        radius = data.get('radius', 1000)
-        specialist = data.get('specialist', 'obstetrician')
-        limit = data.get('limit', 5)
-        print(specialist)
         if latitude is None or longitude is None:
             return jsonify({'error': 'Latitude and longitude are required fields.', 'status': 'fail'}), 400
 
-        nearby_hospitals = nearby_places.find_nearby_places(latitude, longitude, type, radius)
-        if not nearby_hospitals:
-            return jsonify({'response': {}, 'scraped_data': {}, 'status': 'no_places_found'}), 200
+        job_id = job_queue.enqueue('doctor_finder', {
+            'latitude': latitude,
+            'longitude': longitude,
+            'type': data.get('type', 'hospital').lower(),
+            'radius': data.get('radius', 1000),
+            'specialist': data.get('specialist', 'obstetrician'),
+        })
+        return jsonify({'job_id': job_id, 'status': 'queued', 'status_url': f'/api/jobs/{job_id}'}), 202
 
-        place_ids = [place.get('place_id') for place in nearby_hospitals if place.get('place_id')]
-        nearby_hospitals = sorted(
-            nearby_hospitals,
-            key=lambda x: safe_float(x.get("distance"))
-        )
+    def find_doctors(payload, progress):
+        """
+        Background job behind /api/doctor-finder.
+        Returns the scrape results keyed by place_id, or a no_places_found status.
+        """
+        latitude = payload['latitude']
+        longitude = payload['longitude']
+        type = payload['type']
+        radius = payload['radius']
+        specialist = payload['specialist']
+        print(specialist)
 
-        top_10_closest = nearby_hospitals[:10]
+        nearby_hospitals = nearby_places.find_nearby_places(latitude, longitude, type, radius)
+        if not nearby_hospitals:
+            return {'response': {}, 'scraped_data': {}, 'status': 'no_places_found'}
 
-        top_10_sorted = sorted(
-            top_10_closest,
-            key=lambda x: (
-                -safe_int(x.get("user_ratings_total"))
-                -safe_float(x.get("rating")),
-            )
-        )
-        hospital_info = top_10_sorted[:5]
+        # Closest, best rated and most reviewed hospitals first
+        hospital_info = rank_places(nearby_hospitals, latitude, longitude, k=5, radius=radius)
+        progress(0.1, f"Found {len(hospital_info)} places, scraping their websites")
 
         place_ids = [place.get('place_id') for place in hospital_info if place.get('place_id')]
-        place_details = {}
-        for place_id in place_ids:
-            details = nearby_places.place_details(place_id)
-            if details:
-                place_details[place_id] = details
-
-        scrape = {}
-        for place_id, details in list(place_details.items()):
-            website = details.get('website')
-            name = details.get('name', '')
-            if not website:
-                scrape[place_id] = {"name": name, "doctor_info": [], "error": "No website found for this place."}
-                continue
-            doctor_pages = web_scraper.find_doctor_page_links(website, specialist)[:3]
-            if doctor_pages != []:
-                page_scrape = []
-                for page in doctor_pages:
-                    doctor_scrape = web_scraper.fetch_doctor_information(page, specialist)
-                    page_scrape.append(doctor_scrape)
-                scrape[place_id] = {"name": name, "website": website, "doctor_scrape": page_scrape, "pages": doctor_pages}
+        scrape = doctor_pipeline.run(place_ids, specialist, place_type=type, progress=progress)
         return scrape
+
+    job_queue.register('doctor_finder', find_doctors)
         
 
 
+    def with_ranking(place_details, ranked_places):
+        """
+        Adds each place's rank and distance in meters to its details, since the JSON response
+        object does not keep the ranked order of its keys.
+        """
+        rank = 0
+        for place in ranked_places:
+            details = place_details.get(place.get('place_id'))
+            if details is not None and 'rank' not in details:
+                rank += 1
+                details.update(rank=rank, distance=place.get('distance'))
+        return place_details
+
+    def stream_place_details(latitude, longitude, type, radius, source, max_pages):
+        """
+        NDJSON body for the finders' streaming mode. Each page of nearby results is enriched as
+        it arrives and every place is written out as soon as its details are available.
+        """
+        count, source_used, seen = 0, source, set()
+        try:
+            pages = nearby_places.iter_place_pages(latitude, longitude, type, radius, source, max_pages=max_pages)
+            for places, source_used in pages:
+                ranked = [
+                    place for place in rank_places(places, latitude, longitude, radius=radius)
+                    if place.get('place_id') and place['place_id'] not in seen
+                ]
+                ranks = {place['place_id']: len(seen) + position for position, place in enumerate(ranked, start=1)}
+                distances = {place['place_id']: place.get('distance') for place in ranked}
+                seen.update(ranks)
+                for place_id, details in nearby_places.iter_place_details(list(ranks), place_type=type):
+                    count += 1
+                    details.update(rank=ranks[place_id], distance=distances[place_id])
+                    yield json.dumps({'place_id': place_id, 'details': details}) + "\n"
+            status = 'success' if count else 'no_places_found'
+            yield json.dumps({'done': True, 'count': count, 'source': source_used, 'status': status}) + "\n"
+        except Exception as e:
+            yield json.dumps({'done': True, 'count': count, 'error': f"An unexpected error occurred: {str(e)}", 'status': 'fail'}) + "\n"
+
     @app.route('/api/pharmacy-finder', methods=['POST'])
     @swag_from("docs/pharmacy_finder.yml")
     def pharmacy_finder():
@@ -401,12 +448,17 @@ def function_routes(app, db, auth):
             longitude (float): Longitude of the location (required).
             type (str, optional): Type of place to search for (default: 'pharmacy').
             radius (int, optional): Search radius in meters (default: 1000).
+            source (str, optional): 'remote' to query Google (default) or 'local' to search the stored
+                places first, falling back to Google when few are found nearby.
+            max_pages (int, optional): Pages of Google results to follow, up to 3 (default: 1, or 3 when streaming).
+            stream (bool, optional): Stream application/x-ndjson instead, one line per place as soon as its
+                details arrive, followed by a line with 'done', 'count', 'source' and 'status'.
         Responses:
             200: Success. Returns a dictionary of place details keyed by place_id, or an empty response if no places found.
             400: Bad request. Missing latitude or longitude.
             500: Internal server error. Unexpected error occurred.
         Returns:
-            flask.Response: JSON response with 'response' (dict), 'status' (str), and optionally 'error' (str).
+            flask.Response: JSON response with 'response' (dict), 'source' (str), 'status' (str), and optionally 'error' (str).
         """
 
         try:
@@ -415,23 +467,29 @@ def function_routes(app, db, auth):
             longitude = data.get('longitude')
             type = data.get('type', 'pharmacy').lower()
             radius = data.get('radius', 1000)
+            source = data.get('source', 'remote').lower()
+            stream = bool(data.get('stream', False))
+            max_pages = min(max(safe_int(data.get('max_pages', MAX_RESULT_PAGES if stream else 1)), 1), MAX_RESULT_PAGES)
 
             if latitude is None or longitude is None:
                 return jsonify({'error': 'Latitude and longitude are required fields.', 'status': 'fail'}), 400
 
-            pharmacy_info = nearby_places.find_nearby_places(latitude, longitude, type, radius)
+            if stream:
+                return Response(
+                    stream_with_context(stream_place_details(latitude, longitude, type, radius, source, max_pages)),
+                    mimetype='application/x-ndjson'
+                )
+
+            pharmacy_info, source = nearby_places.find_places(latitude, longitude, type, radius, source, max_pages=max_pages)
             if not pharmacy_info:
-                return jsonify({'response': {}, 'status': 'no_places_found'}), 200
+                return jsonify({'response': {}, 'source': source, 'status': 'no_places_found'}), 200
 
+            pharmacy_info = rank_places(pharmacy_info, latitude, longitude, radius=radius)
             place_ids = [place.get('place_id') for place in pharmacy_info if place.get('place_id')]
 
-            place_details = {}  
-            for place_id in place_ids:
-                details = nearby_places.place_details(place_id)
-                if details:
-                    place_details[place_id] = details
+            place_details = with_ranking(nearby_places.place_details_many(place_ids, place_type=type), pharmacy_info)
 
-            return jsonify({'response': place_details, 'status': 'success'}), 200
+            return jsonify({'response': place_details, 'source': source, 'status': 'success'}), 200
 
         except Exception as e:
             return jsonify({'error': f"An unexpected error occurred: {str(e)}", 'status': 'fail'}), 500
@@ -448,12 +506,17 @@ def function_routes(app, db, auth):
             longitude (float): Longitude of the location (required).
             type (str, optional): Type of place to search for (default: 'hospital').
             radius (int, optional): Search radius in meters (default: 1000).
+            source (str, optional): 'remote' to query Google (default) or 'local' to search the stored
+                places first, falling back to Google when few are found nearby.
+            max_pages (int, optional): Pages of Google results to follow, up to 3 (default: 1, or 3 when streaming).
+            stream (bool, optional): Stream application/x-ndjson instead, one line per place as soon as its
+                details arrive, followed by a line with 'done', 'count', 'source' and 'status'.
         Responses:
             200: Success. Returns a dictionary of place details keyed by place_id, or an empty response if no places found.
             400: Bad request. Missing latitude or longitude.
             500: Internal server error. Unexpected error occurred.
         Returns:
-            flask.Response: JSON response with 'response' (dict), 'status' (str), and optionally 'error' (str).
+            flask.Response: JSON response with 'response' (dict), 'source' (str), 'status' (str), and optionally 'error' (str).
         """
 
         try:
@@ -462,27 +525,70 @@ def function_routes(app, db, auth):
             longitude = data.get('longitude')
             type = data.get('type', 'hospital').lower()
             radius = data.get('radius', 1000)
+            source = data.get('source', 'remote').lower()
+            stream = bool(data.get('stream', False))
+            max_pages = min(max(safe_int(data.get('max_pages', MAX_RESULT_PAGES if stream else 1)), 1), MAX_RESULT_PAGES)
 
             if latitude is None or longitude is None:
                 return jsonify({'error': 'Latitude and longitude are required fields.', 'status': 'fail'}), 400
 
-            hospital_info = nearby_places.find_nearby_places(latitude, longitude, type, radius)
+            if stream:
+                return Response(
+                    stream_with_context(stream_place_details(latitude, longitude, type, radius, source, max_pages)),
+                    mimetype='application/x-ndjson'
+                )
+
+            hospital_info, source = nearby_places.find_places(latitude, longitude, type, radius, source, max_pages=max_pages)
             if not hospital_info:
-                return jsonify({'response': {}, 'status': 'no_places_found'}), 200
+                return jsonify({'response': {}, 'source': source, 'status': 'no_places_found'}), 200
 
+            hospital_info = rank_places(hospital_info, latitude, longitude, radius=radius)
             place_ids = [place.get('place_id') for place in hospital_info if place.get('place_id')]
 
-            place_details = {}  
-            for place_id in place_ids:
-                details = nearby_places.place_details(place_id)
-                if details:
-                    place_details[place_id] = details
+            place_details = with_ranking(nearby_places.place_details_many(place_ids, place_type=type), hospital_info)
 
-            return jsonify({'response': place_details, 'status': 'success'}), 200
+            return jsonify({'response': place_details, 'source': source, 'status': 'success'}), 200
 
         except Exception as e:
             return jsonify({'error': f"An unexpected error occurred: {str(e)}", 'status': 'fail'}), 500
 
+    @app.route('/api/places/cache-stats', methods=['GET'])
+    @swag_from("docs/place_cache_stats.yml")
+    def place_cache_stats():
+        """
+        Returns hit/miss counters for the place details cache kept in the Hospitals and Pharmacy tables
+        and for the nearby search cache. The counters are this process's only; lookups made by
+        job_worker.py processes are counted there and not reported here.
+        """
+        return jsonify({
+            'place_details': place_cache.stats(),
+            'nearby_searches': nearby_places.search_cache.stats(),
+            'status': 'success'
+        }), 200
+
+    @app.route('/api/scraper/stats', methods=['GET'])
+    @swag_from("docs/scraper_stats.yml")
+    def scraper_stats():
+        """
+        Returns counters for the doctor page scraper: how doctor pages were discovered, the crawl
+        frontier, which fetch tier served each page, requests the rendering browser was allowed or
+        refused, how doctors were extracted, the crawler HTTP cache and the LLM extraction cache.
+        Apart from the frontier, which is read from its shared file, the counters are this process's
+        only; scrapes run by job_worker.py processes are counted there and not reported here.
+        """
+        return jsonify({
+            'discovery': dict(web_scraper.discovery_stats),
+            'sitemaps': dict(web_scraper.sitemaps.stats),
+            'frontier': web_scraper.frontier.stats(),
+            'fetch_tiers': dict(web_scraper.tier_stats),
+            'extraction': dict(web_scraper.extraction_stats),
+            'browser_requests': dict(web_scraper.request_policy.stats),
+            'json_capture': dict(web_scraper.json_capture.stats),
+            'http': dict(web_scraper.http.stats),
+            'extraction_cache': dict(web_scraper.extraction_cache.stats),
+            'status': 'success'
+        }), 200
+
     @app.route("/api/generate-asana-images", methods=["POST"])
     @swag_from("docs/generate_asana_images.yml")
     def generate_asana_images():
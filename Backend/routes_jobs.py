@@ -0,0 +1,17 @@
+from flask import Flask, jsonify
+from flasgger.utils import swag_from
+from config import job_queue
+
+def routes_jobs(app, db):
+
+    # Status, progress and result of a background job
+    @app.route('/api/jobs/<job_id>', methods=['GET'])
+    @swag_from("docs/get_job_status.yml")
+    def get_job_status(job_id):
+        try:
+            job = job_queue.get(job_id)
+            if not job:
+                return jsonify({'error': 'Job not found'}), 404
+            return jsonify(job), 200
+        except Exception as e:
+            return jsonify({'error': f'Failed to fetch job: {str(e)}'}), 500
@@ -0,0 +1,104 @@
+"""
+Tests for the warm headless browser pool, using a stand-in for the seleniumwire driver
+"""
+
+import threading
+import time
+
+import pytest
+
+from modules.browser_pool import BrowserPool
+
+
+class FakeDriver:
+    def __init__(self):
+        self.captured = ["captured"]
+        self.quit_called = False
+
+    @property
+    def requests(self):
+        return self.captured
+
+    @requests.deleter
+    def requests(self):
+        self.captured = []
+
+    def delete_all_cookies(self):
+        pass
+
+    def quit(self):
+        self.quit_called = True
+
+
+def test_browsers_are_reused_and_cleared():
+    """A returned browser is handed out again with its captured requests dropped"""
+    launched = []
+    pool = BrowserPool(lambda: launched.append(FakeDriver()) or launched[-1], size=2)
+
+    with pool.browser() as first:
+        pass
+    with pool.browser() as second:
+        assert second.requests == []
+
+    assert first is second
+    assert len(launched) == 1
+    assert pool.stats["reused"] == 1
+
+
+def test_browsers_are_recycled_after_max_pages():
+    """A browser is quit once it has rendered max_pages pages"""
+    pool = BrowserPool(FakeDriver, size=1, max_pages=2)
+
+    with pool.browser() as first:
+        pass
+    with pool.browser() as again:
+        pass
+    with pool.browser() as fresh:
+        pass
+
+    assert first is again
+    assert first.quit_called
+    assert fresh is not first
+    assert pool.stats["recycled"] == 1
+
+
+def test_crashed_browser_is_replaced():
+    """An error while rendering retires the browser instead of returning it to the pool"""
+    pool = BrowserPool(FakeDriver, size=1)
+
+    with pytest.raises(RuntimeError):
+        with pool.browser() as crashed:
+            raise RuntimeError("chrome not reachable")
+    with pool.browser() as replacement:
+        pass
+
+    assert crashed.quit_called
+    assert replacement is not crashed
+    assert pool.stats["crashed"] == 1
+
+
+def test_checkout_waits_when_pool_is_exhausted():
+    """Callers beyond the pool size time out rather than launching extra browsers"""
+    pool = BrowserPool(FakeDriver, size=1, checkout_timeout=0.1)
+
+    with pool.browser():
+        with pytest.raises(TimeoutError):
+            pool.checkout()
+
+
+def test_waiting_caller_launches_a_replacement_for_a_crashed_browser():
+    """A caller blocked on a full pool is woken as soon as a browser is retired"""
+    pool = BrowserPool(FakeDriver, size=1, checkout_timeout=5)
+    crashed = pool.checkout()
+    handed_out = []
+    waiter = threading.Thread(target=lambda: handed_out.append(pool.checkout()))
+    waiter.start()
+
+    time.sleep(0.1)
+    started = time.monotonic()
+    pool.checkin(crashed, broken=True)
+    waiter.join()
+
+    assert time.monotonic() - started < 1
+    assert handed_out[0] is not crashed
+    assert pool.stats["launched"] == 2
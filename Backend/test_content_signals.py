@@ -0,0 +1,66 @@
+"""
+Tests for the static-HTML fast path in front of headless Chrome
+"""
+
+import os
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from modules.content_signals import doctor_signals, has_doctor_content
+from modules.website_scraper import WebsiteScraper
+
+FIXTURE = os.path.join(os.path.dirname(__file__), "try.html")
+
+PAGES = {
+    "/doctors": "<html><body><h1>Our Cardiologists</h1><div>Dr. Meera Iyer, MBBS, DM Cardiology</div>"
+                "<div>Dr. K. Rao, Consultant Cardiologist</div></body></html>",
+    "/team": "<html><head><script src='/app.js'></script></head><body><div id='root'></div></body></html>",
+}
+
+
+class HospitalHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        body = PAGES.get(self.path)
+        if self.path == "/robots.txt" or body is None:
+            self.send_response(404)
+            self.end_headers()
+            return
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.end_headers()
+        self.wfile.write(body.encode("utf-8"))
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def site():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), HospitalHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+
+
+def test_saved_hospital_page_is_served_statically():
+    with open(FIXTURE, "r", encoding="utf-8") as file:
+        signals = doctor_signals(file.read(), "Gynecologist")
+    assert signals["doctor_names"] >= 1 and signals["requested_specialty"]
+    assert has_doctor_content(signals)
+
+
+def test_only_client_rendered_pages_reach_the_browser(site):
+    scraper = WebsiteScraper(api_key="test")
+    scraper.http.min_interval = 0
+    rendered = []
+    scraper.get_rendered_html = lambda url: rendered.append(url) or ("<html><body>Dr. Late Render</body></html>", [])
+
+    html, _ = scraper.fetch_page(f"{site}/doctors", "Cardiologist")
+    assert "Dr. Meera Iyer" in html and rendered == []
+
+    html, _ = scraper.fetch_page(f"{site}/team", "Cardiologist")
+    scraper.fetch_page(f"{site}/missing", "Cardiologist")
+    assert rendered == [f"{site}/team", f"{site}/missing"]
+    assert scraper.tier_stats == {"static": 1, "browser": 2, "static_failed": 1, "duplicate": 0}
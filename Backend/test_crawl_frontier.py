@@ -0,0 +1,140 @@
+"""
+Tests for the persistent crawl frontier shared by hospital crawls
+"""
+
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from modules.crawl_frontier import CrawlFrontier
+from modules.website_scraper import WebsiteScraper
+
+PAGES = {
+    "/": '<html><body><a href="/doctors/">Our doctors</a><a href="/departments/cardiology/">Cardiology</a>'
+         '<a href="/contact">Contact</a></body></html>',
+    "/doctors/": '<html><body><a href="/doctors/dr-meera-iyer/">Dr. Meera Iyer, Cardiologist</a></body></html>',
+    "/departments/cardiology/": '<html><body><a href="/team/">Cardiology team</a></body></html>',
+    "/team/": "<html><body>Team</body></html>",
+}
+
+
+@pytest.fixture
+def site():
+    requests_seen = []
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            requests_seen.append(self.path)
+            body = PAGES.get(self.path)
+            if body is None:
+                self.send_response(404)
+                self.end_headers()
+                return
+            self.send_response(200)
+            self.send_header("Content-Type", "text/html; charset=utf-8")
+            self.end_headers()
+            self.wfile.write(body.encode("utf-8"))
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{server.server_address[1]}", requests_seen
+    server.shutdown()
+
+
+def crawler(db_path):
+    scraper = WebsiteScraper(api_key="test", frontier=CrawlFrontier(db_path))
+    scraper.http.min_interval = 0
+    return scraper
+
+
+def test_concurrent_workers_never_lease_the_same_url(tmp_path):
+    db_path = str(tmp_path / "frontier.db")
+    frontier = CrawlFrontier(db_path)
+    frontier.seed("hospital.in", "cardiologist", "https://hospital.in/", "https://hospital.in/")
+    frontier.add_links("hospital.in", "cardiologist",
+                       [(f"https://hospital.in/doctors/{index}", f"https://hospital.in/doctors/{index}/", index)
+                        for index in range(30)], depth=1)
+    leased = []
+
+    def worker(number):
+        # Each worker has its own frontier object and connections, as separate processes would
+        own = CrawlFrontier(db_path)
+        while True:
+            page = own.lease("hospital.in", "cardiologist", f"worker-{number}", max_pages=12)
+            if page is None:
+                return
+            leased.append(page["url_key"])
+
+    threads = [threading.Thread(target=worker, args=(number,)) for number in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(leased) == len(set(leased)) == 12
+    # The homepage first, then the best-scored links
+    assert "https://hospital.in/" in leased and "https://hospital.in/doctors/29" in leased
+
+
+def test_expired_leases_are_picked_up_again(tmp_path):
+    frontier = CrawlFrontier(str(tmp_path / "frontier.db"), lease_seconds=0.05)
+    frontier.seed("hospital.in", "", "https://hospital.in/", "https://hospital.in/")
+    assert frontier.lease("hospital.in", "", "dead-worker", max_pages=5)["url_key"] == "https://hospital.in/"
+    assert frontier.lease("hospital.in", "", "other-worker", max_pages=5) is None
+    time.sleep(0.1)
+    assert frontier.lease("hospital.in", "", "other-worker", max_pages=5)["url_key"] == "https://hospital.in/"
+
+
+def test_crawls_resume_and_are_shared_across_scrapers(tmp_path, site):
+    url, requests_seen = site
+    db_path = str(tmp_path / "frontier.db")
+
+    first = crawler(db_path).crawl_doctor_page_links(f"{url}/", "Cardiologist", max_pages=2)
+    fetched = [path for path in requests_seen if path != "/robots.txt"]
+    assert fetched == ["/", "/doctors/"]
+    assert f"{url}/doctors/dr-meera-iyer/" in first
+
+    # A new scraper (e.g. another worker process after a restart) continues the same crawl
+    second = crawler(db_path).crawl_doctor_page_links(f"{url}/", "Cardiologist", max_pages=4)
+    fetched = [path for path in requests_seen if path != "/robots.txt"]
+    assert fetched[:2] == ["/", "/doctors/"] and "/" not in fetched[2:]
+    # Failed fetches, like the profile link's 404, count against the four pages too
+    assert len(fetched) == 4
+    assert set(first) < set(second)
+
+    # Once the round is used up, searches are answered from the frontier without fetching
+    assert crawler(db_path).crawl_doctor_page_links(f"{url}/", "Cardiologist", max_pages=4) == second
+    assert len([path for path in requests_seen if path != "/robots.txt"]) == 4
+
+
+def test_failing_links_and_stored_links_are_bounded(tmp_path):
+    frontier = CrawlFrontier(str(tmp_path / "frontier.db"), max_links=10)
+    frontier.seed("hospital.in", "", "https://hospital.in/", "https://hospital.in/")
+    frontier.add_links("hospital.in", "", [(f"https://hospital.in/d/{index}", f"https://hospital.in/d/{index}", index)
+                                           for index in range(40)], depth=1)
+    scores, _ = frontier.links("hospital.in", "")
+    assert sorted(scores.values()) == list(range(30, 40))
+
+    leased = []
+    while True:
+        page = frontier.lease("hospital.in", "", "worker", max_pages=5)
+        if page is None:
+            break
+        leased.append(page["url_key"])
+        frontier.complete("hospital.in", "", page["url_key"], failed=True)
+    assert len(leased) == 5
+
+
+def test_scrapers_without_a_frontier_file_create_none(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr("tempfile.mkdtemp", lambda *args, **kwargs: pytest.fail("no directory should be created"))
+    frontier = WebsiteScraper(api_key="test").frontier
+    frontier.seed("hospital.in", "", "https://hospital.in/", "https://hospital.in/")
+    assert frontier.lease("hospital.in", "", "worker", max_pages=5)["url_key"] == "https://hospital.in/"
+    assert frontier.stats()["leased"] == 1
+    assert list(tmp_path.iterdir()) == []
@@ -0,0 +1,109 @@
+"""
+Tests for the crawler HTTP layer against a local test server
+"""
+
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from modules.crawler_http import CrawlerHttp, RobotsDisallowed
+from modules.website_scraper import WebsiteScraper
+
+
+class HospitalSiteHandler(BaseHTTPRequestHandler):
+    hits = []
+
+    def do_GET(self):
+        self.hits.append((self.path, self.headers.get("If-None-Match")))
+        if self.path == "/robots.txt":
+            body = b"User-agent: *\nDisallow: /private\n"
+            self.send_response(200)
+        elif self.headers.get("If-None-Match") == '"v1"':
+            self.send_response(304)
+            self.end_headers()
+            return
+        else:
+            body = b"<html><body><a href='/doctors'>Our Doctors</a></body></html>"
+            self.send_response(200)
+            self.send_header("ETag", '"v1"')
+        self.send_header("Content-Type", "text/html")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def site():
+    HospitalSiteHandler.hits = []
+    server = ThreadingHTTPServer(("127.0.0.1", 0), HospitalSiteHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+
+
+def test_fresh_cache_hit_then_conditional_revalidation(site, tmp_path):
+    """Fresh entries are served from disk and stale ones are revalidated with their ETag"""
+    http = CrawlerHttp(cache_dir=str(tmp_path), min_interval=0, fresh_for=60)
+
+    first = http.get(f"{site}/")
+    second = http.get(f"{site}/")
+    assert not first.from_cache and second.from_cache
+    assert second.text == first.text
+
+    http.fresh_for = 0
+    third = http.get(f"{site}/")
+    assert third.from_cache and third.status_code == 200
+    assert ("/", '"v1"') in HospitalSiteHandler.hits
+    assert http.stats == {"fetched": 1, "not_modified": 1, "cache_hits": 1, "robots_blocked": 0}
+
+
+def test_robots_rules_are_cached_and_enforced(site, tmp_path):
+    """robots.txt is fetched once per domain and disallowed paths are never requested"""
+    http = CrawlerHttp(cache_dir=str(tmp_path), min_interval=0)
+
+    with pytest.raises(RobotsDisallowed):
+        http.get(f"{site}/private/staff")
+    http.get(f"{site}/")
+
+    paths = [path for path, _ in HospitalSiteHandler.hits]
+    assert paths.count("/robots.txt") == 1
+    assert "/private/staff" not in paths
+
+
+def test_disallowed_pages_are_not_rendered_either(site, tmp_path):
+    scraper = WebsiteScraper(api_key="test", cache_dir=str(tmp_path))
+    scraper.http.min_interval = 0
+    scraper.get_rendered_html = lambda url: pytest.fail(f"{url} should not be rendered")
+
+    with pytest.raises(RobotsDisallowed):
+        scraper.fetch_page(f"{site}/private/doctors", "Cardiologist")
+    assert scraper.fetch_doctor_information(f"{site}/private/doctors", "Cardiologist") == []
+    assert scraper.tier_stats["static_failed"] == 0 and scraper.tier_stats["browser"] == 0
+
+
+class ProtectedRobotsHandler(BaseHTTPRequestHandler):
+    statuses = {}
+
+    def do_GET(self):
+        self.send_response(self.statuses.get(self.path, 200))
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.mark.parametrize("status, allowed", [(401, False), (403, False), (404, True), (410, True)])
+def test_robots_status_codes_follow_the_standard_library(tmp_path, status, allowed):
+    ProtectedRobotsHandler.statuses = {"/robots.txt": status}
+    server = ThreadingHTTPServer(("127.0.0.1", 0), ProtectedRobotsHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        http = CrawlerHttp(cache_dir=str(tmp_path), min_interval=0)
+        assert http.allowed(f"http://127.0.0.1:{server.server_address[1]}/doctors") is allowed
+    finally:
+        server.shutdown()
@@ -0,0 +1,73 @@
+"""
+Tests for the staged doctor finder pipeline, using stand-ins for Google Places, Chrome and Groq
+"""
+
+import time
+
+from modules.doctor_pipeline import DoctorFinderPipeline
+
+
+class FakeNearbyPlaces:
+    def __init__(self, details):
+        self.details = details
+
+    def iter_place_details(self, place_ids, place_type="hospital", deadline=None):
+        for place_id in place_ids:
+            yield place_id, self.details[place_id]
+
+
+class FakeScraper:
+    def find_doctor_page_links(self, homepage_url, doctor_type, max_pages=5):
+        time.sleep(0.2)
+        return [f"{homepage_url}/doctors", f"{homepage_url}/team"]
+
+    def fetch_page(self, url, doctor_type, fingerprints=None):
+        time.sleep(0.2)
+        if url.endswith("broken.example/team"):
+            raise RuntimeError("chrome crashed")
+        return f"<html><body>{url}</body></html>", []
+
+    def page_text(self, html):
+        return html
+
+    def content_hash(self, text):
+        return str(hash(text))
+
+    def extract_doctor_information(self, html, json_responses, doctor_type, body_text=None, url=None):
+        time.sleep(0.2)
+        return [{"Name": "Dr. Test", "Specialization": doctor_type, "Source": html}]
+
+
+def test_pipeline_overlaps_hospitals_and_keeps_page_order():
+    """Four hospitals finish in roughly one chain's time with per-page results in order"""
+    details = {
+        "a": {"name": "A", "website": "https://a.example"},
+        "b": {"name": "B", "website": "https://b.example"},
+        "c": {"name": "C", "website": "https://broken.example"},
+        "d": {"name": "D"},
+    }
+    pipeline = DoctorFinderPipeline(FakeNearbyPlaces(details), FakeScraper(),
+                                    link_workers=4, render_workers=6, extract_workers=6)
+
+    start = time.monotonic()
+    scrape = pipeline.run(["a", "b", "c", "d"], "cardiologist")
+    elapsed = time.monotonic() - start
+
+    # A serial walk would take 3 hospitals x (0.2 + 2 x 0.4) = 3 seconds
+    assert elapsed < 1.5
+    assert list(scrape) == ["a", "b", "c", "d"]
+    assert scrape["a"]["pages"] == ["https://a.example/doctors", "https://a.example/team"]
+    assert "a.example/doctors" in scrape["a"]["doctor_scrape"][0][0]["Source"]
+    assert "a.example/team" in scrape["a"]["doctor_scrape"][1][0]["Source"]
+    assert scrape["c"]["doctor_scrape"][1] == "Error: chrome crashed"
+    assert scrape["d"]["error"] == "No website found for this place."
+
+
+def test_pipeline_returns_partial_results_at_deadline():
+    """Pages still rendering when the deadline passes are reported as missing"""
+    details = {"a": {"name": "A", "website": "https://a.example"}}
+    pipeline = DoctorFinderPipeline(FakeNearbyPlaces(details), FakeScraper(), deadline=0.3)
+
+    scrape = pipeline.run(["a"], "cardiologist")
+
+    assert scrape["a"]["doctor_scrape"] == [None, None]
@@ -0,0 +1,188 @@
+"""
+Tests for saving scraped doctors and reusing them on repeat doctor finder searches
+"""
+
+from datetime import timedelta
+
+from flask import Flask
+from sqlalchemy import text
+
+from models import db, Hospitals, Doctors, HospitalCrawls, DoctorPageSnapshots, upgrade_schema
+from modules.doctor_pipeline import DoctorFinderPipeline
+from modules.doctor_store import DoctorStore
+
+
+class FakeNearbyPlaces:
+    def iter_place_details(self, place_ids, place_type="hospital", deadline=None):
+        for place_id in place_ids:
+            yield place_id, {"name": "City Hospital", "website": "https://city.example"}
+
+
+class CountingScraper:
+    def __init__(self):
+        self.renders = 0
+        self.extractions = 0
+
+    def find_doctor_page_links(self, homepage_url, doctor_type, max_pages=5):
+        return ["https://city.example/doctors"]
+
+    def fetch_page(self, url, doctor_type, fingerprints=None):
+        self.renders += 1
+        return "<html><body>Dr. Asha Rao</body></html>", []
+
+    def page_text(self, html):
+        return "Dr. Asha Rao"
+
+    def content_hash(self, text):
+        return "hash-of-" + text
+
+    def extract_doctor_information(self, html, json_responses, doctor_type, body_text=None, url=None):
+        self.extractions += 1
+        return [{"Name": "Dr. Asha Rao", "Designation": "Consultant", "Specialization": "none",
+                 "Contact": "none", "Doctor_Image": None}]
+
+
+def make_app():
+    app = Flask(__name__)
+    app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///:memory:'
+    app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+    db.init_app(app)
+    return app
+
+
+def run_search(store, scraper):
+    pipeline = DoctorFinderPipeline(FakeNearbyPlaces(), scraper, store=store)
+    return pipeline.run(["place-1"], "Cardiologist")
+
+
+def test_repeat_search_is_served_from_database():
+    """A second search within the TTL neither renders nor extracts"""
+    app = make_app()
+    with app.app_context():
+        db.create_all()
+        db.session.add(Hospitals(hospital_name="City Hospital", place_id="place-1", website="https://city.example"))
+        db.session.commit()
+        store = DoctorStore(db, Hospitals, Doctors, HospitalCrawls, DoctorPageSnapshots)
+        scraper = CountingScraper()
+
+        first = run_search(store, scraper)
+        second = run_search(store, scraper)
+
+        assert scraper.renders == 1 and scraper.extractions == 1
+        assert second["place-1"]["cached"] is True
+        assert first["place-1"]["doctor_scrape"][0][0]["Specialization"] == "none"
+        assert second["place-1"]["doctor_scrape"] == [[{
+            "Name": "Dr. Asha Rao", "Designation": "Consultant", "Specialization": "cardiologist",
+            "Contact": None, "Doctor_Image": None,
+        }]]
+
+        doctor = Doctors.query.one()
+        assert doctor.name == "Dr. Asha Rao"
+        assert doctor.specialization == "cardiologist"
+        assert doctor.contact is None
+        assert doctor.source_url == "https://city.example/doctors"
+
+
+def test_unchanged_page_skips_extraction_after_ttl():
+    """Once the crawl is stale the page is rendered again but an identical page is not re-extracted"""
+    app = make_app()
+    with app.app_context():
+        db.create_all()
+        db.session.add(Hospitals(hospital_name="City Hospital", place_id="place-1", website="https://city.example"))
+        db.session.commit()
+        store = DoctorStore(db, Hospitals, Doctors, HospitalCrawls, DoctorPageSnapshots, ttl=timedelta(0))
+        scraper = CountingScraper()
+
+        run_search(store, scraper)
+        again = run_search(store, scraper)
+
+        assert scraper.renders == 2
+        assert scraper.extractions == 1
+        assert again["place-1"]["doctor_scrape"][0][0]["Name"] == "Dr. Asha Rao"
+        assert Doctors.query.count() == 1
+
+
+class FailingScraper(CountingScraper):
+    def extract_doctor_information(self, html, json_responses, doctor_type, body_text=None, url=None):
+        self.extractions += 1
+        return "Error: the LLM is unavailable"
+
+
+class MovedPageScraper(CountingScraper):
+    def find_doctor_page_links(self, homepage_url, doctor_type, max_pages=5):
+        return ["https://city.example/our-doctors"]
+
+
+def test_failed_crawl_is_not_recorded_and_pages_no_longer_found_are_dropped():
+    app = make_app()
+    with app.app_context():
+        db.create_all()
+        db.session.add(Hospitals(hospital_name="City Hospital", place_id="place-1", website="https://city.example"))
+        db.session.commit()
+        store = DoctorStore(db, Hospitals, Doctors, HospitalCrawls, DoctorPageSnapshots, ttl=timedelta(0))
+
+        run_search(store, FailingScraper())
+        assert HospitalCrawls.query.count() == 0
+
+        scraper = CountingScraper()
+        run_search(store, scraper)
+        assert scraper.renders == 1
+
+        run_search(store, MovedPageScraper())
+        store.ttl = timedelta(days=7)
+        cached = run_search(store, scraper)
+        assert cached["place-1"]["pages"] == ["https://city.example/our-doctors"]
+        assert [doctor.source_url for doctor in Doctors.query.all()] == ["https://city.example/our-doctors"]
+
+
+def create_baseline_doctors_table():
+    db.session.execute(text("DROP TABLE doctors"))
+    db.session.execute(text(
+        "CREATE TABLE doctors (doctor_id INTEGER PRIMARY KEY AUTOINCREMENT, name VARCHAR NOT NULL, "
+        "hospital_id INTEGER NOT NULL REFERENCES hospitals (hospital_id), specialization VARCHAR NOT NULL, "
+        "experience INTEGER NOT NULL, rating NUMERIC(2, 1), num_rating INTEGER)"
+    ))
+    db.session.execute(text(
+        "INSERT INTO doctors (name, hospital_id, specialization, experience) VALUES ('Dr. K. Rao', 1, 'Surgeon', 12)"
+    ))
+    db.session.commit()
+
+
+def test_save_failures_are_reported_in_the_result():
+    """A database that rejects scraped doctors is reported instead of silently dropping them"""
+    app = make_app()
+    with app.app_context():
+        db.create_all()
+        db.session.add(Hospitals(hospital_name="City Hospital", place_id="place-1", website="https://city.example"))
+        db.session.commit()
+        create_baseline_doctors_table()
+        db.session.execute(text("ALTER TABLE doctors ADD COLUMN source_url VARCHAR"))
+        db.session.execute(text("ALTER TABLE doctors ADD COLUMN scraped_for VARCHAR"))
+        for column in ("designation", "contact", "image_url"):
+            db.session.execute(text(f"ALTER TABLE doctors ADD COLUMN {column} VARCHAR"))
+        db.session.execute(text("ALTER TABLE doctors ADD COLUMN updated_at DATETIME"))
+        db.session.commit()
+        store = DoctorStore(db, Hospitals, Doctors, HospitalCrawls, DoctorPageSnapshots)
+
+        result = run_search(store, CountingScraper())["place-1"]
+        assert "NOT NULL" in result["store_error"]
+        assert result["doctor_scrape"][0][0]["Name"] == "Dr. Asha Rao"
+        assert HospitalCrawls.query.count() == 0
+
+
+def test_upgrade_schema_relaxes_the_baseline_experience_column():
+    """Doctors tables from before scraping was persisted accept doctors without an experience"""
+    app = make_app()
+    with app.app_context():
+        db.create_all()
+        db.session.add(Hospitals(hospital_name="City Hospital", place_id="place-1", website="https://city.example"))
+        db.session.commit()
+        create_baseline_doctors_table()
+        upgrade_schema()
+        store = DoctorStore(db, Hospitals, Doctors, HospitalCrawls, DoctorPageSnapshots)
+
+        result = run_search(store, CountingScraper())["place-1"]
+        assert "store_error" not in result
+        assert sorted((doctor.name, doctor.experience) for doctor in Doctors.query.all()) == [
+            ("Dr. Asha Rao", None), ("Dr. K. Rao", 12)
+        ]
@@ -0,0 +1,53 @@
+"""
+Tests for the persistent LLM extraction cache
+"""
+
+import json
+from types import SimpleNamespace
+
+from modules.extraction_cache import ExtractionCache
+from modules.website_scraper import WebsiteScraper
+
+PAGE = "<html><body><h2>Dr. Meera Iyer</h2><p>Senior Cardiologist</p></body></html>"
+DOCTORS = [{"Name": "Dr. Meera Iyer", "Designation": "Senior Cardiologist", "Specialization": "Cardiology",
+            "Contact": "none", "Doctor_Image": "none"}]
+
+
+class FakeCompletions:
+    def __init__(self):
+        self.calls = 0
+
+    def create(self, messages, model):
+        self.calls += 1
+        message = SimpleNamespace(content=json.dumps(DOCTORS))
+        return SimpleNamespace(choices=[SimpleNamespace(message=message)])
+
+
+def test_least_recently_used_entries_are_evicted(tmp_path):
+    """Reading an entry keeps it alive; the coldest entry is evicted past max_entries"""
+    cache = ExtractionCache(str(tmp_path / "extractions.db"), max_entries=2)
+    cache.put("a", "Cardiologist", "1", [1])
+    cache.put("b", "Cardiologist", "1", [2])
+    assert cache.get("a", "cardiologist", "1") == [1]
+    cache.put("c", "Cardiologist", "1", [3])
+
+    assert len(cache) == 2
+    assert cache.get("b", "Cardiologist", "1") is None
+    assert cache.get("a", "Cardiologist", "1") == [1]
+    assert cache.get("a", "Cardiologist", "2") is None
+    assert cache.stats["evictions"] == 1
+
+
+def test_unchanged_page_is_not_sent_to_llm_again(tmp_path):
+    """A re-rendered page with the same text is answered from the cache, even by a new scraper"""
+    db_path = str(tmp_path / "extractions.db")
+    completions = FakeCompletions()
+
+    for _ in range(2):
+        scraper = WebsiteScraper(api_key="test", extraction_cache=ExtractionCache(db_path))
+        scraper.client = SimpleNamespace(chat=SimpleNamespace(completions=completions))
+        assert scraper.extract_doctor_information(PAGE.replace("<p>", "\n  <p>"), [], "Cardiologist") == DOCTORS
+
+    assert completions.calls == 1
+    scraper.extract_doctor_information(PAGE, [], "Neurologist")
+    assert completions.calls == 2
@@ -0,0 +1,46 @@
+"""
+Tests for the geohash grid index used for local nearby searches
+"""
+
+import random
+
+from modules.geo_index import GeoGridIndex, geohash_encode, haversine_m
+
+
+def test_geohash_encode_known_value():
+    """Matches the reference geohash for a well known coordinate"""
+    assert geohash_encode(57.64911, 10.40744, 11) == "u4pruydqqvj"
+
+
+def test_query_radius_matches_brute_force():
+    """The grid lookup finds exactly the points a full scan would, nearest first"""
+    rng = random.Random(7)
+    index = GeoGridIndex(precision=6)
+    points = {}
+    for i in range(2000):
+        lat = 12.9 + rng.uniform(-0.2, 0.2)
+        lon = 77.6 + rng.uniform(-0.2, 0.2)
+        points[i] = (lat, lon)
+        index.add(i, lat, lon, i)
+
+    center = (12.95, 77.62)
+    for radius in (300, 2500, 8000):
+        expected = sorted(
+            key for key, (lat, lon) in points.items()
+            if haversine_m(center[0], center[1], lat, lon) <= radius
+        )
+        matches = index.query_radius(center[0], center[1], radius)
+        assert sorted(item for _, item in matches) == expected
+        distances = [distance for distance, _ in matches]
+        assert distances == sorted(distances)
+
+
+def test_add_replaces_existing_point():
+    """Re-adding a key moves it instead of duplicating it"""
+    index = GeoGridIndex()
+    index.add("p", 12.97, 77.59, "old")
+    index.add("p", 28.61, 77.20, "new")
+
+    assert len(index) == 1
+    assert index.query_radius(12.97, 77.59, 1000) == []
+    assert index.query_radius(28.61, 77.20, 1000)[0][1] == "new"
@@ -0,0 +1,68 @@
+"""
+Equivalence tests for the scraper's HTML parser backends
+"""
+
+import os
+
+import pytest
+
+from modules.html_backends import PARSER_BACKENDS, parser_backend
+from modules.structured_doctors import CARD_CLASS_PATTERN, CARD_TAGS, MICRODATA_TYPE_PATTERN, structured_doctors
+from test_page_chunker import LONG_PAGE
+from test_page_fingerprint import PAGES as FINGERPRINT_PAGES
+from test_structured_doctors import CARDS_PAGE, JSON_LD_PAGE, MICRODATA_PAGE
+
+FIXTURE = os.path.join(os.path.dirname(__file__), "try.html")
+
+EDGE_CASES = [
+    # Entities, non-breaking spaces, comments and code inside the body
+    "<html><body><p>Dr.&nbsp;Meera &amp; team</p><!-- hidden --><script>var doctors = [];</script>"
+    "<style>p{}</style><p>  Cardiology\n  OPD </p></body></html>",
+    # Boilerplate by tag, class, id and role, with text right after it
+    "<html><body><div class='main-menu'>Home</div>after menu<header>Logo</header><div id='footer-links'>Links</div>"
+    "<div role='navigation'>Nav</div><section class='doctor-list'>" + "Dr. Rao, Consultant Cardiologist. " * 10
+    + "</section></body></html>",
+    # Unclosed tags and anchors holding markup
+    "<html><body><ul><li><a href='/doctors/' title='Our Doctors'> Our <b>Doctors</b></a><li><a href='#top'>Top</a>"
+    "<li><a name='x'>No href</a></ul><p>Dr. K. Rao<p>Neurologist</body></html>",
+    # Doctor cards that are links themselves, with lazy images and contacts, next to nested microdata
+    "<div class='team-member' id='doc-1'><a class='doctor-profile' href='mailto:rao@h.in'><img data-lazy-src='/r.jpg'>"
+    "<b>Dr. K. Rao</b></a><a href='TEL:+91 44'>Call</a></div><div itemscope itemtype='http://schema.org/Person'>"
+    "<meta itemprop='jobTitle' content=' Consultant  Cardiologist '><span itemprop='name givenName'>Dr. S. Iyer</span>"
+    "<a itemprop='email' href='mailto:iyer@h.in'>Mail</a><img itemprop='image' src='data:x'><img itemprop='image' src='/i.jpg'>"
+    "<div itemprop='worksFor' itemscope itemtype='https://schema.org/Hospital'><span itemprop='name'>City</span></div></div>",
+    # No body tag at all
+    "<div class='doctor-card'><h4>Dr. Anita Menon</h4><a href='/anita'>Profile</a></div>",
+]
+
+
+def saved_pages():
+    with open(FIXTURE, "r", encoding="utf-8") as file:
+        pages = [file.read()]
+    return pages + [LONG_PAGE, JSON_LD_PAGE, MICRODATA_PAGE, CARDS_PAGE] + list(FINGERPRINT_PAGES.values()) + EDGE_CASES
+
+
+@pytest.mark.parametrize("html", saved_pages())
+def test_lxml_matches_the_html_parser_reference(html):
+    reference, fast = parser_backend("html.parser"), parser_backend("lxml")
+    assert fast.links(html) == reference.links(html)
+    assert fast.main_text(html) == reference.main_text(html)
+    structured = (MICRODATA_TYPE_PATTERN, CARD_TAGS, CARD_CLASS_PATTERN)
+    assert fast.structured_elements(html, *structured) == reference.structured_elements(html, *structured)
+    for doctor_type in ("doctor", "Cardiologist"):
+        assert (structured_doctors(html, [], doctor_type, "https://hospital.in/", parser=fast)
+                == structured_doctors(html, [], doctor_type, "https://hospital.in/", parser=reference))
+
+
+def test_saved_page_links_and_text_are_found():
+    with open(FIXTURE, "r", encoding="utf-8") as file:
+        html = file.read()
+    backend = parser_backend()
+    assert ("https://iswaryafertility.com/doctors/", "Doctors", "") in backend.links(html)
+    assert backend.main_text(html).startswith("Dr. Amutharani G")
+
+
+def test_unknown_backends_are_rejected():
+    assert set(PARSER_BACKENDS) == {"lxml", "html.parser"}
+    with pytest.raises(ValueError):
+        parser_backend("html5lib")
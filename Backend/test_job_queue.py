@@ -0,0 +1,70 @@
+"""
+Tests for the SQLite-backed background job queue
+"""
+
+import time
+
+from modules.job_queue import JobQueue
+
+
+def test_job_runs_and_reports_result(tmp_path):
+    """A queued job is claimed, reports progress and stores its result"""
+    queue = JobQueue(str(tmp_path / "jobs.db"))
+    seen_progress = []
+
+    def handler(payload, progress):
+        progress(0.5, "halfway")
+        seen_progress.append(queue.get(job_id)["message"])
+        return {"doubled": payload["value"] * 2}
+
+    queue.register("double", handler)
+    job_id = queue.enqueue("double", {"value": 21})
+    assert queue.get(job_id)["status"] == "queued"
+
+    assert queue.run_next("worker-1") is True
+    assert queue.run_next("worker-1") is False
+
+    job = queue.get(job_id)
+    assert job["status"] == "done"
+    assert job["result"] == {"doubled": 42}
+    assert job["progress"] == 1
+    assert seen_progress == ["halfway"]
+
+
+def test_failed_job_records_error(tmp_path):
+    """Handler exceptions mark the job as failed with the error message"""
+    queue = JobQueue(str(tmp_path / "jobs.db"))
+
+    def handler(payload, progress):
+        raise ValueError("website unreachable")
+
+    queue.register("scrape", handler)
+    job_id = queue.enqueue("scrape", {})
+    queue.run_next("worker-1")
+
+    job = queue.get(job_id)
+    assert job["status"] == "failed"
+    assert job["error"] == "website unreachable"
+
+
+def test_job_is_reclaimed_after_worker_dies(tmp_path):
+    """A running job whose lease expired is handed to another worker"""
+    queue = JobQueue(str(tmp_path / "jobs.db"), lease_seconds=0.1)
+    job_id = queue.enqueue("scrape", {})
+
+    assert queue.claim("crashed-worker")["job_id"] == job_id
+    assert queue.claim("other-worker") is None
+
+    time.sleep(0.2)
+    assert queue.claim("other-worker")["job_id"] == job_id
+    assert queue.get(job_id)["attempts"] == 2
+
+
+def test_job_survives_queue_restart(tmp_path):
+    """Jobs live in the database file, not in the queue object"""
+    path = str(tmp_path / "jobs.db")
+    job_id = JobQueue(path).enqueue("scrape", {"url": "https://example.com"})
+
+    restarted = JobQueue(path)
+    assert restarted.claim("worker-1")["payload"] == {"url": "https://example.com"}
+    assert restarted.get(job_id)["status"] == "running"
@@ -0,0 +1,125 @@
+"""
+Tests for the bounded capture of JSON responses from rendered pages
+"""
+
+import gzip
+import json
+from types import SimpleNamespace
+
+import brotli
+import pytest
+import zstandard
+
+from modules.json_capture import JsonCapture, bounded_decode, relevance, serialise_for_prompt
+from modules.website_scraper import MAX_JSON_CHUNKS, WebsiteScraper
+
+
+def response(url, data, content_type="application/json; charset=utf-8", encoding=None):
+    body = data if isinstance(data, bytes) else json.dumps(data).encode()
+    headers = {"Content-Type": content_type}
+    if encoding == "gzip":
+        body = gzip.compress(body)
+        headers["Content-Encoding"] = "gzip"
+    return SimpleNamespace(url=url, response=SimpleNamespace(headers=headers, body=body))
+
+
+DOCTORS = {"doctors": [{"doctorName": "Dr. Meera Iyer", "designation": "Consultant Cardiologist"}]}
+
+
+def test_doctor_responses_rank_above_unrelated_ones():
+    doctors = json.dumps(DOCTORS).encode()
+    assert relevance("https://hospital.in/api/doctors", doctors) > relevance("https://hospital.in/api/menu", doctors)
+    assert relevance("https://hospital.in/api/list", doctors) > relevance("https://hospital.in/api/list", b'{"menu": []}')
+
+
+def test_capture_returns_the_best_responses_first_and_skips_non_json():
+    capture = JsonCapture()
+    captured = capture.capture([
+        response("https://hospital.in/api/menu", {"items": ["Home", "Contact"]}),
+        SimpleNamespace(url="https://hospital.in/", response=None),
+        response("https://hospital.in/app.js", b"var x = 1;", content_type="application/javascript"),
+        response("https://hospital.in/api/faculty", DOCTORS),
+    ])
+
+    assert [item["url"] for item in captured] == ["https://hospital.in/api/faculty", "https://hospital.in/api/menu"]
+    assert captured[0]["data"] == DOCTORS
+    assert capture.stats == {"seen": 2, "captured": 2, "too_large": 0, "over_budget": 0, "invalid": 0}
+
+
+def test_size_and_count_budgets_are_enforced():
+    capture = JsonCapture(max_response_bytes=2000, max_total_bytes=3000, max_responses=2)
+    captured = capture.capture([
+        response("https://hospital.in/api/huge", {"blob": "x" * 5000}),
+        response("https://hospital.in/api/doctors", {"doctors": ["Dr. Rao"], "pad": "y" * 1500}),
+        response("https://hospital.in/api/staff", {"staff": ["Dr. Anita"], "pad": "z" * 1500}),
+        response("https://hospital.in/api/consultants", {"consultants": ["Dr. K"]}),
+        response("https://hospital.in/api/menu", {"items": []}),
+        response("https://hospital.in/api/broken", b'{"doctors": ['),
+    ])
+
+    assert len(captured) == 2
+    assert sum(len(json.dumps(item["data"])) for item in captured) <= 3000
+    assert capture.stats["too_large"] == 1
+    assert capture.stats["over_budget"] >= 2
+    assert capture.stats["captured"] == 2
+
+
+def test_compressed_bodies_are_decoded_and_checked_after_decoding():
+    capture = JsonCapture(max_response_bytes=1000)
+    captured = capture.capture([
+        response("https://hospital.in/api/doctors", DOCTORS, encoding="gzip"),
+        response("https://hospital.in/api/staff", {"staff": "a" * 5000}, encoding="gzip"),
+    ])
+
+    assert captured == [{"url": "https://hospital.in/api/doctors", "data": DOCTORS}]
+    assert capture.stats["too_large"] == 1
+
+
+@pytest.mark.parametrize("encoding, compress", [
+    ("gzip", gzip.compress),
+    ("br", brotli.compress),
+    ("zstd", zstandard.ZstdCompressor().compress),
+])
+def test_compression_bombs_are_never_decompressed_in_full(encoding, compress):
+    # 64 MB of JSON that compresses to a few kilobytes
+    bomb = compress(b'{"doctors": "' + b"a" * (64 * 1024 * 1024) + b'"}')
+    assert len(bounded_decode(bomb, encoding, 1000)) <= 1001
+
+    capture = JsonCapture(max_response_bytes=1000)
+    raw = response("https://hospital.in/api/doctors", b"", encoding=None)
+    raw.response.headers["Content-Encoding"] = encoding
+    raw.response.body = bomb
+    assert capture.capture([raw]) == []
+    assert capture.stats["too_large"] == 1
+
+
+def test_bodies_too_large_as_sent_are_rejected_before_decoding(monkeypatch):
+    monkeypatch.setattr("modules.json_capture.bounded_decode", lambda *args: pytest.fail("should not be decoded"))
+    capture = JsonCapture(max_response_bytes=1000)
+    assert capture.capture([response("https://hospital.in/api/doctors", {"pad": "x" * 5000})]) == []
+    assert capture.stats["too_large"] == 1
+
+
+def test_serialisation_stops_at_the_character_budget():
+    responses = [{"url": f"https://hospital.in/api/{index}", "data": {"pad": "x" * 100}} for index in range(50)]
+    text = serialise_for_prompt(responses, 500)
+    assert len(text) == 502
+    assert text.startswith('[{"url": "https://hospital.in/api/0"')
+    assert serialise_for_prompt(responses[:1], 10000) == json.dumps(responses[:1], ensure_ascii=False)
+
+
+def test_extraction_sends_only_the_json_budget():
+    scraper = WebsiteScraper(api_key="test")
+    responses = [{"url": f"https://hospital.in/api/{index}", "data": {"pad": "x" * 4000}} for index in range(40)]
+    chunks = scraper.extraction_chunks("Dr. Meera Iyer\nCardiology", responses)
+    assert [kind for kind, _ in chunks] == ["html"] + ["json"] * MAX_JSON_CHUNKS
+
+
+def test_compressed_doctor_payloads_are_ranked_by_their_decoded_keys():
+    capture = JsonCapture(max_responses=2)
+    doctors = {"results": [{"doctorName": f"Dr. {index}", "designation": "Consultant"} for index in range(8)]}
+    captured = capture.capture(
+        [response(f"https://hospital.in/api/config{index}", {"theme": "blue"}, encoding="gzip") for index in range(10)]
+        + [response("https://hospital.in/api/list", doctors, encoding="gzip")]
+    )
+    assert captured[0] == {"url": "https://hospital.in/api/list", "data": doctors}
@@ -0,0 +1,66 @@
+"""
+Tests for the compiled link classifier used while crawling hospital websites
+"""
+
+import os
+from urllib.parse import urljoin, urlparse
+
+from bs4 import BeautifulSoup
+
+from modules.link_classifier import PATH_PATTERN, TEXT_KEYWORDS, URL_KEYWORDS, link_classifier_for
+
+FIXTURE = os.path.join(os.path.dirname(__file__), "try.html")
+
+
+def keyword_scan(doctor_type, text, title, url_path):
+    # The per-keyword substring tests the classifier replaces
+    doctor_keywords = TEXT_KEYWORDS + (doctor_type.lower(),)
+    url_keywords = URL_KEYWORDS + (doctor_type.lower(),)
+    return bool(
+        (text and any(keyword in text for keyword in doctor_keywords))
+        or (title and any(keyword in title for keyword in doctor_keywords))
+        or any(keyword in url_path for keyword in url_keywords)
+        or PATH_PATTERN.search(url_path)
+    )
+
+
+def saved_links():
+    with open(FIXTURE, "r", encoding="utf-8") as file:
+        soup = BeautifulSoup(file.read(), "html.parser")
+    for link in soup.find_all("a", href=True):
+        url_path = urlparse(urljoin("https://iswaryafertility.com/", link["href"])).path.lower()
+        yield link.get_text(strip=True).lower(), link.get("title", "").lower(), url_path
+
+
+def test_matches_keyword_scan_on_saved_hospital_page():
+    """The combined regex accepts exactly the links the keyword-by-keyword scan accepted"""
+    links = list(saved_links()) + [
+        ("meet our gynaecologist", "", "/team-page"),
+        ("", "", "/x/gynecology"),
+        ("", "Dr. Rao profile", "/p/12"),
+        ("contact", "", "/contact-us/"),
+        ("", "", "/"),
+    ]
+    for doctor_type in ("Gynecologist", "cardiologist", "IVF Specialist"):
+        classifier = link_classifier_for(doctor_type)
+        for text, title, url_path in links:
+            expected = keyword_scan(doctor_type, text, title, url_path)
+            assert classifier.is_relevant(text, title, url_path) == expected, (doctor_type, text, url_path)
+
+
+def test_ranks_doctor_listings_before_generic_pages():
+    """Doctor listings for the specialty outrank generic sections, and excluded URLs are dropped"""
+    classifier = link_classifier_for("Cardiologist")
+    links = {
+        "https://h.example/about-us/": ("about us", "", "/about-us/"),
+        "https://h.example/cardiology/our-doctors/": ("our cardiologist doctors", "", "/cardiology/our-doctors/"),
+        "https://h.example/doctors/": ("find a doctor", "", "/doctors/"),
+        "https://h.example/blog/meet-the-team/": ("meet the team", "", "/blog/meet-the-team/"),
+    }
+    scores = {url: classifier.score(*fields) for url, fields in links.items()}
+    ranked = classifier.rank(scores)
+
+    assert ranked[0] == "https://h.example/cardiology/our-doctors/"
+    assert ranked.index("https://h.example/doctors/") < ranked.index("https://h.example/about-us/")
+    assert "https://h.example/blog/meet-the-team/" not in ranked
+    assert link_classifier_for("Cardiologist") is classifier
@@ -0,0 +1,58 @@
+"""
+Tests for the two-tier nearby search cache
+"""
+
+import time
+
+from modules.nearby_cache import NearbySearchCache
+from modules.nearby_places import NearbyPlaces
+
+KEY = ("tdr1y", "hospital", 20)
+
+
+def test_disk_tier_survives_a_new_process(tmp_path):
+    """A fresh cache instance (as in another worker) is served from SQLite and then from memory"""
+    db_path = str(tmp_path / "nearby.db")
+    NearbySearchCache(db_path).put(KEY, [{"place_id": "city"}])
+
+    cache = NearbySearchCache(db_path)
+    assert cache.get(KEY) == ([{"place_id": "city"}], False)
+    assert cache.get(KEY) == ([{"place_id": "city"}], False)
+    assert cache.get(("tdr1y", "pharmacy", 20)) is None
+    assert cache.stats()["disk_hits"] == 1
+    assert cache.stats()["memory_hits"] == 1
+    assert cache.stats()["misses"] == 1
+
+
+def test_memory_tier_is_bounded(tmp_path):
+    cache = NearbySearchCache(str(tmp_path / "nearby.db"), max_memory_entries=2)
+    for bucket in range(3):
+        cache.put(("tdr1y", "hospital", bucket), [bucket])
+    assert len(cache.memory) == 2
+    assert cache.get(("tdr1y", "hospital", 0)) == ([0], False)
+
+
+def test_stale_results_are_served_and_refreshed_in_background(tmp_path):
+    """An expired area answers instantly with old results while one refresh runs behind it"""
+    places = NearbyPlaces(api_key="test", search_cache=NearbySearchCache(str(tmp_path / "nearby.db"), ttl=0.2))
+    calls = []
+
+    def fake_fetch(lat, lon, type="hospital", radius=5000, max_pages=1):
+        calls.append(time.monotonic())
+        time.sleep(0.1)
+        return [{"name": f"version {len(calls)}"}]
+
+    places._fetch_nearby_places = fake_fetch
+
+    assert places.find_nearby_places(12.9716, 77.5946) == [{"name": "version 1"}]
+    assert places.find_nearby_places(12.9716, 77.5946) == [{"name": "version 1"}]
+    time.sleep(0.25)
+
+    start = time.monotonic()
+    assert places.find_nearby_places(12.9716, 77.5946) == [{"name": "version 1"}]
+    assert places.find_nearby_places(12.9716, 77.5946) == [{"name": "version 1"}]
+    assert time.monotonic() - start < 0.1
+
+    time.sleep(0.2)
+    assert places.find_nearby_places(12.9716, 77.5946) == [{"name": "version 2"}]
+    assert len(calls) == 2
@@ -0,0 +1,124 @@
+"""
+Tests for the NearbyPlaces helpers that do not need a real Google Maps key
+"""
+
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from modules.nearby_places import NearbyPlaces
+
+
+def test_place_details_many_returns_partial_results():
+    """Failed and timed-out places are dropped while the rest are returned in order"""
+    places = NearbyPlaces(api_key="test", max_workers=4, timeout=1)
+
+    def fake_place_details(place_id, fields=None):
+        if place_id == "slow":
+            time.sleep(2)
+        if place_id == "broken":
+            raise KeyError("result")
+        return {"name": place_id}
+
+    places.place_details = fake_place_details
+
+    start = time.monotonic()
+    details = places.place_details_many(["a", "slow", "broken", "b", "a", None], deadline=0.5)
+    elapsed = time.monotonic() - start
+
+    assert list(details) == ["a", "b"]
+    assert details["b"] == {"name": "b"}
+    assert elapsed < 1.5
+
+
+def test_place_details_many_runs_in_parallel():
+    """A batch costs roughly one round-trip instead of one per place"""
+    places = NearbyPlaces(api_key="test", max_workers=8, timeout=5)
+
+    def fake_place_details(place_id, fields=None):
+        time.sleep(0.2)
+        return {"name": place_id}
+
+    places.place_details = fake_place_details
+
+    start = time.monotonic()
+    details = places.place_details_many([f"place-{i}" for i in range(8)])
+    elapsed = time.monotonic() - start
+
+    assert len(details) == 8
+    assert elapsed < 1.0
+
+
+def test_concurrent_nearby_searches_share_one_request():
+    """Simultaneous searches from the same neighbourhood make a single upstream call"""
+    places = NearbyPlaces(api_key="test")
+    calls = []
+
+    def fake_fetch(lat, lon, type="hospital", radius=5000, max_pages=1):
+        calls.append((lat, lon))
+        time.sleep(0.3)
+        return [{"name": "City Hospital", "place_id": "city"}]
+
+    places._fetch_nearby_places = fake_fetch
+
+    with ThreadPoolExecutor(max_workers=6) as executor:
+        searches = [
+            executor.submit(places.find_nearby_places, 12.97160 + i * 0.00001, 77.59460, "hospital", 5000)
+            for i in range(6)
+        ]
+        results = [search.result() for search in searches]
+
+    assert len(calls) == 1
+    assert all(result == [{"name": "City Hospital", "place_id": "city"}] for result in results)
+    assert results[0] is not results[1]
+
+    places.find_nearby_places(12.99, 77.59460, "hospital", 5000)
+    places.find_nearby_places(12.97160, 77.59460, "pharmacy", 5000)
+    assert len(calls) == 3
+
+
+class FakeResponse:
+    def __init__(self, data):
+        self.data = data
+
+    def raise_for_status(self):
+        pass
+
+    def json(self):
+        return self.data
+
+
+class FakePagedSession:
+    """Serves three pages of results; the first use of each page token is rejected as Google does"""
+
+    def __init__(self):
+        self.requests = []
+        self.rejected = set()
+
+    def get(self, url, params=None, timeout=None):
+        self.requests.append(dict(params))
+        token = params.get("pagetoken")
+        if token and token not in self.rejected:
+            self.rejected.add(token)
+            return FakeResponse({"status": "INVALID_REQUEST", "results": []})
+        page = {None: 0, "token-1": 1, "token-2": 2}[token]
+        data = {"status": "OK", "results": [{"place_id": f"p{page}-{i}"} for i in range(2)]}
+        if page < 2:
+            data["next_page_token"] = f"token-{page + 1}"
+        return FakeResponse(data)
+
+
+def test_iter_nearby_pages_follows_page_tokens():
+    """Each page is yielded as it arrives and not-yet-valid tokens are retried"""
+    places = NearbyPlaces(api_key="test", page_token_delay=0)
+    places.session = FakePagedSession()
+
+    pages = places.iter_nearby_pages(12.97, 77.59, "pharmacy", 1000)
+    assert next(pages) == [{"place_id": "p0-0"}, {"place_id": "p0-1"}]
+    assert len(places.session.requests) == 1
+
+    assert [place["place_id"] for page in pages for place in page] == ["p1-0", "p1-1", "p2-0", "p2-1"]
+    assert len(places.session.requests) == 5
+
+    places.session = FakePagedSession()
+    assert len(places.find_nearby_places(12.97, 77.59, "pharmacy", 1000)) == 2
+    assert len(places.find_nearby_places(12.97, 77.59, "pharmacy", 1000, max_pages=3)) == 6
@@ -0,0 +1,110 @@
+"""
+Tests for the outbound call governor guarding Places and Groq
+"""
+
+import time
+
+import pytest
+import requests
+
+from modules.chatbot import Chatbot
+from modules.nearby_cache import NearbySearchCache
+from modules.nearby_places import NearbyPlaces
+from modules.outbound import (
+    UPSTREAM_SETTINGS, CircuitOpenError, OutboundGovernor, RateLimitExceeded, TokenBucket, Upstream,
+)
+from modules.website_scraper import WebsiteScraper
+
+
+class Flaky:
+    def __init__(self, failures, error=requests.ConnectionError):
+        self.failures = failures
+        self.error = error
+        self.calls = 0
+
+    def __call__(self):
+        self.calls += 1
+        if self.calls <= self.failures:
+            raise self.error("upstream down")
+        return "ok"
+
+
+def test_transient_errors_are_retried_with_backoff():
+    upstream = Upstream("test", retries=2, backoff=0.01)
+    flaky = Flaky(failures=2)
+    assert upstream.call(flaky) == "ok"
+    assert flaky.calls == 3
+    assert upstream.stats()["retried"] == 2
+
+    not_retryable = Flaky(failures=5, error=ValueError)
+    with pytest.raises(ValueError):
+        upstream.call(not_retryable)
+    assert not_retryable.calls == 1
+
+
+def test_circuit_opens_fails_fast_and_recovers():
+    upstream = Upstream("test", retries=0, failure_threshold=2, reset_timeout=0.2)
+    down = Flaky(failures=100)
+    for _ in range(2):
+        with pytest.raises(requests.ConnectionError):
+            upstream.call(down)
+
+    with pytest.raises(CircuitOpenError):
+        upstream.call(down)
+    assert down.calls == 2
+    assert upstream.stats()["state"] == "open"
+
+    time.sleep(0.25)
+    assert upstream.call(lambda: "back") == "back"
+    assert upstream.stats()["state"] == "closed"
+
+
+def test_token_bucket_limits_rate_and_adapts():
+    bucket = TokenBucket(rate=20, capacity=2)
+    assert bucket.acquire(0) and bucket.acquire(0)
+    assert not bucket.acquire(0)
+    assert bucket.acquire(0.2)
+
+    bucket.slow_down()
+    assert bucket.rate == 10
+    bucket.speed_up()
+    assert bucket.rate == 11
+
+    upstream = Upstream("test", rate=1, burst=1, timeout=0.05)
+    upstream.call(lambda: None)
+    with pytest.raises(RateLimitExceeded):
+        upstream.call(lambda: None)
+
+
+def test_nearby_search_serves_expired_results_while_places_is_down(tmp_path):
+    governor = OutboundGovernor({"google_places": {"retries": 0, "failure_threshold": 1, "reset_timeout": 60}})
+    cache = NearbySearchCache(str(tmp_path / "nearby.db"), ttl=0, stale_ttl=0)
+    places = NearbyPlaces(api_key="test", search_cache=cache, governor=governor)
+    cache.put(places.search_key(12.9716, 77.5946, "hospital", 5000), [{"place_id": "old"}])
+
+    def down(*args, **kwargs):
+        raise requests.ConnectionError("Places unreachable")
+
+    places.session.get = down
+    assert places.find_nearby_places(12.9716, 77.5946) == [{"place_id": "old"}]
+    assert governor.stats()["google_places"]["state"] == "open"
+    with pytest.raises(CircuitOpenError):
+        places.find_nearby_places(13.5, 77.5946)
+
+
+def test_scraping_failures_do_not_block_chat():
+    """Doctor extraction and chat use separate Groq guards, each within the account's budget"""
+    governor = OutboundGovernor()
+    chat = Chatbot(api_key="test", governor=governor)
+    scraper = WebsiteScraper(api_key="test")
+    assert chat.upstream.name == "groq_chat" and scraper.upstream.name == "groq_extract"
+    assert UPSTREAM_SETTINGS["groq_chat"]["rate"] + UPSTREAM_SETTINGS["groq_extract"]["rate"] <= 0.5
+
+    extract = governor.upstream("groq_extract")
+    extract.retries, extract.breaker.failure_threshold = 0, 2
+    down = Flaky(failures=100)
+    for _ in range(extract.breaker.failure_threshold):
+        with pytest.raises(requests.ConnectionError):
+            extract.call(down)
+    assert extract.stats()["state"] == "open"
+    assert governor.upstream("groq_chat").call(lambda: "hello") == "hello"
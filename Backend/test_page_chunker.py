@@ -0,0 +1,88 @@
+"""
+Tests for boilerplate stripping, chunking and chunked LLM extraction of whole pages
+"""
+
+import json
+import os
+import re
+import threading
+from types import SimpleNamespace
+
+from modules.page_chunker import chunk_text, estimate_tokens, main_text
+from modules.website_scraper import MAX_CHUNKS, MAX_JSON_CHUNKS, WebsiteScraper
+
+FIXTURE = os.path.join(os.path.dirname(__file__), "try.html")
+
+DOCTOR_LINES = "\n".join(
+    f"<p>Dr. Doctor{index} Kumar</p><p>Consultant Cardiologist, {'MBBS, MD, DM ' * 8}</p>" for index in range(60)
+)
+LONG_PAGE = f"""<html><body><nav><a href="/">Home</a><a href="/about">About us</a></nav>
+<div class="site-header">Book an appointment 1800 000 000</div>
+<main>{DOCTOR_LINES}</main>
+<footer>Copyright City Heart Hospital</footer></body></html>"""
+
+
+class ChunkCompletions:
+    """Answers each chunk with the doctors named in it, wrapped in a code fence like real models do"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.calls = 0
+        self.threads = set()
+
+    def create(self, messages, model):
+        with self.lock:
+            self.calls += 1
+            self.threads.add(threading.current_thread().name)
+        names = re.findall(r"Dr\. Doctor\d+ Kumar", messages[1]["content"])
+        doctors = [{"Name": name, "Designation": "none", "Specialization": "Cardiology", "Contact": "none",
+                    "Doctor_Image": "none"} for name in names]
+        content = "```json\n" + json.dumps(doctors) + "\n```"
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=content))])
+
+
+def test_navigation_and_footer_are_stripped():
+    text = main_text(LONG_PAGE)
+    assert "About us" not in text and "Copyright" not in text and "1800 000 000" not in text
+    assert "Dr. Doctor59 Kumar" in text
+
+    with open(FIXTURE, "r", encoding="utf-8") as file:
+        text = main_text(file.read())
+    assert text.startswith("Dr. Amutharani G")
+    # Short pages that live inside a header are not emptied
+    assert "Dr. Rao" in main_text("<html><body><header><h1>Dr. Rao</h1></header></body></html>")
+
+
+def test_chunks_stay_within_budget_and_overlap():
+    text = "\n".join(f"line {index} " + "x" * 50 for index in range(200))
+    chunks = chunk_text(text, max_tokens=200, overlap_lines=2)
+
+    assert len(chunks) > 1
+    assert all(estimate_tokens(chunk) <= 200 for chunk in chunks)
+    for previous, current in zip(chunks, chunks[1:]):
+        assert current.split("\n")[:2] == previous.split("\n")[-2:]
+    assert "line 199" in chunks[-1]
+    assert chunk_text("x" * 2000, max_tokens=100) == ["x" * 400] * 5
+
+
+def test_whole_page_is_extracted_concurrently_and_merged():
+    completions = ChunkCompletions()
+    scraper = WebsiteScraper(api_key="test")
+    scraper.client = SimpleNamespace(chat=SimpleNamespace(completions=completions))
+
+    doctors = scraper.extract_doctor_information(LONG_PAGE, [], "Cardiologist")
+
+    # Overlapping chunks name some doctors twice; each appears once, including those past the old 6000 characters
+    assert sorted(doctor["Name"] for doctor in doctors) == sorted(f"Dr. Doctor{index} Kumar" for index in range(60))
+    assert completions.calls == len(scraper.extraction_chunks(main_text(LONG_PAGE), [])) > 1
+    assert all(name.startswith("doctor-chunks") for name in completions.threads)
+
+
+def test_json_chunks_are_kept_on_long_pages():
+    scraper = WebsiteScraper(api_key="test")
+    text = "\n".join(f"Dr. Doctor{index} Kumar, Consultant Cardiologist " + "x" * 200 for index in range(400))
+    responses = [{"url": "https://hospital.in/api/doctors", "data": {"pad": "y" * 20000}}]
+
+    chunks = scraper.extraction_chunks(text, responses)
+    assert len(chunks) == MAX_CHUNKS
+    assert [kind for kind, _ in chunks[-MAX_JSON_CHUNKS:]] == ["json"] * MAX_JSON_CHUNKS
@@ -0,0 +1,128 @@
+"""
+Tests for URL canonicalisation and near-duplicate page detection in the hospital crawler
+"""
+
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from modules.page_fingerprint import DuplicatePage, PageFingerprints, canonical_url, similarity, simhash
+from modules.website_scraper import WebsiteScraper
+
+PROFILES = "".join(
+    f"<div><h3>Dr. Doctor{index} Iyer</h3><p>Consultant Cardiologist with {index + 5} years of experience in "
+    f"interventional cardiology, echocardiography and heart failure clinics.</p></div>"
+    for index in range(12)
+)
+DOCTORS_PAGE = f"<html><body><nav>Home | Doctors</nav><main><h1>Our Cardiologists</h1>{PROFILES}</main></body></html>"
+APP_SHELL = ("<html><body><div id='root'><p>" + "Loading our hospital experience, please wait. " * 15
+             + "</p></div></body></html>")
+PAGES = {
+    "/": '<html><body><a href="/doctors">Doctors</a><a href="/doctors/">Our doctors</a>'
+         '<a href="/doctors?page=1&utm_source=home">Find a doctor</a><a href="/en/doctors">Doctors (EN)</a>'
+         '<a href="/team#cardiology">Cardiology team</a></body></html>',
+    "/doctors": DOCTORS_PAGE,
+    # Localised copy with a different menu and a one-line banner
+    "/en/doctors": DOCTORS_PAGE.replace("Home | Doctors", "Accueil | Médecins").replace(
+        "<main>", "<main><p>Now open on Sundays</p>"),
+    # Client-rendered pages sharing one app shell until their listings load
+    "/app/cardiology": APP_SHELL,
+    "/app/neurology": APP_SHELL,
+    "/team": "<html><body><main><h1>Cardiology team</h1>" + PROFILES.replace("Iyer", "Rao").replace(
+        "Cardiologist", "Surgeon") + "</main></body></html>",
+}
+
+
+class HospitalHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        body = PAGES.get(self.path.split("?")[0])
+        if body is None:
+            self.send_response(404)
+            self.end_headers()
+            return
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.end_headers()
+        self.wfile.write(body.encode("utf-8"))
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def site():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), HospitalHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+
+
+def test_url_variants_share_one_canonical_form():
+    variants = [
+        "https://Hospital.in/doctors",
+        "https://hospital.in/doctors/",
+        "https://hospital.in:443/doctors?page=1",
+        "https://hospital.in//doctors/index.html?utm_source=google&gclid=abc#top",
+    ]
+    assert {canonical_url(url) for url in variants} == {"https://hospital.in/doctors"}
+    assert canonical_url("https://hospital.in/doctors?page=2&b=1") == "https://hospital.in/doctors?b=1&page=2"
+    assert canonical_url("http://hospital.in:8080/") == "http://hospital.in:8080/"
+
+
+def test_simhash_separates_near_duplicates_from_different_pages():
+    original = simhash(DOCTORS_PAGE)
+    assert similarity(original, simhash(PAGES["/en/doctors"])) >= 0.9
+    assert similarity(original, simhash(PAGES["/team"])) < 0.9
+
+
+def test_fingerprints_report_the_first_copy():
+    fingerprints = PageFingerprints()
+    text = " ".join(f"Dr. Doctor{index} Iyer, Consultant Cardiologist." for index in range(30))
+    assert fingerprints.duplicate_of("https://hospital.in/doctors", text) is None
+    # Seeing the same page again, e.g. rendered after its static fetch, is not a duplicate
+    assert fingerprints.duplicate_of("https://hospital.in/doctors/", text) is None
+    assert fingerprints.duplicate_of("https://hospital.in/en/doctors", text + " Open on Sundays.") == (
+        "https://hospital.in/doctors"
+    )
+    assert fingerprints.duplicate_of("https://hospital.in/app", "<div id='root'></div>") is None
+
+
+def test_duplicate_pages_are_skipped_before_rendering(site):
+    scraper = WebsiteScraper(api_key="test")
+    scraper.http.min_interval = 0
+    scraper.get_rendered_html = lambda url: pytest.fail(f"{url} should not be rendered")
+    extracted = []
+    scraper.extract_doctor_information = lambda html, json_responses, doctor_type, url=None: extracted.append(url) or []
+
+    pages = scraper.find_doctor_page_links(f"{site}/", "Cardiologist")
+    assert sorted(pages) == sorted([f"{site}/doctors", f"{site}/en/doctors", f"{site}/team"])
+
+    fingerprints = PageFingerprints()
+    for page in pages:
+        scraper.fetch_doctor_information(page, "Cardiologist", fingerprints)
+    assert len(extracted) == 2 and f"{site}/team" in extracted
+    assert scraper.tier_stats["duplicate"] == 1
+
+    with pytest.raises(DuplicatePage):
+        scraper.fetch_page(f"{site}/en/doctors?utm_source=mail", "Cardiologist", fingerprints)
+
+
+def test_app_shells_are_rendered_before_fingerprinting(site):
+    """Pages sharing an app shell are not duplicates, e.g. while another is still rendering or failed to"""
+    scraper = WebsiteScraper(api_key="test")
+    scraper.http.min_interval = 0
+    rendered = {f"{site}/app/neurology": "<html><body>" + PROFILES + "</body></html>"}
+
+    def render(url):
+        if url not in rendered:
+            raise TimeoutError(f"{url} did not load")
+        return rendered[url], []
+
+    scraper.get_rendered_html = render
+
+    fingerprints = PageFingerprints()
+    with pytest.raises(TimeoutError):
+        scraper.fetch_page(f"{site}/app/cardiology", "doctor", fingerprints)
+    assert scraper.fetch_page(f"{site}/app/neurology", "doctor", fingerprints)[0] == rendered[f"{site}/app/neurology"]
+    assert scraper.tier_stats["browser"] == 2 and scraper.tier_stats["duplicate"] == 0
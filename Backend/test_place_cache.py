@@ -0,0 +1,143 @@
+"""
+Tests for the place details cache backed by the Hospitals and Pharmacy tables
+"""
+
+import threading
+from datetime import timedelta
+
+from flask import Flask
+from sqlalchemy import text
+
+from models import db, Hospitals, Pharmacy, upgrade_schema
+from modules.nearby_places import NearbyPlaces
+from modules.place_cache import PlaceDetailsCache
+
+
+def make_app():
+    app = Flask(__name__)
+    app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///:memory:'
+    app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+    db.init_app(app)
+    return app
+
+
+PHARMACY_DETAILS = {
+    "name": "Apollo Pharmacy",
+    "formatted_phone_number": "080 1234 5678",
+    "rating": 4.3,
+    "opening_hours": {"weekday_text": ["Monday: Open 24 hours"]},
+    "geometry": {"location": {"lat": 12.9716, "lng": 77.5946}},
+}
+
+
+def test_cache_serves_repeat_lookups_from_database():
+    """The second lookup for a place is answered without calling Google"""
+    app = make_app()
+    with app.app_context():
+        db.create_all()
+        cache = PlaceDetailsCache(db, Hospitals, Pharmacy)
+        places = NearbyPlaces(api_key="test", cache=cache)
+        calls = []
+
+        def fake_place_details(place_id, fields=None):
+            calls.append(fields)
+            return dict(PHARMACY_DETAILS)
+
+        places.place_details = fake_place_details
+
+        first = places.place_details_many(["pharmacy-1"], place_type="pharmacy")
+        second = places.place_details_many(["pharmacy-1"], place_type="pharmacy")
+
+        assert len(calls) == 1
+        assert first == second == {"pharmacy-1": PHARMACY_DETAILS}
+        assert Pharmacy.query.filter_by(place_id="pharmacy-1").one().name == "Apollo Pharmacy"
+        assert cache.stats()["hits"] == 1
+        assert cache.stats()["misses"] == 1
+
+
+def test_cache_refetches_only_stale_field_groups():
+    """An expired rating group asks Google for the rating field alone"""
+    app = make_app()
+    with app.app_context():
+        db.create_all()
+        cache = PlaceDetailsCache(db, Hospitals, Pharmacy, ttl={"rating": timedelta(0)})
+        places = NearbyPlaces(api_key="test", cache=cache)
+        calls = []
+
+        def fake_place_details(place_id, fields=None):
+            calls.append(fields)
+            if fields == ["rating"]:
+                return {"rating": 4.8}
+            return dict(PHARMACY_DETAILS)
+
+        places.place_details = fake_place_details
+
+        places.place_details_many(["pharmacy-1"], place_type="pharmacy")
+        details = places.place_details_many(["pharmacy-1"], place_type="pharmacy")
+
+        assert calls[1] == ["rating"]
+        assert details["pharmacy-1"]["rating"] == 4.8
+        assert details["pharmacy-1"]["name"] == "Apollo Pharmacy"
+        assert cache.stats()["partial_hits"] == 1
+
+
+def test_local_search_uses_stored_places():
+    """source='local' answers from stored rows and falls back to Google when coverage is sparse"""
+    app = make_app()
+    with app.app_context():
+        db.create_all()
+        cache = PlaceDetailsCache(db, Hospitals, Pharmacy)
+        places = NearbyPlaces(api_key="test", cache=cache)
+        places.place_details = lambda place_id, fields=None: dict(PHARMACY_DETAILS)
+        places.find_nearby_places = lambda lat, lon, type, radius, max_pages=1: [{"place_id": "remote"}]
+
+        places.place_details_many(["pharmacy-1"], place_type="pharmacy")
+
+        results, source = places.find_places(12.9720, 77.5950, "pharmacy", 1000, "local", min_local_results=1)
+        assert source == "local"
+        assert results[0]["place_id"] == "pharmacy-1"
+        assert results[0]["distance"] < 100
+
+        results, source = places.find_places(12.9720, 77.5950, "pharmacy", 1000, "local", min_local_results=2)
+        assert source == "remote"
+        assert results == [{"place_id": "remote"}]
+
+
+def test_upgrade_schema_adds_cache_columns_to_existing_tables():
+    """Databases created before the cache columns existed are upgraded in place"""
+    app = make_app()
+    with app.app_context():
+        with db.engine.begin() as connection:
+            connection.execute(text(
+                "CREATE TABLE hospitals (hospital_id INTEGER PRIMARY KEY, hospital_name VARCHAR, place_id VARCHAR)"
+            ))
+            connection.execute(text("INSERT INTO hospitals (hospital_name, place_id) VALUES ('City Hospital', 'p-1')"))
+        db.create_all()
+        upgrade_schema()
+
+        cache = PlaceDetailsCache(db, Hospitals, Pharmacy)
+        details, stale = cache.lookup("p-1")
+        assert stale == list(PlaceDetailsCache.FIELD_GROUPS)
+        assert Hospitals.query.one().opening_hours_json is None
+
+
+def test_pending_index_rows_stay_with_the_storing_thread():
+    """A commit only indexes the rows stored by its own thread"""
+    app = make_app()
+    with app.app_context():
+        db.create_all()
+        cache = PlaceDetailsCache(db, Hospitals, Pharmacy)
+        cache.build_indexes()
+        cache.store("pharmacy-1", PHARMACY_DETAILS, list(PlaceDetailsCache.FIELD_GROUPS), "pharmacy")
+
+        def commit_elsewhere():
+            with app.app_context():
+                cache.commit()
+
+        other = threading.Thread(target=commit_elsewhere)
+        other.start()
+        other.join()
+        assert cache.nearby(12.9716, 77.5946, type="pharmacy") == []
+
+        cache.commit()
+        assert [place["place_id"] for place in cache.nearby(12.9716, 77.5946, type="pharmacy")] == ["pharmacy-1"]
@@ -0,0 +1,49 @@
+"""
+Tests for the vectorised place ranking used by the finders
+"""
+
+import random
+
+from modules.geo_index import haversine_m
+from modules.place_ranking import rank_places, score_places
+
+USER = (12.9716, 77.5946)
+
+
+def place(place_id, lat, lon, rating=None, reviews=None):
+    result = {"place_id": place_id, "geometry": {"location": {"lat": lat, "lng": lon}}}
+    if rating is not None:
+        result["rating"] = rating
+    if reviews is not None:
+        result["user_ratings_total"] = reviews
+    return result
+
+
+def test_prefers_close_well_rated_places():
+    places = [
+        place("far-famous", 13.0300, 77.5946, rating=4.0, reviews=9000),
+        place("near-good", 12.9726, 77.5946, rating=4.5, reviews=800),
+        place("near-unrated", 12.9720, 77.5946),
+        {"place_id": "no-location", "rating": 5.0, "user_ratings_total": 10},
+    ]
+    ranked = rank_places(places, *USER, radius=5000)
+
+    assert [p["place_id"] for p in ranked] == ["near-good", "near-unrated", "far-famous", "no-location"]
+    assert abs(ranked[0]["distance"] - haversine_m(*USER, 12.9726, 77.5946)) < 0.5
+    assert "distance" not in ranked[-1]
+    assert "distance" not in places[1]
+
+
+def test_top_k_matches_full_sort():
+    """The partial selection returns the same leaders as scoring and sorting everything"""
+    rng = random.Random(11)
+    places = [
+        place(f"p{i}", USER[0] + rng.uniform(-0.05, 0.05), USER[1] + rng.uniform(-0.05, 0.05),
+              rating=round(rng.uniform(1, 5), 1), reviews=rng.randint(0, 5000))
+        for i in range(500)
+    ]
+    scores, _ = score_places(places, *USER, radius=5000)
+    expected = [places[i]["place_id"] for i in sorted(range(500), key=lambda i: -scores[i])[:10]]
+
+    assert [p["place_id"] for p in rank_places(places, *USER, k=10, radius=5000)] == expected
+    assert rank_places([], *USER, k=5) == []
@@ -0,0 +1,56 @@
+"""
+Tests for recording Places responses and replaying them from the stand-in server
+"""
+
+import pytest
+
+from modules.nearby_places import NearbyPlaces
+from modules.outbound import OutboundGovernor
+from modules.places_replay import PlacesRecorder, ReplayServer
+
+NEARBY = {"status": "OK", "results": [{"place_id": "city", "name": "City Hospital"}]}
+DETAILS = {"status": "OK", "result": {"name": "City Hospital", "formatted_phone_number": "080 1234"}}
+
+
+@pytest.fixture
+def recorded(tmp_path):
+    recorder = PlacesRecorder(str(tmp_path / "seed"))
+    recorder.record("nearbysearch", {"location": "12.9716,77.5946", "radius": 5000, "type": "hospital", "key": "secret"}, NEARBY)
+    recorder.record("details", {"placeid": "city", "fields": "name,formatted_phone_number", "key": "secret"}, DETAILS)
+    return str(tmp_path / "seed")
+
+
+def places_for(server, **kwargs):
+    governor = OutboundGovernor({"google_places": {"retries": 0}})
+    return NearbyPlaces(api_key="other-key", base_url=server.url, governor=governor, **kwargs)
+
+
+def test_replays_recordings_and_records_again(recorded, tmp_path):
+    """Requests replay whatever key they use, and a recorder captures them for another server"""
+    server = ReplayServer(recorded).start()
+    try:
+        places = places_for(server, recorder=PlacesRecorder(str(tmp_path / "copy")))
+        assert places.find_nearby_places(12.9716, 77.5946, "hospital", 5000) == NEARBY["results"]
+        assert places.place_details("city", ["name", "formatted_phone_number"]) == DETAILS["result"]
+        # A nearby search with no recording of its own gets the closest recording of that type
+        assert places.find_nearby_places(12.9800, 77.6000, "hospital", 3000) == NEARBY["results"]
+        assert places.find_nearby_places(12.9716, 77.5946, "pharmacy", 5000) == []
+        assert server.stats["replayed"] == 2 and server.stats["nearest"] == 1
+    finally:
+        server.stop()
+
+    copy = ReplayServer(str(tmp_path / "copy")).start()
+    try:
+        assert places_for(copy).place_details("city", ["name", "formatted_phone_number"]) == DETAILS["result"]
+    finally:
+        copy.stop()
+
+
+def test_injects_latency_and_errors(recorded):
+    server = ReplayServer(recorded, latency=0.05, error_rate=1.0, seed=1).start()
+    try:
+        with pytest.raises(Exception):
+            places_for(server).place_details("city", ["name", "formatted_phone_number"])
+        assert server.stats["injected_errors"] == 1
+    finally:
+        server.stop()
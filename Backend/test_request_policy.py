@@ -0,0 +1,106 @@
+"""
+Tests for the request blocking applied to the rendering browser
+"""
+
+import json
+import re
+from types import SimpleNamespace
+
+from modules.browser_pool import BrowserPool
+from modules.request_policy import InterceptionPolicy, site_of
+from modules.website_scraper import WebsiteScraper
+
+
+class FakeRequest:
+    def __init__(self, url, accept="*/*"):
+        self.url = url
+        self.headers = {"Accept": accept}
+        self.aborted = False
+
+    def abort(self):
+        self.aborted = True
+
+
+class FakeDriver:
+    """Loads a page by replaying its subresource requests through the installed interceptor"""
+
+    def __init__(self, subresources):
+        self.subresources = subresources
+        self.scopes = None
+        self.request_interceptor = None
+        self.requests = []
+        self.page_source = ""
+
+    def get(self, url):
+        for request in [FakeRequest(url)] + self.subresources:
+            if any(re.search(scope, request.url) for scope in self.scopes or [".*"]):
+                self.request_interceptor(request)
+                if not request.aborted:
+                    self.requests.append(request)
+        self.loaded = [request.url for request in self.requests]
+        self.page_source = "<html><body>Dr. Meera Iyer</body></html>"
+        for request in self.requests:
+            request.response = None
+        self.requests[-1].response = SimpleNamespace(
+            headers={"Content-Type": "application/json"}, body=json.dumps({"doctors": ["Dr. Meera Iyer"]}).encode()
+        )
+
+    def find_element(self, by, value):
+        return object()
+
+    def quit(self):
+        pass
+
+
+def test_site_of_keeps_country_second_level_domains():
+    assert site_of("www.apollohospitals.com") == "apollohospitals.com"
+    assert site_of("care.fortis.co.in:443") == "fortis.co.in"
+    assert site_of("localhost") == "localhost"
+
+
+def test_heavy_and_tracking_requests_are_blocked():
+    policy = InterceptionPolicy()
+    site = "hospital.in"
+    assert policy.should_block("https://hospital.in/images/dr-rao.JPG", {}, site)
+    assert policy.should_block("https://cdn.hospital.in/banner", {"Accept": "image/avif,image/webp"}, site)
+    assert policy.should_block("https://www.googletagmanager.com/gtm.js", {}, site)
+    assert not policy.should_block("https://hospital.in/api/doctors?page=2", {"Accept": "application/json"}, site)
+    assert not policy.should_block("https://cdn.jsdelivr.net/npm/vue.js", {}, site)
+    assert InterceptionPolicy(block_third_party=True).should_block("https://cdn.jsdelivr.net/npm/vue.js", {}, site)
+
+
+def test_only_first_party_and_api_traffic_is_captured():
+    scopes = InterceptionPolicy().scopes_for("https://www.hospital.in/doctors")
+
+    def captured(url):
+        return any(re.search(scope, url) for scope in scopes)
+
+    assert captured("https://api.hospital.in/v1/doctors")
+    assert captured("https://hospital-backend.herokuapp.com/api/doctors?page=2")
+    assert captured("https://cdn.example.net/data/doctors.json")
+    assert captured("https://abc123.sanity.io/v2021-10-21/data/query/production")
+    assert not captured("https://www.google-analytics.com/collect")
+    assert not captured("https://evilhospital.in/")
+    assert not captured("https://cdn.jsdelivr.net/npm/vue.js")
+    assert InterceptionPolicy(block_third_party=True).scopes_for("https://www.hospital.in/") == []
+    assert "*://*.doubleclick.net/*" in InterceptionPolicy().blocked_url_patterns()
+
+
+def test_rendered_page_keeps_json_and_drops_heavy_requests():
+    driver = FakeDriver([
+        FakeRequest("https://www.hospital.in/logo.png"),
+        FakeRequest("https://www.hospital.in/fonts/inter.woff2"),
+        FakeRequest("https://www.google-analytics.com/collect"),
+        FakeRequest("https://api.hospital.in/doctors", accept="application/json"),
+    ])
+    scraper = WebsiteScraper(api_key="test")
+    scraper.browser_pool = BrowserPool(lambda: driver, size=1)
+
+    html, json_responses = scraper.get_rendered_html("https://www.hospital.in/doctors")
+
+    assert "Dr. Meera Iyer" in html
+    assert driver.loaded == [
+        "https://www.hospital.in/doctors", "https://api.hospital.in/doctors"
+    ]
+    assert json_responses == [{"url": "https://api.hospital.in/doctors", "data": {"doctors": ["Dr. Meera Iyer"]}}]
+    assert scraper.request_policy.stats == {"allowed": 2, "blocked": 2}
@@ -21,6 +21,7 @@ try:
     from routes_reminders import routes_reminders
     from routes_health import routes_health
     from routes_functions import function_routes
+    from routes_jobs import routes_jobs
     from models import db
     import json
     
@@ -95,6 +96,12 @@ try:
             print("✅ Function routes registered successfully")
         except Exception as e:
             print(f"❌ Error registering function routes: {e}")
+
+        try:
+            routes_jobs(app, db)
+            print("✅ Job routes registered successfully")
+        except Exception as e:
+            print(f"❌ Error registering job routes: {e}")
     
     # List all registered routes to check for duplicates
     print("\n📋 Registered routes:")
@@ -0,0 +1,120 @@
+"""
+Tests for sitemap-driven doctor page discovery
+"""
+
+import gzip
+import io
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from modules.sitemap_discovery import iter_sitemap
+from modules.website_scraper import WebsiteScraper
+
+NS = 'xmlns="http://www.sitemaps.org/schemas/sitemap/0.9"'
+
+
+def urlset(paths, host):
+    entries = "".join(f"<url><loc>{host}{path}</loc><lastmod>2025-01-01</lastmod></url>" for path in paths)
+    return f'<?xml version="1.0" encoding="UTF-8"?><urlset {NS}>{entries}</urlset>'
+
+
+def sitemap_site(with_sitemap):
+    requests_seen = []
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            requests_seen.append(self.path)
+            host = f"http://127.0.0.1:{self.server.server_address[1]}"
+            body, content_type = None, "application/xml"
+            if self.path == "/robots.txt" and with_sitemap:
+                body, content_type = f"User-agent: *\nAllow: /\nSitemap: {host}/sitemap_index.xml\n", "text/plain"
+            elif self.path == "/sitemap_index.xml" and with_sitemap:
+                body = (f'<sitemapindex {NS}><sitemap><loc>{host}/post-sitemap.xml</loc></sitemap>'
+                        f'<sitemap><loc>{host}/doctor-sitemap.xml.gz</loc></sitemap></sitemapindex>')
+            elif self.path == "/post-sitemap.xml":
+                body = urlset(["/blog/heart-health-tips/", "/blog/monsoon-care/"], host)
+            elif self.path == "/doctor-sitemap.xml.gz":
+                paths = [f"/doctors/dr-doctor{index}-cardiologist/" for index in range(30)]
+                body = gzip.compress(urlset(paths + ["/careers/"], host).encode("utf-8"))
+                content_type = "application/x-gzip"
+            elif self.path == "/":
+                body, content_type = '<html><body><a href="/our-doctors/">Our doctors</a></body></html>', "text/html"
+            elif self.path == "/our-doctors/":
+                body, content_type = "<html><body><h1>Doctors</h1></body></html>", "text/html"
+            if body is None:
+                self.send_response(404)
+                self.end_headers()
+                return
+            payload = body if isinstance(body, bytes) else body.encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}", requests_seen
+
+
+@pytest.fixture
+def scraper():
+    scraper = WebsiteScraper(api_key="test")
+    scraper.http.min_interval = 0
+    return scraper
+
+
+def test_sitemaps_are_stream_parsed_gzipped_or_not():
+    document = urlset(["/a/", "/b/"], "https://hospital.in")
+    expected = [("url", "https://hospital.in/a/"), ("url", "https://hospital.in/b/")]
+    assert list(iter_sitemap(io.BytesIO(document.encode("utf-8")))) == expected
+    assert list(iter_sitemap(io.BytesIO(gzip.compress(document.encode("utf-8"))))) == expected
+
+
+def test_doctor_sitemap_replaces_the_link_crawl(scraper):
+    server, site, requests_seen = sitemap_site(with_sitemap=True)
+    try:
+        pages = scraper.find_doctor_page_links(f"{site}/", "Cardiologist")
+    finally:
+        server.shutdown()
+
+    assert len(pages) == 20
+    assert all(page.startswith(f"{site}/doctors/dr-doctor") for page in pages)
+    # The doctor sitemap is read first and the homepage is never crawled
+    assert requests_seen.index("/doctor-sitemap.xml.gz") < requests_seen.index("/post-sitemap.xml")
+    assert "/" not in requests_seen
+    assert scraper.discovery_stats == {"sitemap": 1, "crawl": 0, "reused": 0}
+    assert scraper.sitemaps.stats["sitemaps_read"] == 3
+
+
+def test_repeat_searches_reuse_the_sitemap_discovery(scraper):
+    server, site, requests_seen = sitemap_site(with_sitemap=True)
+    try:
+        first = scraper.find_doctor_page_links(f"{site}/", "Cardiologist")
+        requests_before = len(requests_seen)
+        again = scraper.find_doctor_page_links(f"{site}/", "Cardiologist")
+    finally:
+        server.shutdown()
+
+    assert again == first
+    assert len(requests_seen) == requests_before
+    assert scraper.discovery_stats == {"sitemap": 1, "crawl": 0, "reused": 1}
+
+
+def test_sites_without_sitemaps_are_crawled(scraper):
+    server, site, requests_seen = sitemap_site(with_sitemap=False)
+    try:
+        pages = scraper.find_doctor_page_links(f"{site}/", "Cardiologist")
+        # Within the recrawl window the sitemaps are not looked for again
+        again = scraper.find_doctor_page_links(f"{site}/", "Cardiologist")
+    finally:
+        server.shutdown()
+
+    assert pages == again == [f"{site}/our-doctors/"]
+    assert requests_seen.count("/sitemap.xml") == 1
+    assert scraper.discovery_stats == {"sitemap": 0, "crawl": 2, "reused": 0}
@@ -0,0 +1,89 @@
+"""
+Tests for the structured-data doctor extractor that runs before the LLM
+"""
+
+import json
+import os
+from types import SimpleNamespace
+
+from modules.structured_doctors import structured_doctors
+from modules.website_scraper import WebsiteScraper
+
+FIXTURE = os.path.join(os.path.dirname(__file__), "try.html")
+
+JSON_LD_PAGE = """<html><head><script type="application/ld+json">{"@context": "https://schema.org", "@graph": [
+  {"@type": "MedicalOrganization", "name": "City Heart Hospital", "employee": [
+    {"@type": "Physician", "name": "Dr. Meera Iyer", "medicalSpecialty": "Cardiology",
+     "jobTitle": "Senior Cardiologist", "image": "/img/meera.jpg", "email": "meera@cityheart.in"},
+    {"@type": "Physician", "name": "Dr. Arjun Das", "medicalSpecialty": "Neurology", "jobTitle": "Neurologist"}
+  ]}]}</script></head><body><h1>Our team</h1></body></html>"""
+
+MICRODATA_PAGE = """<html><body>
+<div itemscope itemtype="https://schema.org/Physician">
+  <img itemprop="image" src="/img/rao.jpg"><h3 itemprop="name">Dr. K. Rao</h3>
+  <span itemprop="jobTitle">Consultant Cardiologist</span><a itemprop="telephone" href="tel:+914400000000">Call</a>
+  <div itemprop="address" itemscope itemtype="https://schema.org/PostalAddress"><span itemprop="name">Adyar</span></div>
+</div>
+<div itemscope itemtype="https://schema.org/Physician"><h3 itemprop="name">Dr. S. Pillai</h3>
+  <span itemprop="jobTitle">Consultant Neurologist</span></div></body></html>"""
+
+CARDS_PAGE = """<html><body><div class="doctors-grid">
+  <div class="doctor-card"><img data-src="/img/a.jpg" src="data:image/gif;base64,R0lG">
+    <h4>Dr. Anita Menon, MBBS, DGO</h4><p>Consultant Gynecologist</p><a href="mailto:anita@hospital.in">Email</a></div>
+  <div class="doctor-card"><h4>Dr. Priya Nair</h4><p>Obstetrics &amp; Gynaecology</p></div>
+  <div class="doctor-card"><h4>Dr. Vikram Shah</h4><p>Orthopaedic Surgeon</p></div>
+</div></body></html>"""
+
+
+def test_json_ld_organisation_members_are_extracted():
+    doctors = structured_doctors(JSON_LD_PAGE, [], "Cardiologist", base_url="https://cityheart.in/doctors/")
+    assert doctors == [{
+        "Name": "Dr. Meera Iyer", "Designation": "Senior Cardiologist", "Specialization": "Cardiology",
+        "Contact": "meera@cityheart.in", "Doctor_Image": "https://cityheart.in/img/meera.jpg",
+    }]
+    assert len(structured_doctors(JSON_LD_PAGE, [], "doctor")) == 2
+
+
+def test_microdata_ignores_nested_items():
+    doctors = structured_doctors(MICRODATA_PAGE, [], "Cardiologist", base_url="https://hospital.in/")
+    assert doctors == [{
+        "Name": "Dr. K. Rao", "Designation": "Consultant Cardiologist", "Specialization": None,
+        "Contact": "+914400000000", "Doctor_Image": "https://hospital.in/img/rao.jpg",
+    }]
+
+
+def test_a_single_featured_doctor_is_left_to_the_llm():
+    featured = """<html><head><script type="application/ld+json">{"@context": "https://schema.org",
+      "@type": "Physician", "name": "Dr. Meera Iyer", "medicalSpecialty": "Cardiology"}</script></head>
+      <body><p>Dr. Meera Iyer, Dr. Arjun Das and twenty more cardiologists</p></body></html>"""
+    assert structured_doctors(featured, [], "Cardiologist") == []
+
+
+def test_doctor_cards_are_read_one_name_per_card():
+    doctors = structured_doctors(CARDS_PAGE, [], "Gynecologist", base_url="https://hospital.in/")
+    assert [doctor["Name"] for doctor in doctors] == ["Dr. Anita Menon", "Dr. Priya Nair"]
+    assert doctors[0]["Contact"] == "anita@hospital.in"
+    assert doctors[0]["Doctor_Image"] == "https://hospital.in/img/a.jpg"
+    # A lone card is not enough evidence to skip the LLM
+    assert structured_doctors(CARDS_PAGE.replace('class="doctor-card"', 'class="x"', 2), [], "doctor") == []
+
+
+def test_free_text_profile_is_left_to_the_llm():
+    with open(FIXTURE, "r", encoding="utf-8") as file:
+        assert structured_doctors(file.read(), [], "Gynecologist") == []
+
+
+def test_structured_pages_skip_the_llm():
+    calls = []
+    scraper = WebsiteScraper(api_key="test")
+    scraper.client = SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(
+        create=lambda **kwargs: calls.append(kwargs) or SimpleNamespace(
+            choices=[SimpleNamespace(message=SimpleNamespace(content=json.dumps([])))]
+        )
+    )))
+
+    doctors = scraper.extract_doctor_information(CARDS_PAGE, [], "Orthopedic surgeon")
+    assert [doctor["Name"] for doctor in doctors] == ["Dr. Vikram Shah"]
+    scraper.extract_doctor_information(CARDS_PAGE, [], "Dermatologist")
+    assert len(calls) == 1
+    assert scraper.extraction_stats == {"structured": 1, "cached": 0, "llm": 1}